@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from dotenv import load_dotenv
 load_dotenv()
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 import warnings
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'rest_framework_simplejwt.token_blacklist',
 	'corsheaders',
     'user_auth_app.apps.UserAuthAppConfig',
     'quizzly_app.apps.QuizzlyAppConfig',
@@ -168,3 +170,127 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),     # z.B. 7 Tage
     # Optional: weitere Einstellungen
 }
+
+# Quizly quiz-generation job queue
+# "thread": in-process worker pool, "eager": run inline, "db": run via `manage.py process_quiz_jobs`
+QUIZLY_JOB_BACKEND = os.getenv('QUIZLY_JOB_BACKEND', 'thread')
+QUIZLY_JOB_WORKERS = int(os.getenv('QUIZLY_JOB_WORKERS', '4'))
+# Running jobs without a stage change for this long (e.g. after a restart) are run again by process_quiz_jobs
+QUIZLY_JOB_LEASE_SECONDS = 3600
+# Maximum number of jobs running a pipeline stage at the same time (missing = unlimited)
+QUIZLY_JOB_STAGE_CONCURRENCY = {
+    "download": 4,
+    "transcription": 1,
+    "generation": 4,
+    "saving": 4,
+}
+
+# Whisper models
+QUIZLY_WHISPER_MODEL = os.getenv('QUIZLY_WHISPER_MODEL', 'base')
+# Models loaded at startup, e.g. ['base']
+QUIZLY_WHISPER_PRELOAD = [name for name in os.getenv('QUIZLY_WHISPER_PRELOAD', '').split(',') if name]
+# Least-recently-used models are evicted above this budget (None = unlimited)
+QUIZLY_WHISPER_MEMORY_BUDGET_MB = None
+
+# Transcript cache (keyed by YouTube video id + Whisper model)
+QUIZLY_TRANSCRIPT_CACHE_TTL = 60 * 60 * 24 * 30  # seconds, None = never expire
+QUIZLY_TRANSCRIPT_CACHE_MAX_ENTRIES = 10000
+
+# Cursor pagination of /api/quizzes/ (used when ?cursor= or ?page_size= is given)
+QUIZLY_QUIZ_LIST_PAGE_SIZE = 20
+QUIZLY_QUIZ_LIST_MAX_PAGE_SIZE = 100
+
+# Streaming transcription: decode the audio stream straight to PCM and transcribe it
+# chunk by chunk while downloading (no MP3 file on disk)
+QUIZLY_STREAMING_TRANSCRIPTION = os.getenv('QUIZLY_STREAMING_TRANSCRIPTION', 'False') == 'True'
+QUIZLY_STREAM_CHUNK_SECONDS = 30
+QUIZLY_STREAM_READ_AHEAD_CHUNKS = 4
+
+# Scratch space for downloaded audio (one directory per job, removed afterwards)
+QUIZLY_SCRATCH_DIR = os.getenv('QUIZLY_SCRATCH_DIR')  # default: <tmp>/quizly
+QUIZLY_SCRATCH_QUOTA_MB = 2048  # None = unlimited
+QUIZLY_SCRATCH_RESERVE_MB = 100  # expected size of one download
+QUIZLY_SCRATCH_WAIT_TIMEOUT = 600  # seconds a download waits for free space
+
+# Long-audio mode: split at silence and transcribe segments in a process pool
+QUIZLY_LONG_AUDIO_TRANSCRIPTION = os.getenv('QUIZLY_LONG_AUDIO_TRANSCRIPTION', 'False') == 'True'
+QUIZLY_LONG_AUDIO_MIN_SECONDS = 600
+QUIZLY_LONG_AUDIO_SEGMENT_SECONDS = 120
+QUIZLY_LONG_AUDIO_WORKERS = None  # None = number of available CPU cores
+
+# Gemini client pool
+QUIZLY_GEMINI_BASE_URL = os.getenv('QUIZLY_GEMINI_BASE_URL')  # None = Google endpoint
+QUIZLY_GEMINI_MAX_CONCURRENCY = int(os.getenv('QUIZLY_GEMINI_MAX_CONCURRENCY', '8'))
+QUIZLY_GEMINI_KEEPALIVE_SECONDS = 60
+
+# Gemini resilience: per-attempt timeout, overall deadline, retries and circuit breaker
+QUIZLY_GEMINI_TIMEOUT_SECONDS = 60
+QUIZLY_GEMINI_DEADLINE_SECONDS = 120
+QUIZLY_GEMINI_MAX_RETRIES = 2
+QUIZLY_GEMINI_RETRY_BASE_DELAY = 0.5
+QUIZLY_GEMINI_RETRY_MAX_DELAY = 8.0
+QUIZLY_GEMINI_BREAKER_FAILURE_RATE = 0.5  # open when this share of recent calls failed
+QUIZLY_GEMINI_BREAKER_MIN_CALLS = 10
+QUIZLY_GEMINI_BREAKER_WINDOW_SECONDS = 60
+QUIZLY_GEMINI_BREAKER_RESET_SECONDS = 30
+
+# Chunked (map-reduce) quiz generation for long transcripts
+QUIZLY_CHUNKED_GENERATION = os.getenv('QUIZLY_CHUNKED_GENERATION', 'False') == 'True'
+QUIZLY_CHUNK_MIN_TOKENS = 8000  # transcripts up to this size use a single prompt
+QUIZLY_CHUNK_TOKENS = 4000  # token budget per chunk
+QUIZLY_CHUNK_WORKERS = 4  # chunks sent to Gemini concurrently
+QUIZLY_TOKEN_ENCODING = None  # tiktoken encoding name, None = Whisper's bundled multilingual encoding
+
+# Gemini response cache (keyed by model, prompt template version and transcript)
+QUIZLY_GEMINI_CACHE = os.getenv('QUIZLY_GEMINI_CACHE', 'True') == 'True'
+QUIZLY_GEMINI_CACHE_TTL = 60 * 60 * 24 * 30  # seconds, None = never expire
+QUIZLY_GEMINI_CACHE_MAX_ENTRIES = 10000
+
+# Single-flight: concurrent requests for the same video share one pipeline run
+QUIZLY_SINGLE_FLIGHT = True
+QUIZLY_SINGLE_FLIGHT_LEASE_SECONDS = 3600  # a cross-process lock expires after this (e.g. if its process died)
+QUIZLY_SINGLE_FLIGHT_WAIT_TIMEOUT = 1800  # waiting requests run the pipeline themselves after this
+QUIZLY_SINGLE_FLIGHT_POLL_INTERVAL = 1.0
+
+# Prometheus metrics at /metrics (per-step timings of the quiz pipeline)
+QUIZLY_METRICS = os.getenv('QUIZLY_METRICS', 'False') == 'True'
+QUIZLY_METRICS_TOKEN = os.getenv('QUIZLY_METRICS_TOKEN')  # optional Bearer token for scrapers
+
+# Resolution of the authenticated user per request
+# "db": query the user every request, "cached": in-process LRU cache, "stateless": from the token claims
+QUIZLY_AUTH_USER_MODE = os.getenv('QUIZLY_AUTH_USER_MODE', 'db')
+QUIZLY_AUTH_USER_CACHE_TTL = int(os.getenv('QUIZLY_AUTH_USER_CACHE_TTL', '60'))
+QUIZLY_AUTH_USER_CACHE_MAX_ENTRIES = 1024
+
+# Refresh-token blacklist: in-memory Bloom filter in front of the blacklist table
+QUIZLY_TOKEN_REVOCATION_FILTER = True
+QUIZLY_TOKEN_REVOCATION_CAPACITY = 100000  # initial filter size, grows with the blacklist
+QUIZLY_TOKEN_REVOCATION_SYNC_SECONDS = 5  # tokens revoked by other processes are seen after this
+QUIZLY_TOKEN_REVOCATION_SYNC_OVERLAP = 1000  # rows below the watermark re-read on each sync (late commits)
+QUIZLY_TOKEN_REVOCATION_REBUILD_SECONDS = 3600
+
+# Cache of rendered quiz JSON (quiz detail and list), validated by the quiz ETags
+# (Django cache alias "quiz_responses"; without the alias the cache is disabled)
+QUIZLY_RESPONSE_CACHE = os.getenv('QUIZLY_RESPONSE_CACHE', 'memory')  # "memory", "file" or "" (disabled)
+QUIZLY_RESPONSE_CACHE_DIR = os.getenv('QUIZLY_RESPONSE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'quizly-responses')
+QUIZLY_RESPONSE_CACHE_MAX_ENTRIES = 1000
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+if QUIZLY_RESPONSE_CACHE == 'memory':
+    CACHES['quiz_responses'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz-responses',
+        'TIMEOUT': None,  # entries are validated by their ETag
+        'OPTIONS': {'MAX_ENTRIES': QUIZLY_RESPONSE_CACHE_MAX_ENTRIES},
+    }
+elif QUIZLY_RESPONSE_CACHE == 'file':
+    CACHES['quiz_responses'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': QUIZLY_RESPONSE_CACHE_DIR,
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': QUIZLY_RESPONSE_CACHE_MAX_ENTRIES},
+    }
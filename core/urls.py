@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from quizzly_app.api.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api/', include('user_auth_app.api.urls')),
     path('api/', include('quizzly_app.api.urls')),
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizJob, TranscriptCacheEntry, GeminiResponseCacheEntry
 
 
 """
@@ -22,10 +22,11 @@ class QuizAdmin(admin.ModelAdmin):
 	Allows inline editing of related questions.
 	"""
 	list_display = ('id', 'title', 'video_url', 'owner', 'created_at', 'updated_at')
-	search_fields = ('title', 'video_url', 'owner__username')
-	list_filter = ('created_at', 'owner')
+	search_fields = ('title', 'video_url', '=video_id', 'owner__username')
+	list_filter = ('created_at', 'is_dummy', 'owner')
 	inlines = [QuestionInline]
-	fields = ('title', 'description', 'video_url', 'owner', 'created_at')
+	fields = ('title', 'description', 'video_url', 'owner', 'created_at', 'gemini_calls', 'prompt_tokens', 'output_tokens')
+	readonly_fields = ('gemini_calls', 'prompt_tokens', 'output_tokens')
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
@@ -38,3 +39,34 @@ class QuestionAdmin(admin.ModelAdmin):
 	list_filter = ('created_at', 'quiz')
 	fields = ('quiz', 'question_title', 'question_options', 'answer', 'created_at')
 from django.contrib import admin
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+	"""
+	Admin configuration for the QuizJob model.
+	Shows job status and progress for monitoring the background queue.
+	"""
+	list_display = ('id', 'video_url', 'owner', 'status', 'stage', 'progress', 'created_at', 'finished_at')
+	search_fields = ('video_url', 'owner__username')
+	list_filter = ('status', 'stage', 'created_at')
+	readonly_fields = ('started_at', 'finished_at')
+
+@admin.register(TranscriptCacheEntry)
+class TranscriptCacheEntryAdmin(admin.ModelAdmin):
+	"""
+	Admin configuration for cached transcripts.
+	Allows inspecting and deleting cache entries.
+	"""
+	list_display = ('id', 'video_id', 'model_name', 'hits', 'created_at', 'last_used_at')
+	search_fields = ('video_id',)
+	list_filter = ('model_name',)
+
+@admin.register(GeminiResponseCacheEntry)
+class GeminiResponseCacheEntryAdmin(admin.ModelAdmin):
+	"""
+	Admin configuration for cached Gemini responses.
+	Allows inspecting and deleting cache entries.
+	"""
+	list_display = ('id', 'template_version', 'model_name', 'hits', 'created_at', 'last_used_at')
+	search_fields = ('=key',)
+	list_filter = ('template_version', 'model_name')
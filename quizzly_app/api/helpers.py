@@ -1,88 +1,303 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, prefetch_related_objects
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
 from ..models import Quiz, Question
-from .serializers import QuizSerializer
+from ..utils import response_cache
+from ..utils.stages import pipeline_stage
+from ..utils.youtube import extract_video_id
+from .serializers import QuizSerializer, QuizSummarySerializer, QuizJobSerializer
 
 def update_quiz_partial(quiz, data):
     """
     Partially updates a Quiz instance with provided data.
-    Only updates fields present in the data dict (title, description, video_url).
+    Only updates fields present in the data dict (title, description, video_url),
+    and only writes the columns whose value actually changed (plus updated_at;
+    video_id follows video_url in Quiz.save).
     Returns the updated Quiz instance.
     """
-    updated = False
-    if "title" in data:
-        quiz.title = data["title"]
-        updated = True
-    if "description" in data:
-        quiz.description = data["description"]
-        updated = True
-    if "video_url" in data:
-        quiz.video_url = data["video_url"]
-        updated = True
-    if updated:
-        quiz.save()
+    changed = []
+    for field in ("title", "description", "video_url"):
+        if field in data and getattr(quiz, field) != data[field]:
+            setattr(quiz, field, data[field])
+            changed.append(field)
+    if changed:
+        quiz.save(update_fields=changed + ["updated_at"])
+    return quiz
+
+def save_quiz_with_questions(title, description, url, user, questions_data, usage=None):
+    """
+    Atomically creates a Quiz and all its questions.
+    Questions are written with a single bulk INSERT inside one transaction and
+    attached to the quiz as prefetched objects, so serializing the returned quiz
+    does not query the questions again.
+    The Gemini token usage (a TokenUsage), if given, is stored on the quiz.
+    Returns the created Quiz instance.
+    """
+    token_fields = {}
+    if usage is not None:
+        token_fields = {
+            "gemini_calls": usage.calls,
+            "prompt_tokens": usage.prompt_tokens,
+            "output_tokens": usage.output_tokens,
+        }
+    with transaction.atomic():
+        quiz = Quiz.objects.create(
+            title=title,
+            description=description,
+            video_url=url,
+            owner=user,
+            **token_fields
+        )
+        questions = create_questions(quiz, questions_data)
+    attach_questions(quiz, questions)
     return quiz
 
-def create_quiz_from_youtube(url, user):
+def attach_questions(quiz, questions):
+    """
+    Stores questions in the quiz's prefetch cache, as prefetch_related_objects
+    does, so `quiz.questions.all()` returns them without a query.
+    """
+    prefetched = quiz.questions.all()
+    prefetched._result_cache = list(questions)
+    prefetched._prefetch_done = True
+    quiz._prefetched_objects_cache = {"questions": prefetched}
+
+def create_questions(quiz, questions_data):
+    """
+    Writes the questions of a quiz with a single bulk INSERT.
+    Returns the created questions, with primary keys on SQLite and PostgreSQL.
+    """
+    questions = Question.objects.bulk_create([
+        Question(
+            quiz=quiz,
+            question_title=q["question_title"],
+            question_options=q["question_options"],
+            answer=q["answer"]
+        )
+        for q in questions_data
+    ])
+    # bulk_create sends no post_save signals for the questions.
+    response_cache.invalidate_quiz(quiz.pk, quiz.owner_id)
+    return questions
+
+def _transcribe_download(url, model_name, stage):
+    """
+    Downloads the audio as MP3 file and transcribes it afterwards.
+    The file lives in a scratch directory that is removed once transcription ends.
+    """
+    from quizzly_app.utils.quiz_pipeline import extract_audio_from_youtube, transcribe_audio
+    from quizzly_app.utils.scratch import get_scratch_space
+    with get_scratch_space().job_dir() as tmp_dir:
+        with stage("download"):
+            audio_path = extract_audio_from_youtube(url, tmp_dir=tmp_dir)
+        with stage("transcription"):
+            return transcribe_audio(audio_path, model_name=model_name)
+
+def _transcribe_streaming(url, model_name, stage):
+    """
+    Streams the audio as PCM into chunked transcription without an intermediate file.
+    """
+    from quizzly_app.utils.quiz_pipeline import resolve_audio_stream, transcribe_audio_stream
+    with stage("download"):
+        stream_url, headers = resolve_audio_stream(url)
+    with stage("transcription"):
+        return transcribe_audio_stream(
+            stream_url,
+            headers,
+            model_name=model_name,
+            chunk_seconds=getattr(settings, 'QUIZLY_STREAM_CHUNK_SECONDS', 30),
+            read_ahead_chunks=getattr(settings, 'QUIZLY_STREAM_READ_AHEAD_CHUNKS', 4)
+        )
+
+def _transcribe(url, model_name, stage):
+    """
+    Transcribes a YouTube video without consulting the transcript cache.
+    With QUIZLY_STREAMING_TRANSCRIPTION the audio is transcribed while it streams in.
+    """
+    if getattr(settings, 'QUIZLY_STREAMING_TRANSCRIPTION', False):
+        return _transcribe_streaming(url, model_name, stage)
+    return _transcribe_download(url, model_name, stage)
+
+def get_transcript_for_url(url, stage=pipeline_stage):
+    """
+    Returns the transcript of a YouTube video.
+    Consults the transcript cache (keyed by video id and Whisper model) first and
+    only downloads and transcribes the video on a cache miss. With
+    QUIZLY_STREAMING_TRANSCRIPTION the audio is transcribed while it streams in.
+    Returns the transcript text.
+    """
+    from quizzly_app.utils import transcript_cache
+    from quizzly_app.utils.youtube import extract_video_id
+    model_name = getattr(settings, 'QUIZLY_WHISPER_MODEL', 'base')
+    video_id = extract_video_id(url)
+    if video_id:
+        transcript = transcript_cache.get_transcript(video_id, model_name)
+        if transcript is not None:
+            return transcript
+    transcript = _transcribe(url, model_name, stage)
+    if video_id:
+        transcript_cache.store_transcript(video_id, model_name, transcript)
+    return transcript
+
+async def aget_transcript_for_url(url, stage=pipeline_stage):
+    """
+    Async variant of get_transcript_for_url.
+    The transcript cache is read and written on Django's thread-sensitive
+    thread, so its database connection is cleaned up like any request's; only
+    the blocking download and transcription run in a separate worker thread.
+    Returns the transcript text.
+    """
+    from quizzly_app.utils import transcript_cache
+    from quizzly_app.utils.youtube import extract_video_id
+    model_name = getattr(settings, 'QUIZLY_WHISPER_MODEL', 'base')
+    video_id = extract_video_id(url)
+    if video_id:
+        transcript = await sync_to_async(transcript_cache.get_transcript)(video_id, model_name)
+        if transcript is not None:
+            return transcript
+    transcript = await sync_to_async(_transcribe, thread_sensitive=False)(url, model_name, stage)
+    if video_id:
+        await sync_to_async(transcript_cache.store_transcript)(video_id, model_name, transcript)
+    return transcript
+
+def generate_questions_for_url(url, stage=pipeline_stage):
+    """
+    Transcribes a YouTube video and generates quiz questions for it.
+    Returns a tuple of the questions and the Gemini TokenUsage.
+    """
+    from quizzly_app.utils.gemini import TokenUsage
+    from quizzly_app.utils.quiz_pipeline import generate_quiz_with_gemini
+    transcript = get_transcript_for_url(url, stage)
+    usage = TokenUsage()
+    with stage("generation"):
+        questions_data = generate_quiz_with_gemini(transcript, usage=usage)
+    return questions_data, usage
+
+def create_quiz_from_youtube(url, user, stage=pipeline_stage):
     """
     Creates a Quiz from a YouTube URL for the given user.
     Extracts audio, transcribes it, generates questions using Gemini AI,
     and saves the quiz and its questions to the database.
+    Each step runs inside `stage(name)`, which lets callers (e.g. the job queue)
+    track progress and limit concurrency per stage.
+    Concurrent requests for the same video share one transcription and generation
+    (see single_flight); each request still saves its own quiz.
     Returns serialized quiz data.
     """
-    from quizzly_app.utils.quiz_pipeline import extract_audio_from_youtube, transcribe_audio, generate_quiz_with_gemini
-    audio_path = extract_audio_from_youtube(url)
-    transcript = transcribe_audio(audio_path, model_name="base")
-    questions_data = generate_quiz_with_gemini(transcript)
-    quiz = Quiz.objects.create(
-        title=f"Quiz zu {url}",
-        description="Automatisch generiert aus YouTube-Video.",
-        video_url=url,
-        owner=user
+    from quizzly_app.utils.gemini import TokenUsage
+    from quizzly_app.utils.single_flight import single_flight
+    (questions_data, usage), shared = single_flight(
+        extract_video_id(url), lambda: generate_questions_for_url(url, stage)
     )
-    for q in questions_data:
-        Question.objects.create(
-            quiz=quiz,
-            question_title=q["question_title"],
-            question_options=q["question_options"],
-            answer=q["answer"]
+    if shared:
+        # The tokens were billed to the quiz of the request that ran the pipeline.
+        usage = TokenUsage()
+    with stage("saving"):
+        quiz = save_quiz_with_questions(
+            title=f"Quiz zu {url}",
+            description="Automatisch generiert aus YouTube-Video.",
+            url=url,
+            user=user,
+            questions_data=questions_data,
+            usage=usage
         )
     serializer = QuizSerializer(quiz)
     return serializer.data
 
+async def acreate_quiz_from_youtube(url, user):
+    """
+    Async variant of create_quiz_from_youtube for ASGI deployments.
+    Download and Whisper transcription run in a worker thread, the Gemini call is
+    awaited on the event loop, so one worker can serve many quiz generations at once.
+    Returns serialized quiz data.
+    """
+    from quizzly_app.utils.gemini import TokenUsage
+    from quizzly_app.utils.quiz_pipeline import agenerate_quiz_with_gemini
+    # The download and transcription stages are opened (and timed) inside.
+    transcript = await aget_transcript_for_url(url)
+    usage = TokenUsage()
+    with pipeline_stage("generation"):
+        questions_data = await agenerate_quiz_with_gemini(transcript, usage=usage)
+
+    def save():
+        quiz = save_quiz_with_questions(
+            title=f"Quiz zu {url}",
+            description="Automatisch generiert aus YouTube-Video.",
+            url=url,
+            user=user,
+            questions_data=questions_data,
+            usage=usage
+        )
+        return QuizSerializer(quiz).data
+
+    with pipeline_stage("saving"):
+        return await sync_to_async(save)()
+
 def create_dummy_quiz(url, user, error_msg):
     """
     Creates a dummy Quiz for the given user and YouTube URL.
-    Used as a fallback if quiz generation fails.
+    Used as a fallback if quiz generation fails, so it never calls an external
+    service: the questions come from the precomputed dummy template.
+    The dummy quiz is shared by repeated failures of the same user and video
+    (matched on the normalized video id, or on the URL if it has none, and
+    enforced by unique constraints, so concurrent failures cannot create two);
+    it is only updated with the latest error instead of writing new questions each time.
     Returns a dict with error details and serialized dummy quiz data.
     """
-    from quizzly_app.utils.quiz_pipeline import generate_quiz_with_gemini
-    questions_data = generate_quiz_with_gemini("DUMMY")
-    quiz = Quiz.objects.create(
-        title=f"Beispiel-Quiz zu {url}",
-        description=error_msg,
-        video_url=url,
-        owner=user
-    )
-    for q in questions_data:
-        Question.objects.create(
-            quiz=quiz,
-            question_title=q["question_title"],
-            question_options=q["question_options"],
-            answer=q["answer"]
+    from quizzly_app.utils.quiz_pipeline import dummy_questions
+    video_id = extract_video_id(url)
+    lookup = {"video_id": video_id} if video_id else {"video_url": url}
+    with transaction.atomic():
+        quiz, created = Quiz.objects.get_or_create(
+            owner=user,
+            is_dummy=True,
+            **lookup,
+            defaults={"title": f"Beispiel-Quiz zu {url}", "description": error_msg, "video_url": url},
         )
+        if created:
+            attach_questions(quiz, create_questions(quiz, dummy_questions()))
+    if not created:
+        quiz.description = error_msg
+        quiz.save(update_fields=["description", "updated_at"])
+        prefetch_related_objects([quiz], "questions")
     serializer = QuizSerializer(quiz)
     return {
         "detail": error_msg,
         "dummy_quiz": serializer.data
     }
 
-def serialize_user_quizzes(user):
+def get_user_quizzes(user, summary=False):
+    """
+    Returns the quizzes of the given user, newest first.
+    Questions are prefetched, so the number of queries does not grow with the number of quizzes.
+    With summary=True questions are not loaded; only their count is annotated.
+    """
+    quizzes = Quiz.objects.filter(owner=user).order_by('-created_at', '-id')
+    if summary:
+        return quizzes.annotate(question_count=Count('questions'))
+    return quizzes.prefetch_related('questions')
+
+def serialize_quiz_list(quizzes, summary=False):
+    """
+    Serializes a list of quizzes, either in full or as summaries.
+    Returns a list of serialized quiz data.
+    """
+    serializer_class = QuizSummarySerializer if summary else QuizSerializer
+    return serializer_class(quizzes, many=True).data
+
+def serialize_user_quizzes(user, summary=False):
     """
     Serializes all quizzes belonging to the given user, ordered by creation date (descending).
+    With summary=True nested questions are omitted and only their count is returned.
     Returns a list of serialized quiz data.
     """
-    quizzes = Quiz.objects.filter(owner=user).order_by('-created_at')
-    serializer = QuizSerializer(quizzes, many=True)
-    return serializer.data
+    return serialize_quiz_list(get_user_quizzes(user, summary), summary)
 
 def serialize_quiz_detail(quiz):
     """
@@ -92,6 +307,39 @@ def serialize_quiz_detail(quiz):
     serializer = QuizSerializer(quiz)
     return serializer.data
 
+def render_user_quizzes(user, etag, summary=False):
+    """
+    Returns the user's quiz list (see serialize_user_quizzes) as rendered JSON,
+    from the response cache while the list's ETag is unchanged.
+    """
+    return response_cache.get_or_render(
+        response_cache.list_key(user.pk, summary), etag, lambda: serialize_user_quizzes(user, summary)
+    )
+
+def render_quiz_detail(quiz, etag):
+    """
+    Returns a quiz (see serialize_quiz_detail) as rendered JSON, from the
+    response cache while the quiz's ETag is unchanged.
+    Questions are only loaded if the quiz has to be serialized.
+    """
+    def build():
+        prefetch_related_objects([quiz], 'questions')
+        return serialize_quiz_detail(quiz)
+    return response_cache.get_or_render(response_cache.quiz_key(quiz.pk), etag, build)
+
+def serialize_quiz_job(job):
+    """
+    Serializes a QuizJob including its resulting quiz once available.
+    Successful jobs expose the quiz under 'quiz', failed jobs expose the
+    fallback quiz under 'dummy_quiz' (same shape as the former synchronous response).
+    Returns serialized job data.
+    """
+    data = QuizJobSerializer(job).data
+    if job.quiz_id is not None:
+        key = "dummy_quiz" if job.status == job.Status.FAILED else "quiz"
+        data[key] = serialize_quiz_detail(job.quiz)
+    return data
+
 def delete_quiz(quiz):
     """
     Deletes the given Quiz instance from the database.
@@ -99,3 +347,71 @@ def delete_quiz(quiz):
     """
     quiz.delete()
     return {"detail": "Quiz deleted successfully."}
+
+def build_etag(*parts):
+    """
+    Builds a weak ETag from the given validator values.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def _last_modified(*timestamps):
+    """
+    Returns the latest of the given datetimes as Unix timestamp, or None.
+    """
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    return int(max(timestamps).timestamp()) if timestamps else None
+
+def get_quiz_list_validators(user, query_string=""):
+    """
+    Returns the ETag of the user's quiz list, computed with one aggregate query
+    over Quiz.updated_at and Question.updated_at instead of a serialization.
+    Counts are included so deletions change the ETag as well. The list has no
+    Last-Modified: deleting a quiz does not move the latest updated_at, so
+    If-Modified-Since would answer 304 with the deleted quiz.
+    """
+    state = Quiz.objects.filter(owner=user).aggregate(
+        quiz_count=Count('id', distinct=True),
+        quizzes_modified=Max('updated_at'),
+        question_count=Count('questions'),
+        questions_modified=Max('questions__updated_at'),
+    )
+    etag = build_etag(
+        "quizzes", user.pk, query_string, state['quiz_count'], state['question_count'],
+        state['quizzes_modified'] and state['quizzes_modified'].isoformat(),
+        state['questions_modified'] and state['questions_modified'].isoformat(),
+    )
+    return etag
+
+def get_quiz_detail_validators(quiz):
+    """
+    Returns (etag, last_modified) of a quiz annotated with question_count and
+    questions_modified (see UserQuizDetailView.get_owned_quiz).
+    """
+    etag = build_etag(
+        "quiz", quiz.pk, quiz.updated_at.isoformat(), quiz.question_count,
+        quiz.questions_modified and quiz.questions_modified.isoformat(),
+    )
+    return etag, _last_modified(quiz.updated_at, quiz.questions_modified)
+
+def not_modified_response(request, etag, last_modified):
+    """
+    Returns a 304 response if the request's If-None-Match / If-Modified-Since
+    headers match the current validators, otherwise None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+def set_validators(response, etag, last_modified):
+    """
+    Sets ETag and Last-Modified on a response. The response may only be reused
+    by the user's own browser after revalidation.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    return response
@@ -0,0 +1,95 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(quiz):
+    """
+    Encodes the keyset position (created_at, id) of a quiz as an opaque cursor.
+    """
+    raw = f"{quiz.created_at.isoformat()}|{quiz.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor created by encode_cursor.
+    Returns a (created_at, id) tuple. Raises ValueError for malformed cursors.
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, pk = raw.split('|')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+class QuizKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for quizzes ordered by (-created_at, -id).
+    Each page is fetched with a WHERE clause on the last seen position instead of
+    an OFFSET, so page N costs the same as page 1 (backed by the
+    (owner, created_at, id) index on Quiz).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    def is_requested(self, request):
+        """
+        Returns True if the client asked for a paginated response.
+        """
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        """
+        Returns the requested page size, limited by QUIZLY_QUIZ_LIST_MAX_PAGE_SIZE.
+        """
+        page_size = getattr(settings, 'QUIZLY_QUIZ_LIST_PAGE_SIZE', 20)
+        max_page_size = getattr(settings, 'QUIZLY_QUIZ_LIST_MAX_PAGE_SIZE', 100)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except ValueError:
+            pass
+        return max(1, min(page_size, max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the quizzes of the requested page as a list.
+        Raises NotFound for an invalid cursor.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                created_at, pk = decode_cursor(cursor)
+            except ValueError:
+                raise NotFound("Invalid cursor.")
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self):
+        """
+        Returns the URL of the next page or None on the last page.
+        """
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        """
+        Wraps the page data with the link to the next page.
+        """
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
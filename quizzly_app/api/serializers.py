@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from quizzly_app.models import Quiz, Question
+from quizzly_app.models import Quiz, Question, QuizJob
 
 class QuestionSerializer(serializers.ModelSerializer):
 	"""
@@ -44,3 +44,54 @@ class QuizSerializer(serializers.ModelSerializer):
 			'video_url',
 			'questions'
 		]
+
+class QuizSummarySerializer(serializers.ModelSerializer):
+	"""
+	Lean serializer for quiz lists.
+	Omits nested questions and returns the number of questions instead.
+	Expects the queryset to be annotated with `question_count`.
+	"""
+	question_count = serializers.IntegerField(read_only=True)
+
+	class Meta:
+		"""
+		Meta configuration for QuizSummarySerializer.
+		Specifies model and fields to include in serialization.
+		"""
+		model = Quiz
+		fields = [
+			'id',
+			'title',
+			'description',
+			'created_at',
+			'updated_at',
+			'video_url',
+			'question_count'
+		]
+
+class QuizJobSerializer(serializers.ModelSerializer):
+	"""
+	Serializer for the QuizJob model.
+	Exposes job status, current stage and progress for polling clients.
+	"""
+	detail = serializers.CharField(source='error', read_only=True)
+
+	class Meta:
+		"""
+		Meta configuration for QuizJobSerializer.
+		Specifies model and fields to include in serialization.
+		"""
+		model = QuizJob
+		fields = [
+			'id',
+			'status',
+			'stage',
+			'progress',
+			'detail',
+			'video_url',
+			'quiz',
+			'created_at',
+			'updated_at',
+			'started_at',
+			'finished_at'
+		]
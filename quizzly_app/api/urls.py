@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import CreateQuizView, UserQuizListView, UserQuizDetailView
+from .views import CreateQuizView, AsyncCreateQuizView, QuizJobDetailView, UserQuizListView, UserQuizDetailView
 
 urlpatterns = [
 	path('createQuiz/', CreateQuizView.as_view(), name='create_quiz'),
+	path('createQuiz/async/', AsyncCreateQuizView.as_view(), name='create_quiz_async'),
+	path('jobs/<int:id>/', QuizJobDetailView.as_view(), name='quiz_job_detail'),
 	path('quizzes/', UserQuizListView.as_view(), name='user_quizzes'),
 	path('quizzes/<int:id>/', UserQuizDetailView.as_view(), name='user_quiz_detail'),
 ]
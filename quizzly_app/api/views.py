@@ -1,25 +1,48 @@
-from ..models import Quiz
+import hmac
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, prefetch_related_objects
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from ..models import Quiz, QuizJob
+from ..utils import metrics
+from ..utils.response_cache import json_response
+from ..utils.jobs import enqueue_quiz_job
 from .serializers import QuizSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from user_auth_app.api.views import CookieJWTAuthentication
+from .pagination import QuizKeysetPagination
 
 from .helpers import (
-    update_quiz_partial,
-    create_quiz_from_youtube,
+    acreate_quiz_from_youtube,
     create_dummy_quiz,
-    serialize_user_quizzes,
-    serialize_quiz_detail,
-    delete_quiz
+    update_quiz_partial,
+    get_user_quizzes,
+    serialize_quiz_list,
+    render_user_quizzes,
+    render_quiz_detail,
+    serialize_quiz_job,
+    delete_quiz,
+    get_quiz_detail_validators,
+    get_quiz_list_validators,
+    not_modified_response,
+    set_validators,
 )
 
 
 class CreateQuizView(APIView):
     """
     API endpoint for creating a quiz from a YouTube video URL.
-    Requires authentication. Uses Gemini AI for quiz generation.
+    Requires authentication. Quiz generation runs as a background job;
+    progress can be polled via QuizJobDetailView.
     """
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
@@ -27,24 +50,89 @@ class CreateQuizView(APIView):
     def post(self, request):
         """
         Handles POST requests to create a quiz from a YouTube URL.
-        Returns the created quiz data or a dummy quiz on error.
+        Enqueues a quiz-generation job and returns it with 202 Accepted.
         """
         url = request.data.get('url')
         if not url or not url.startswith('https://www.youtube.com/watch?v='):
             return Response({"detail": "Invalid YouTube URL."}, status=status.HTTP_400_BAD_REQUEST)
+        job = enqueue_quiz_job(url, request.user)
+        return Response(serialize_quiz_job(job), status=status.HTTP_202_ACCEPTED)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCreateQuizView(View):
+    """
+    Async API endpoint for creating a quiz from a YouTube video URL under ASGI.
+    Runs the whole pipeline within the request but awaits all slow steps, so one
+    ASGI worker can serve many quiz generations concurrently.
+    Requires authentication. Returns a dummy quiz on error.
+    """
+
+    def authenticate(self, request):
+        """
+        Authenticates the request with CookieJWTAuthentication.
+        Returns the user or None.
+        """
         try:
-            quiz_data = create_quiz_from_youtube(url, request.user)
-            return Response(quiz_data, status=status.HTTP_201_CREATED)
+            result = CookieJWTAuthentication().authenticate(request)
+        except Exception:
+            return None
+        if result is None or not result[0].is_authenticated:
+            return None
+        return result[0]
+
+    def get_url(self, request):
+        """
+        Reads the YouTube URL from a JSON or form-encoded body.
+        """
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b"{}").get('url')
+            except (ValueError, AttributeError):
+                return None
+        return request.POST.get('url')
+
+    async def post(self, request):
+        """
+        Handles POST requests to create a quiz from a YouTube URL.
+        Returns the created quiz data or a dummy quiz on error.
+        """
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+        url = self.get_url(request)
+        if not url or not url.startswith('https://www.youtube.com/watch?v='):
+            return JsonResponse({"detail": "Invalid YouTube URL."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            quiz_data = await acreate_quiz_from_youtube(url, user)
         except Exception as e:
             error_msg = f"Quiz creation failed: {str(e)}"
-            return self._dummy_quiz_response(url, request.user, error_msg)
+            data = await sync_to_async(create_dummy_quiz)(url, user, error_msg)
+            return JsonResponse(data, status=status.HTTP_201_CREATED)
+        return JsonResponse(quiz_data, status=status.HTTP_201_CREATED)
 
-    def _dummy_quiz_response(self, url, user, error_msg):
+
+class QuizJobDetailView(APIView):
+    """
+    API endpoint for polling the status and progress of a quiz-generation job.
+    Only allows access to jobs owned by the authenticated user.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
+
+    def get(self, request, id):
         """
-        Helper method to return a dummy quiz response if quiz creation fails.
+        Handles GET requests to retrieve the state of a specific job.
+        Returns 404 if not found, 403 if not owned by user.
         """
-        data = create_dummy_quiz(url, user, error_msg)
-        return Response(data, status=status.HTTP_201_CREATED)
+        try:
+            job = QuizJob.objects.get(pk=id)
+        except QuizJob.DoesNotExist:
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job.owner_id != request.user.id:
+            return Response({"detail": "Access denied. Job does not belong to user."}, status=status.HTTP_403_FORBIDDEN)
+        data = serialize_quiz_job(job)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class UserQuizListView(APIView):
@@ -57,9 +145,26 @@ class UserQuizListView(APIView):
     def get(self, request):
         """
         Handles GET requests to retrieve all quizzes for the current user.
+        With `?fields=summary` nested questions are replaced by a question count.
+        With `?cursor=` or `?page_size=` the list is paginated by cursor.
+        Answers 304 Not Modified if the client's ETag still matches.
+        The non-paginated list is served from the response cache while its ETag is unchanged.
         """
-        data = serialize_user_quizzes(request.user)
-        return Response(data, status=status.HTTP_200_OK)
+        fields = request.query_params.get('fields')
+        if fields not in (None, 'summary'):
+            return Response({"detail": "Invalid fields parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        summary = fields == 'summary'
+        etag = get_quiz_list_validators(request.user, request.GET.urlencode())
+        not_modified = not_modified_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+        paginator = QuizKeysetPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(get_user_quizzes(request.user, summary), request, view=self)
+            response = paginator.get_paginated_response(serialize_quiz_list(page, summary))
+        else:
+            response = json_response(request, render_user_quizzes(request.user, etag, summary=summary))
+        return set_validators(response, etag, None)
 
 
 class UserQuizDetailView(APIView):
@@ -71,31 +176,52 @@ class UserQuizDetailView(APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
 
+    def get_owned_quiz(self, request, id, with_questions=False, with_validators=False):
+        """
+        Looks up a quiz of the authenticated user with a single query by primary key.
+        Questions are prefetched (one more query) only if the quiz belongs to the user.
+        With with_validators the question count and latest question update are
+        annotated in the same query (see get_quiz_detail_validators).
+        Returns:
+            tuple: (quiz, None) if found, or (None, error Response) with 404 if the
+                quiz does not exist and 403 if it belongs to another user.
+        """
+        quizzes = Quiz.objects.filter(pk=id)
+        if with_validators:
+            quizzes = quizzes.annotate(question_count=Count('questions'), questions_modified=Max('questions__updated_at'))
+        quiz = quizzes.first()
+        if quiz is None:
+            return None, Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
+        if quiz.owner_id != request.user.id:
+            return None, Response({"detail": "Access denied. Quiz does not belong to user."}, status=status.HTTP_403_FORBIDDEN)
+        if with_questions:
+            prefetch_related_objects([quiz], 'questions')
+        return quiz, None
+
     def get(self, request, id):
         """
         Handles GET requests to retrieve details of a specific quiz.
-        Returns 404 if not found, 403 if not owned by user.
+        Returns 404 if not found, 403 if not owned by user, and 304 if the
+        client's ETag or Last-Modified still matches (without loading questions).
+        The quiz is served from the response cache while its ETag is unchanged.
         """
-        try:
-            quiz = Quiz.objects.get(pk=id)
-        except Quiz.DoesNotExist:
-            return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-        if quiz.owner != request.user:
-            return Response({"detail": "Access denied. Quiz does not belong to user."}, status=status.HTTP_403_FORBIDDEN)
-        data = serialize_quiz_detail(quiz)
-        return Response(data, status=status.HTTP_200_OK)
+        quiz, error = self.get_owned_quiz(request, id, with_validators=True)
+        if error is not None:
+            return error
+        etag, last_modified = get_quiz_detail_validators(quiz)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(json_response(request, render_quiz_detail(quiz, etag)), etag, last_modified)
 
     def patch(self, request, id):
         """
         Handles PATCH requests to partially update a quiz's fields.
         Only allows updates by the quiz owner.
         """
-        try:
-            quiz = Quiz.objects.get(pk=id)
-        except Quiz.DoesNotExist:
-            return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-        if quiz.owner != request.user:
-            return Response({"detail": "Access denied. Quiz does not belong to user."}, status=status.HTTP_403_FORBIDDEN)
+        quiz, error = self.get_owned_quiz(request, id, with_questions=True)
+        if error is not None:
+            return error
         quiz = update_quiz_partial(quiz, request.data)
         serializer = QuizSerializer(quiz)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -105,11 +231,29 @@ class UserQuizDetailView(APIView):
         Handles DELETE requests to remove a quiz from the database.
         Only allows deletion by the quiz owner.
         """
-        try:
-            quiz = Quiz.objects.get(pk=id)
-        except Quiz.DoesNotExist:
-            return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-        if quiz.owner != request.user:
-            return Response({"detail": "Access denied. Quiz does not belong to user."}, status=status.HTTP_403_FORBIDDEN)
+        quiz, error = self.get_owned_quiz(request, id)
+        if error is not None:
+            return error
         data = delete_quiz(quiz)
         return Response(data, status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint for pipeline metrics.
+    Returns 404 unless QUIZLY_METRICS is enabled. If QUIZLY_METRICS_TOKEN is set,
+    scrapers must send it as a Bearer token.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests and returns all metrics in Prometheus text format.
+        """
+        if not metrics.is_enabled():
+            raise Http404
+        token = getattr(settings, 'QUIZLY_METRICS_TOKEN', None)
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(supplied, token):
+                return HttpResponse("Unauthorized\n", status=status.HTTP_401_UNAUTHORIZED, content_type="text/plain")
+        return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class QuizzlyAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quizzly_app'
+
+    def ready(self):
+        """
+        Connects the response cache invalidation to quiz and question changes and
+        optionally pre-warms the Whisper models listed in QUIZLY_WHISPER_PRELOAD.
+        Models are loaded in a background thread so startup is not blocked.
+        """
+        from django.conf import settings
+        from django.db.models.signals import post_delete, post_save
+        from .models import Question, Quiz
+        from .utils import response_cache
+        post_save.connect(response_cache.quiz_changed, sender=Quiz, dispatch_uid='response_cache_quiz_saved')
+        post_delete.connect(response_cache.quiz_changed, sender=Quiz, dispatch_uid='response_cache_quiz_deleted')
+        post_save.connect(response_cache.question_saved, sender=Question, dispatch_uid='response_cache_question_saved')
+        names = getattr(settings, 'QUIZLY_WHISPER_PRELOAD', [])
+        if names:
+            import threading
+            from .utils.whisper_models import get_registry
+            threading.Thread(target=get_registry().preload, args=(names,), daemon=True).start()
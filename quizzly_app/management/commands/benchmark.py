@@ -0,0 +1,283 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quizzly_app.management.commands.benchmark_transcription import synthetic_audio
+from quizzly_app.management.commands.loadtest_create_quiz import FAKE_QUESTIONS
+from quizzly_app.utils import gemini
+from quizzly_app.utils.benchmarks import (
+    compare_reports,
+    delete_revoked_tokens,
+    seed_quizzes,
+    seed_revoked_tokens,
+    summarize_latencies,
+    throwaway_database,
+)
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+from quizzly_app.utils.parallel_transcription import SAMPLE_RATE
+
+SUITES = ("list", "create", "refresh", "transcription")
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+class Command(BaseCommand):
+    """
+    Reproducible benchmark suite for the API and the quiz pipeline.
+    - list: `/api/quizzes/` latency for a seeded DB of N users x M quizzes, per M.
+    - create: createQuiz throughput with transcription replaced by a sleep and Gemini
+      by a local stand-in server.
+    - refresh: token refresh latency with N revoked tokens in the blacklist, with and
+      without the in-memory revocation filter.
+    - transcription: Whisper seconds per audio minute per model, on fixture audio
+      files or synthetic audio.
+    The database suites run in a throwaway test database unless --live-db is given;
+    then seeded users, quizzes and tokens are deleted afterwards. Results can be written as JSON
+    and compared against a previous run with --compare.
+    """
+    help = "Runs the API and pipeline benchmarks and optionally compares them with a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suites', default='list,create',
+                            help=f"Comma-separated suites to run ({', '.join(SUITES)}).")
+        parser.add_argument('--users', type=int, default=10, help="Seeded users (list suite).")
+        parser.add_argument('--quizzes', default='10,100,500',
+                            help="Comma-separated quizzes per user to measure (list suite).")
+        parser.add_argument('--repeat', type=int, default=20,
+                            help="Requests per measured data size (list and refresh suites).")
+        parser.add_argument('--requests', type=int, default=20, help="Quiz requests (create suite).")
+        parser.add_argument('--workers', type=int, default=4, help="Client threads (create suite).")
+        parser.add_argument('--transcription-latency', type=float, default=0.05,
+                            help="Simulated transcription seconds (create suite).")
+        parser.add_argument('--gemini-latency', type=float, default=0.05,
+                            help="Simulated Gemini seconds (create suite).")
+        parser.add_argument('--revoked', type=int, default=1000000, help="Revoked tokens (refresh suite).")
+        parser.add_argument('--models', default='tiny', help="Comma-separated Whisper models (transcription suite).")
+        parser.add_argument('--audio', action='append', default=[],
+                            help="Fixture audio file (repeatable, requires FFmpeg). Default: synthetic audio.")
+        parser.add_argument('--seconds', type=float, default=60, help="Length of the synthetic audio.")
+        parser.add_argument('--live-db', action='store_true',
+                            help="Seed the configured database instead of a throwaway test database.")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+        parser.add_argument('--compare', help="Baseline JSON report to compare the results with.")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed relative regression against the baseline (default 0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        suites = [suite for suite in options['suites'].split(',') if suite]
+        unknown = set(suites) - set(SUITES)
+        if unknown:
+            raise CommandError(f"Unknown suite(s): {', '.join(sorted(unknown))}.")
+        report = {}
+        self.live_db = options['live_db']
+        if {'list', 'create', 'refresh'} & set(suites):
+            database = throwaway_database(self.live_db)
+        else:
+            database = nullcontext()
+        with database, override_settings(ALLOWED_HOSTS=['testserver']):
+            if 'list' in suites:
+                report['list'] = self.bench_list(
+                    options['users'], _int_list(options['quizzes']), options['repeat']
+                )
+            if 'create' in suites:
+                report['create'] = self.bench_create(
+                    options['requests'], options['workers'],
+                    options['transcription_latency'], options['gemini_latency'],
+                )
+            if 'refresh' in suites:
+                report['refresh'] = self.bench_refresh(options['revoked'], options['repeat'])
+        if 'transcription' in suites:
+            report['transcription'] = self.bench_transcription(
+                options['models'].split(','), options['audio'], options['seconds']
+            )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], report, options['tolerance'])
+
+    def bench_list(self, users, sizes, repeat):
+        """
+        Measures the quiz list latency of one user while every seeded user owns M quizzes.
+        """
+        results = []
+        for size in sizes:
+            seeded = seed_quizzes(users, size)
+            try:
+                client = Client()
+                client.cookies['access_token'] = str(AccessToken.for_user(seeded[0]))
+                url = reverse('user_quizzes')
+                queries = []
+
+                def count_query(execute, sql, params, many, context):
+                    queries.append(sql)
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count_query):
+                    client.get(url)
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    samples.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f"Quiz list returned {response.status_code}.")
+            finally:
+                for user in seeded:
+                    user.delete()
+            result = {"quizzes": size, "users": users, "queries": len(queries), **summarize_latencies(samples)}
+            results.append(result)
+            self.stdout.write(
+                f"list {size:>6} quizzes/user: p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                f"{result['queries']} queries"
+            )
+        return results
+
+    def bench_create(self, requests, workers, transcription_latency, gemini_latency):
+        """
+        Measures createQuiz throughput with stubbed transcription and Gemini.
+        Every request uses its own video id so single-flight and caches do not merge them.
+        """
+        user = seed_quizzes(1, 0)[0]
+        token = str(AccessToken.for_user(user))
+
+        def fake_transcript(url, stage=None):
+            time.sleep(transcription_latency)
+            return f"Transkript {url}"
+
+        def send(number):
+            client = Client()
+            client.cookies['access_token'] = token
+            started = time.perf_counter()
+            try:
+                response = client.post(reverse('create_quiz'),
+                                       {"url": f"https://www.youtube.com/watch?v=bench{number:06d}"},
+                                       content_type='application/json')
+                return response.status_code, response.json().get('status'), time.perf_counter() - started
+            finally:
+                close_old_connections()
+
+        stub = GeminiStubServer(reply=json.dumps(FAKE_QUESTIONS), latency=gemini_latency).start()
+        try:
+            with override_settings(QUIZLY_GEMINI_BASE_URL=stub.url, QUIZLY_JOB_BACKEND='eager',
+                                   QUIZLY_GEMINI_CACHE=False), \
+                    patch.dict(os.environ, {'GEMINI_API_KEY': os.getenv('GEMINI_API_KEY') or 'benchmark'}), \
+                    patch('quizzly_app.api.helpers.get_transcript_for_url', side_effect=fake_transcript):
+                gemini.reset_clients()
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(send, range(requests)))
+                elapsed = time.perf_counter() - started
+        finally:
+            stub.stop()
+            gemini.reset_clients()
+            user.delete()
+        result = {
+            "requests": requests,
+            "workers": workers,
+            "transcription_latency": transcription_latency,
+            "gemini_latency": gemini_latency,
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(requests / elapsed, 2),
+            "errors": sum(1 for code, job_status, _ in results if code >= 400 or job_status != 'succeeded'),
+            **summarize_latencies([seconds for _, _, seconds in results]),
+        }
+        self.stdout.write(
+            f"create: {result['requests_per_second']:.1f} req/s, p95 {result['p95_ms']:.1f}ms, "
+            f"{result['errors']} error(s)"
+        )
+        return result
+
+    def bench_refresh(self, revoked, repeat):
+        """
+        Measures the token refresh latency while the blacklist holds `revoked` tokens.
+        """
+        from user_auth_app.revocation import RevocableRefreshToken, reset_store
+        user = seed_quizzes(1, 0)[0]
+        prefix = seed_revoked_tokens(revoked)
+        result = {"revoked": revoked}
+        try:
+            for name, enabled in (("filter", True), ("database", False)):
+                with override_settings(QUIZLY_TOKEN_REVOCATION_FILTER=enabled):
+                    reset_store()
+                    client = Client()
+                    client.cookies['refresh_token'] = str(RevocableRefreshToken.for_user(user))
+                    # The first refresh builds the filter and is not measured.
+                    client.post(reverse('token_refresh'))
+                    samples = []
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        response = client.post(reverse('token_refresh'))
+                        samples.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise CommandError(f"Token refresh returned {response.status_code}.")
+                result[name] = summarize_latencies(samples)
+                self.stdout.write(
+                    f"refresh ({name}, {revoked} revoked): p50 {result[name]['p50_ms']:8.2f}ms  "
+                    f"p95 {result[name]['p95_ms']:8.2f}ms"
+                )
+        finally:
+            if self.live_db:
+                delete_revoked_tokens(prefix)
+            OutstandingToken.objects.filter(user=user).delete()
+            user.delete()
+            reset_store()
+        return result
+
+    def bench_transcription(self, models, audio_files, seconds):
+        """
+        Measures Whisper transcription speed as seconds per audio minute.
+        The model is loaded before timing, so load time is not included.
+        """
+        from whisper.audio import load_audio
+
+        from quizzly_app.utils.whisper_models import use_model
+        fixtures = [(os.path.basename(path), load_audio(path)) for path in audio_files]
+        fixtures = fixtures or [("synthetic", synthetic_audio(seconds))]
+        results = []
+        for model_name in models:
+            with use_model(model_name) as model:
+                elapsed = 0.0
+                audio_seconds = 0.0
+                for _, audio in fixtures:
+                    started = time.perf_counter()
+                    model.transcribe(audio)
+                    elapsed += time.perf_counter() - started
+                    audio_seconds += len(audio) / SAMPLE_RATE
+            result = {
+                "model": model_name,
+                "audio": [name for name, _ in fixtures],
+                "audio_seconds": round(audio_seconds, 1),
+                "seconds": round(elapsed, 3),
+                "seconds_per_audio_minute": round(elapsed / (audio_seconds / 60), 3),
+            }
+            results.append(result)
+            self.stdout.write(
+                f"transcription {model_name}: {result['seconds_per_audio_minute']:.2f}s per audio minute"
+            )
+        return results
+
+    def compare(self, baseline_path, report, tolerance):
+        """
+        Compares the report with a baseline and fails if a metric regressed beyond the tolerance.
+        """
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, tolerance)
+        for metric, old, new, change in regressions:
+            self.stdout.write(self.style.ERROR(f"{metric}: {old} -> {new} ({change:+.0%})"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {tolerance:.0%}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}."))
@@ -0,0 +1,73 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from quizzly_app.utils.parallel_transcription import SAMPLE_RATE, default_workers, split_audio, transcribe_segments
+
+
+def synthetic_audio(seconds, seed=0):
+    """
+    Generates reproducible speech-like audio: noisy tone bursts separated by short pauses.
+    """
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = 0
+    while position < len(audio):
+        burst = int(rng.uniform(1.0, 3.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, len(audio) - position)) / SAMPLE_RATE
+        tone = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * t) + 0.05 * rng.standard_normal(len(t))
+        audio[position:position + len(t)] = tone
+        position += burst + int(rng.uniform(0.2, 0.8) * SAMPLE_RATE)
+    return audio
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the long-audio mode: wall-clock time of transcribing the same audio
+    split into different numbers of segments, each transcribed in its own worker process.
+    """
+    help = "Measures transcription wall-clock speedup versus segment count."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', help="Audio file to transcribe (requires FFmpeg). Default: synthetic audio.")
+        parser.add_argument('--seconds', type=float, default=300, help="Length of the synthetic audio.")
+        parser.add_argument('--model', default='tiny', help="Whisper model name.")
+        parser.add_argument('--segments', default='1,2,4,8', help="Comma-separated segment counts.")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if options['audio']:
+            from whisper.audio import load_audio
+            audio = load_audio(options['audio'])
+        else:
+            audio = synthetic_audio(options['seconds'])
+        duration = len(audio) / SAMPLE_RATE
+        results = []
+        baseline = None
+        for count in [int(n) for n in options['segments'].split(',')]:
+            segments = split_audio(audio, duration / count)
+            started = time.perf_counter()
+            transcribe_segments(segments, options['model'], workers=count)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            results.append({
+                "segments": len(segments),
+                "workers": min(count, default_workers()),
+                "seconds": round(elapsed, 3),
+                "speedup": round(baseline / elapsed, 2),
+            })
+            self.stdout.write(
+                f"{len(segments):>3} segments: {elapsed:8.2f}s  speedup x{baseline / elapsed:.2f}"
+            )
+        report = {
+            "model": options['model'],
+            "audio_seconds": round(duration, 1),
+            "cpu_cores": default_workers(),
+            "results": results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {duration:.0f}s of audio with model '{options['model']}'."))
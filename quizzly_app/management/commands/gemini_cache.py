@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Min, Sum
+
+from quizzly_app.models import GeminiResponseCacheEntry
+from quizzly_app.utils import gemini_cache
+
+
+class Command(BaseCommand):
+    """
+    Inspects and purges the Gemini response cache.
+    Without options a summary per prompt template version and model is printed.
+    """
+    help = "Shows or purges cached Gemini responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', type=int, nargs='?', const=20, metavar='N',
+                            help="List the N most recently used entries (default 20).")
+        parser.add_argument('--evict', action='store_true',
+                            help="Delete expired entries and entries above the size limit.")
+        parser.add_argument('--purge', action='store_true',
+                            help="Delete entries (all, or filtered by --template / --model).")
+        parser.add_argument('--template', help="Only purge entries of this prompt template version.")
+        parser.add_argument('--model', help="Only purge entries of this Gemini model.")
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            deleted = gemini_cache.purge(template_version=options['template'], model_name=options['model'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} cache entry(s)."))
+            return
+        if options['evict']:
+            deleted = gemini_cache.evict()
+            self.stdout.write(self.style.SUCCESS(f"Evicted {deleted} cache entry(s)."))
+            return
+        if options['list'] is not None:
+            self.list_entries(options['list'])
+            return
+        self.summary()
+
+    def summary(self):
+        """
+        Prints entry counts, hits and age per template version and model.
+        """
+        groups = (
+            GeminiResponseCacheEntry.objects
+            .values('template_version', 'model_name')
+            .annotate(entries=Count('id'), hits=Sum('hits'), oldest=Min('created_at'), last_used=Max('last_used_at'))
+            .order_by('template_version', 'model_name')
+        )
+        total = 0
+        for group in groups:
+            total += group['entries']
+            self.stdout.write(
+                f"{group['template_version']} / {group['model_name']}: {group['entries']} entry(s), "
+                f"{group['hits']} hit(s), oldest {group['oldest']:%Y-%m-%d %H:%M}, "
+                f"last used {group['last_used']:%Y-%m-%d %H:%M}"
+            )
+        self.stdout.write(f"Total: {total} entry(s).")
+
+    def list_entries(self, limit):
+        """
+        Prints the most recently used entries.
+        """
+        entries = GeminiResponseCacheEntry.objects.order_by('-last_used_at', '-id')[:limit]
+        for entry in entries:
+            self.stdout.write(
+                f"{entry.key[:12]}  {entry.template_version:<16} {entry.model_name:<20} "
+                f"{entry.hits:>5} hit(s)  {len(entry.response):>7} chars  last used {entry.last_used_at:%Y-%m-%d %H:%M}"
+            )
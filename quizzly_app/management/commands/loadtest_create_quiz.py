@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quizzly_app.utils import gemini
+from quizzly_app.utils.benchmarks import throwaway_database
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+
+FAKE_QUESTIONS = [
+    {
+        "question_title": f"Frage {i + 1}",
+        "question_options": ["A", "B", "C", "D"],
+        "answer": "A",
+    }
+    for i in range(10)
+]
+
+
+class Command(BaseCommand):
+    """
+    Load test comparing createQuiz throughput under WSGI and ASGI.
+    Transcription is replaced by a sleep and Gemini by a local stand-in server with
+    the given latencies, so the test measures how well each stack overlaps waiting.
+    WSGI runs the blocking CreateQuizView (eager job backend) on a fixed number of
+    worker threads; ASGI runs AsyncCreateQuizView on a single event loop.
+    Runs in a throwaway test database unless --live-db is given.
+    """
+    help = "Compares createQuiz throughput of WSGI worker threads vs. one ASGI event loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=40, help="Number of quiz requests per run.")
+        parser.add_argument('--wsgi-workers', type=int, default=4, help="Worker threads for the WSGI run.")
+        parser.add_argument('--transcription-latency', type=float, default=0.5, help="Simulated transcription seconds.")
+        parser.add_argument('--gemini-latency', type=float, default=0.5, help="Simulated Gemini seconds.")
+        parser.add_argument('--live-db', action='store_true',
+                            help="Use the configured database instead of a throwaway test database.")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        with throwaway_database(options['live_db']):
+            user = get_user_model().objects.create_user(username=f"loadtest-{uuid.uuid4().hex[:8]}")
+            token = str(AccessToken.for_user(user))
+            latency = options['transcription_latency']
+
+            def fake_transcript(url, stage=None):
+                time.sleep(latency)
+                return "Transkript"
+
+            async def afake_transcript(url, stage=None):
+                # Blocks a worker thread like the real transcription.
+                return await sync_to_async(fake_transcript, thread_sensitive=False)(url, stage)
+
+            stub = GeminiStubServer(reply=json.dumps(FAKE_QUESTIONS), latency=options['gemini_latency']).start()
+            try:
+                with override_settings(ALLOWED_HOSTS=['testserver'], QUIZLY_GEMINI_BASE_URL=stub.url,
+                                       QUIZLY_JOB_BACKEND='eager'), \
+                        patch.dict(os.environ, {'GEMINI_API_KEY': os.getenv('GEMINI_API_KEY') or 'loadtest'}), \
+                        patch('quizzly_app.api.helpers.get_transcript_for_url', side_effect=fake_transcript), \
+                        patch('quizzly_app.api.helpers.aget_transcript_for_url', side_effect=afake_transcript):
+                    gemini.reset_clients()
+                    wsgi = self.run_wsgi(token, options['requests'], options['wsgi_workers'])
+                    asgi = asyncio.run(self.run_asgi(token, options['requests']))
+            finally:
+                stub.stop()
+                gemini.reset_clients()
+                user.delete()
+
+        report = {
+            "requests": options['requests'],
+            "wsgi_workers": options['wsgi_workers'],
+            "transcription_latency": latency,
+            "gemini_latency": options['gemini_latency'],
+            "wsgi": wsgi,
+            "asgi": asgi,
+        }
+        for name in ("wsgi", "asgi"):
+            result = report[name]
+            self.stdout.write(
+                f"{name.upper()}: {result['seconds']:.2f}s, {result['requests_per_second']:.1f} req/s, "
+                f"{result['errors']} error(s)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"ASGI throughput x{asgi['requests_per_second'] / wsgi['requests_per_second']:.1f} of WSGI."
+        ))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def summarize(self, statuses, elapsed):
+        """
+        Builds the result dict for one run.
+        """
+        return {
+            "seconds": round(elapsed, 3),
+            "requests_per_second": round(len(statuses) / elapsed, 2),
+            "errors": sum(1 for code in statuses if code >= 400),
+        }
+
+    def run_wsgi(self, token, requests, workers):
+        """
+        Sends the requests through the WSGI handler from a fixed pool of threads.
+        """
+        url = reverse('create_quiz')
+
+        def send(_):
+            client = Client()
+            client.cookies['access_token'] = token
+            try:
+                response = client.post(url, {"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"},
+                                       content_type='application/json')
+                return response.status_code
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            statuses = list(pool.map(send, range(requests)))
+        return self.summarize(statuses, time.perf_counter() - started)
+
+    async def run_asgi(self, token, requests):
+        """
+        Sends all requests concurrently through the ASGI handler on one event loop.
+        """
+        url = reverse('create_quiz_async')
+        client = AsyncClient()
+        client.cookies['access_token'] = token
+
+        async def send():
+            response = await client.post(url, {"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"},
+                                         content_type='application/json')
+            return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(send() for _ in range(requests)))
+        return self.summarize(statuses, time.perf_counter() - started)
@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+
+from quizzly_app.utils.jobs import claimable_jobs, submit_quiz_job
+
+
+class Command(BaseCommand):
+    """
+    Worker process for the DB-backed quiz job queue.
+    Polls pending QuizJob rows and runs them in the local worker pool.
+    Useful with QUIZLY_JOB_BACKEND="db" or to pick up jobs left pending after a restart.
+    Running jobs whose lease expired (QUIZLY_JOB_LEASE_SECONDS) are run again.
+    """
+    help = "Runs pending and abandoned quiz-generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain pending jobs once and exit.")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        futures = {}
+        while True:
+            futures = {job_id: f for job_id, f in futures.items() if not f.done()}
+            pending = claimable_jobs().order_by('created_at', 'id')
+            for job_id in pending.values_list('id', flat=True):
+                if job_id not in futures:
+                    futures[job_id] = submit_quiz_job(job_id)
+            if options['once']:
+                wait(futures.values())
+                self.stdout.write(self.style.SUCCESS(f"Processed {len(futures)} job(s)."))
+                return
+            time.sleep(options['poll_interval'])
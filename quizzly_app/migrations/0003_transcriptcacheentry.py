@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0002_quizjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32)),
+                ('model_name', models.CharField(max_length=50)),
+                ('transcript', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='transcript_last_used_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model_name'), name='unique_transcript_per_model')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0003_transcriptcacheentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='quiz_owner_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='quiz',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_video_ids(apps, schema_editor):
+    from quizzly_app.utils.youtube import extract_video_id
+    Quiz = apps.get_model('quizzly_app', 'Quiz')
+    for quiz in Quiz.objects.only('id', 'video_url').iterator():
+        video_id = extract_video_id(quiz.video_url)
+        if video_id:
+            Quiz.objects.filter(pk=quiz.pk).update(video_id=video_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0004_quiz_owner_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='video_id',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(backfill_video_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['created_at'], name='question_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['created_at'], name='quiz_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['video_id'], name='quiz_video_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizjob',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='quizjob_status_created_idx'),
+        ),
+    ]
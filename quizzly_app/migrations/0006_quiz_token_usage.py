@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='gemini_calls',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='output_tokens',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
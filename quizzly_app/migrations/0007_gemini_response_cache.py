@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0006_quiz_token_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeminiResponseCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=50)),
+                ('template_version', models.CharField(max_length=50)),
+                ('response', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='gemini_cache_last_used_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0007_gemini_response_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='is_dummy',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0008_quiz_is_dummy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('owner', models.CharField(max_length=100)),
+                ('acquired_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_dummy_quizzes(apps, schema_editor):
+    """
+    Keeps only the newest dummy quiz per user and video before the constraint is added.
+    """
+    Quiz = apps.get_model('quizzly_app', 'Quiz')
+    duplicates = (
+        Quiz.objects.filter(is_dummy=True).exclude(video_id='')
+        .values('owner_id', 'video_id').annotate(count=Count('id'), newest=Max('id')).filter(count__gt=1)
+    )
+    for group in duplicates:
+        Quiz.objects.filter(
+            is_dummy=True, owner_id=group['owner_id'], video_id=group['video_id'], id__lt=group['newest']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzly_app', '0009_pipeline_lock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_dummy_quizzes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='quiz',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_dummy', True), models.Q(('video_id', ''), _negated=True)), fields=('owner', 'video_id'), name='quiz_unique_dummy_per_video'),
+        ),
+    ]
@@ -2,17 +2,59 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .utils.youtube import extract_video_id
+
 class Quiz(models.Model):
 	"""
 	Model for a quiz.
-	Contains title, description, creation date, update date, video URL, and owner.
+	Contains title, description, creation date, update date, video URL, owner
+	and the Gemini tokens spent on generating it.
 	"""
 	title = models.CharField(max_length=255)
 	description = models.TextField(blank=True)
 	created_at = models.DateTimeField(default=timezone.now, editable=True)
 	updated_at = models.DateTimeField(auto_now=True)
 	video_url = models.URLField()
-	owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='quizzes')
+	video_id = models.CharField(max_length=32, blank=True, editable=False)
+	# Indexed by quiz_owner_created_idx, which starts with owner
+	owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='quizzes', db_index=False)
+	# Placeholder quiz created when generation failed; reused for repeated failures of the same video
+	is_dummy = models.BooleanField(default=False, editable=False)
+	# Gemini token accounting of the request that generated the quiz
+	gemini_calls = models.PositiveIntegerField(default=0, editable=False)
+	prompt_tokens = models.PositiveIntegerField(default=0, editable=False)
+	output_tokens = models.PositiveIntegerField(default=0, editable=False)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['owner', 'created_at', 'id'], name='quiz_owner_created_idx'),
+			models.Index(fields=['created_at'], name='quiz_created_idx'),
+			models.Index(fields=['video_id'], name='quiz_video_id_idx'),
+		]
+		constraints = [
+			# At most one dummy quiz per user and video (see create_dummy_quiz)
+			models.UniqueConstraint(
+				fields=['owner', 'video_id'],
+				condition=models.Q(is_dummy=True) & ~models.Q(video_id=''),
+				name='quiz_unique_dummy_per_video',
+			),
+			# URLs without a parsable video id are matched by URL instead
+			models.UniqueConstraint(
+				fields=['owner', 'video_url'],
+				condition=models.Q(is_dummy=True, video_id=''),
+				name='quiz_unique_dummy_per_url',
+			),
+		]
+
+	def save(self, *args, **kwargs):
+		"""
+		Keeps the normalized YouTube video id in sync with video_url.
+		"""
+		self.video_id = extract_video_id(self.video_url) or ''
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None and 'video_url' in update_fields:
+			kwargs['update_fields'] = set(update_fields) | {'video_id'}
+		super().save(*args, **kwargs)
 
 	def __str__(self):
 		return self.title
@@ -29,6 +71,102 @@ class Question(models.Model):
 	created_at = models.DateTimeField(default=timezone.now, editable=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['created_at'], name='question_created_idx'),
+		]
+
 	def __str__(self):
 		return self.question_title
 from django.db import models
+
+class QuizJob(models.Model):
+	"""
+	Model for a background quiz-generation job.
+	Tracks status, current pipeline stage, progress and the resulting quiz.
+	"""
+	class Status(models.TextChoices):
+		PENDING = 'pending', 'Pending'
+		RUNNING = 'running', 'Running'
+		SUCCEEDED = 'succeeded', 'Succeeded'
+		FAILED = 'failed', 'Failed'
+
+	owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='quiz_jobs')
+	video_url = models.URLField()
+	status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+	stage = models.CharField(max_length=20, default='queued')
+	progress = models.PositiveSmallIntegerField(default=0)
+	error = models.TextField(blank=True)
+	quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+	created_at = models.DateTimeField(default=timezone.now, editable=True)
+	updated_at = models.DateTimeField(auto_now=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['status', 'created_at', 'id'], name='quizjob_status_created_idx'),
+		]
+
+	def __str__(self):
+		return f"Job {self.pk} ({self.status})"
+
+class TranscriptCacheEntry(models.Model):
+	"""
+	Model for a cached video transcript.
+	Keyed by YouTube video id and Whisper model name, so repeated submissions
+	of the same video skip download and transcription.
+	"""
+	video_id = models.CharField(max_length=32)
+	model_name = models.CharField(max_length=50)
+	transcript = models.TextField()
+	hits = models.PositiveIntegerField(default=0)
+	created_at = models.DateTimeField(default=timezone.now, editable=True)
+	last_used_at = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['video_id', 'model_name'], name='unique_transcript_per_model'),
+		]
+		indexes = [
+			models.Index(fields=['last_used_at'], name='transcript_last_used_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.video_id} ({self.model_name})"
+
+class GeminiResponseCacheEntry(models.Model):
+	"""
+	Model for a cached Gemini response.
+	Keyed by a hash of model, prompt template version and prompt inputs
+	(e.g. the transcript), so identical requests are not sent to Gemini again.
+	"""
+	key = models.CharField(max_length=64, unique=True)
+	model_name = models.CharField(max_length=50)
+	template_version = models.CharField(max_length=50)
+	response = models.TextField()
+	hits = models.PositiveIntegerField(default=0)
+	created_at = models.DateTimeField(default=timezone.now, editable=True)
+	last_used_at = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['last_used_at'], name='gemini_cache_last_used_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.template_version} ({self.model_name}) {self.key[:12]}"
+
+class PipelineLock(models.Model):
+	"""
+	Model for a cross-process lock on a quiz pipeline run.
+	One row per key (e.g. a YouTube video id) exists while a process runs the
+	pipeline for it; the lock expires at expires_at if the process dies.
+	"""
+	key = models.CharField(max_length=64, unique=True)
+	owner = models.CharField(max_length=100)
+	acquired_at = models.DateTimeField(default=timezone.now)
+	expires_at = models.DateTimeField()
+
+	def __str__(self):
+		return f"{self.key} ({self.owner})"
@@ -0,0 +1,99 @@
+import json
+import os
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quizzly_app.utils import gemini
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+
+FAKE_QUESTIONS = [
+    {
+        "question_title": f"Frage {i + 1}",
+        "question_options": ["A", "B", "C", "D"],
+        "answer": "A",
+    }
+    for i in range(10)
+]
+
+
+class AsyncCreateQuizTests(TestCase):
+    """
+    Test suite for the async quiz creation endpoint.
+    Covers the awaited pipeline, error fallback, authentication and validation.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with an access token cookie and a Gemini stand-in server.
+        """
+        self.user = get_user_model().objects.create_user(username='asyncuser', password='asyncpass123')
+        self.async_client.cookies['access_token'] = str(AccessToken.for_user(self.user))
+        self.url = reverse('create_quiz_async')
+        self.server = GeminiStubServer(reply=json.dumps(FAKE_QUESTIONS)).start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+
+    async def post(self, data):
+        """
+        Posts JSON data to the async endpoint.
+        """
+        return await self.async_client.post(self.url, data, content_type='application/json')
+
+    async def test_create_quiz_success(self):
+        """
+        Test: The async endpoint runs the pipeline and returns the created quiz.
+        """
+        with patch('quizzly_app.api.helpers._transcribe', return_value="Transkript"):
+            response = await self.post({"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"})
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(len(data['questions']), 10)
+        self.assertIn("Transkript", self.server.prompts[0])
+
+    async def test_create_quiz_uses_transcript_cache(self):
+        """
+        Test: The transcript stored by the first request is reused without transcribing again.
+        """
+        with patch('quizzly_app.api.helpers._transcribe', return_value="Transkript") as transcribe:
+            await self.post({"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"})
+            response = await self.post({"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(transcribe.call_count, 1)
+
+    async def test_create_quiz_error_returns_dummy(self):
+        """
+        Test: A failing stage returns a dummy quiz with the stage in the error detail.
+        """
+        with override_settings(QUIZLY_STREAMING_TRANSCRIPTION=False), \
+                patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', return_value="audio.mp3"), \
+                patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', side_effect=Exception('Whisper failed!')):
+            response = await self.post({"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('Transcription failed', response.json()['detail'])
+        self.assertIn('dummy_quiz', response.json())
+
+    async def test_invalid_url(self):
+        """
+        Test: An invalid YouTube URL returns 400.
+        """
+        response = await self.post({"url": "not_a_youtube_url"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_unauthenticated(self):
+        """
+        Test: Requests without a valid token return 401.
+        """
+        self.async_client.cookies.clear()
+        response = await self.post({"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"})
+        self.assertEqual(response.status_code, 401)
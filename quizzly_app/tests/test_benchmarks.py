@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from quizzly_app.models import Question, Quiz
+from quizzly_app.utils.benchmarks import compare_reports, flatten_report, seed_quizzes, summarize_latencies
+
+BASELINE = {
+    "list": [{"quizzes": 10, "p95_ms": 10.0, "queries": 3}, {"quizzes": 100, "p95_ms": 50.0, "queries": 3}],
+    "create": {"requests": 20, "requests_per_second": 10.0, "p95_ms": 400.0},
+}
+
+
+class BenchmarkReportTests(SimpleTestCase):
+    """
+    Test suite for summarizing and comparing benchmark reports.
+    """
+
+    def test_summarize_latencies(self):
+        """
+        Test: Latencies are summarized as nearest-rank percentiles in milliseconds.
+        """
+        summary = summarize_latencies([i / 1000 for i in range(1, 101)])
+        self.assertEqual(summary, {"p50_ms": 50.0, "p95_ms": 95.0, "mean_ms": 50.5})
+
+    def test_flatten_report(self):
+        """
+        Test: List entries are addressed by their data size instead of their position.
+        """
+        metrics = flatten_report(BASELINE)
+        self.assertEqual(metrics["list[quizzes=100].p95_ms"], 50.0)
+        self.assertEqual(metrics["create.requests_per_second"], 10.0)
+        self.assertNotIn("create.requests", metrics)
+
+    def test_compare_reports(self):
+        """
+        Test: Slower latencies and lower throughput beyond the tolerance are regressions.
+        """
+        current = json.loads(json.dumps(BASELINE))
+        current["list"][1]["p95_ms"] = 70.0
+        current["list"][0]["p95_ms"] = 5.0
+        current["create"]["requests_per_second"] = 7.0
+        regressions = compare_reports(BASELINE, current, tolerance=0.2)
+        self.assertEqual(
+            [metric for metric, *_ in regressions],
+            ["create.requests_per_second", "list[quizzes=100].p95_ms"],
+        )
+        self.assertEqual(compare_reports(BASELINE, BASELINE), [])
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    """
+    Test suite for the benchmark management command.
+    """
+
+    def test_seed_quizzes(self):
+        """
+        Test: Seeding creates N users with M quizzes of 10 questions each.
+        """
+        users = seed_quizzes(2, 3)
+        self.assertEqual(Quiz.objects.filter(owner__in=users).count(), 6)
+        self.assertEqual(Question.objects.filter(quiz__owner=users[0]).count(), 30)
+
+    def test_benchmark_writes_report_and_cleans_up(self):
+        """
+        Test: The list and create suites run hermetically, write a JSON report and delete their data.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "report.json")
+            call_command(
+                'benchmark', users=2, quizzes='2,5', repeat=2, requests=3, workers=1, live_db=True,
+                transcription_latency=0, gemini_latency=0, output=output, stdout=StringIO(),
+            )
+            with open(output) as f:
+                report = json.load(f)
+            self.assertEqual([entry["quizzes"] for entry in report["list"]], [2, 5])
+            self.assertEqual(report["create"]["errors"], 0)
+            self.assertFalse(get_user_model().objects.exists())
+
+            refresh_output = os.path.join(tmp_dir, "refresh.json")
+            call_command('benchmark', suites='refresh', revoked=50, repeat=2, live_db=True,
+                         output=refresh_output, stdout=StringIO())
+            with open(refresh_output) as f:
+                report = json.load(f)
+            self.assertEqual(set(report["refresh"]), {"revoked", "filter", "database"})
+            self.assertFalse(OutstandingToken.objects.exists())
+
+            with self.assertRaises(CommandError):
+                call_command('benchmark', suites='list', users=2, quizzes='2', repeat=2, live_db=True,
+                             compare=output, tolerance=-1, stdout=StringIO())
+
+    def test_benchmark_uses_throwaway_database(self):
+        """
+        Test: Without --live-db the database suites run between setting up and tearing down a test database.
+        """
+        with patch('quizzly_app.utils.benchmarks.setup_databases', return_value='old-config') as setup, \
+                patch('quizzly_app.utils.benchmarks.teardown_databases') as teardown:
+            call_command('benchmark', suites='list', users=1, quizzes='1', repeat=1, stdout=StringIO())
+        setup.assert_called_once()
+        teardown.assert_called_once_with('old-config', verbosity=0)
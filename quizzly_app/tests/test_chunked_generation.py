@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import re
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from quizzly_app.api.helpers import create_quiz_from_youtube
+from quizzly_app.models import Quiz
+from quizzly_app.utils import gemini
+from quizzly_app.utils.chunked_generation import (
+    agenerate_quiz_chunked,
+    count_tokens,
+    generate_quiz_chunked,
+    select_questions,
+    should_chunk,
+    split_transcript,
+)
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+
+CHUNK_RE = re.compile(r'\((\d+) von (\d+)\)')
+
+TRANSCRIPT = " ".join(
+    f"Im Kapitel {i} geht es um das Thema Nummer {i} und seine Bedeutung für die Geschichte." for i in range(60)
+)
+
+
+def make_question(title):
+    return {"question_title": title, "question_options": ["A", "B", "C", "D"], "answer": "A"}
+
+
+def chunk_reply(prompt):
+    """
+    Answers a chunk prompt with questions naming the chunk, or a full quiz for a single prompt.
+    """
+    match = CHUNK_RE.search(prompt)
+    chunk = match.group(1) if match else "0"
+    return json.dumps([make_question(f"Abschnitt {chunk} Frage {topic}") for topic in ("Ort", "Zeit", "Person", "Grund")])
+
+
+class TranscriptSplittingTests(SimpleTestCase):
+    """
+    Test suite for token counting and transcript splitting.
+    """
+
+    def test_chunks_respect_token_budget(self):
+        """
+        Test: Every chunk fits the budget and chunks end at sentence boundaries.
+        """
+        chunks = split_transcript(TRANSCRIPT, 100)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 100)
+            self.assertTrue(chunk.endswith("."))
+        self.assertEqual(" ".join(chunks), TRANSCRIPT)
+
+    def test_long_sentence_is_cut(self):
+        """
+        Test: A sentence longer than the budget is cut at token boundaries.
+        """
+        sentence = " ".join(f"Wort{i}" for i in range(200))
+        chunks = split_transcript(sentence, 50)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), sentence)
+
+    def test_short_transcript_is_not_chunked(self):
+        """
+        Test: Chunking is only used for long transcripts and when enabled.
+        """
+        with override_settings(QUIZLY_CHUNKED_GENERATION=True, QUIZLY_CHUNK_MIN_TOKENS=100):
+            self.assertFalse(should_chunk("Ein kurzer Satz."))
+            self.assertTrue(should_chunk(TRANSCRIPT))
+        with override_settings(QUIZLY_CHUNKED_GENERATION=False):
+            self.assertFalse(should_chunk(TRANSCRIPT))
+
+
+class SelectQuestionsTests(SimpleTestCase):
+    """
+    Test suite for deduplicating and selecting the final questions.
+    """
+
+    def test_near_duplicates_are_removed(self):
+        """
+        Test: Titles that differ only in case or punctuation count as duplicates.
+        """
+        groups = [
+            [make_question("Wann wurde Rom gegründet?")],
+            [make_question("wann wurde rom gegründet"), make_question("Wer gründete Rom?")],
+        ]
+        titles = [q["question_title"] for q in select_questions(groups)]
+        self.assertEqual(titles, ["Wann wurde Rom gegründet?", "Wer gründete Rom?"])
+
+    def test_round_robin_across_chunks(self):
+        """
+        Test: The selection takes questions from every chunk before a second one from any chunk.
+        """
+        topics = ["Rom", "Athen", "Sparta", "Karthago"]
+        groups = [[make_question(f"{topic} Frage {n}") for n in range(5)] for topic in topics]
+        selected = select_questions(groups, count=6)
+        self.assertEqual(
+            [q["question_title"] for q in selected[:4]],
+            ["Rom Frage 0", "Athen Frage 0", "Sparta Frage 0", "Karthago Frage 0"],
+        )
+        self.assertEqual(len(selected), 6)
+
+
+@override_settings(QUIZLY_CHUNK_TOKENS=200, QUIZLY_CHUNK_WORKERS=3, QUIZLY_GEMINI_MAX_RETRIES=0,
+                   QUIZLY_GEMINI_CACHE=False)
+class ChunkedGenerationTests(SimpleTestCase):
+    """
+    Test suite for map-reduce generation against a Gemini stand-in server.
+    """
+
+    def setUp(self):
+        self.server = GeminiStubServer(reply=chunk_reply).start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+
+    def test_one_request_per_chunk(self):
+        """
+        Test: Each chunk is sent once and the result covers all chunks.
+        """
+        chunks = split_transcript(TRANSCRIPT, 200)
+        usage = gemini.TokenUsage()
+        questions = generate_quiz_chunked(TRANSCRIPT, usage=usage)
+        self.assertEqual(self.server.requests, len(chunks))
+        self.assertEqual(len(questions), 10)
+        covered = {q["question_title"].split()[1] for q in questions}
+        self.assertEqual(covered, {str(n) for n in range(1, min(len(chunks), 10) + 1)})
+        self.assertEqual(usage.calls, len(chunks))
+        self.assertGreater(usage.prompt_tokens, 0)
+
+    def test_failed_chunk_is_skipped(self):
+        """
+        Test: A failing chunk does not fail the whole quiz.
+        """
+        self.server.status = lambda number: 503 if number == 1 else 200
+        questions = generate_quiz_chunked(TRANSCRIPT)
+        self.assertEqual(len(questions), 10)
+
+    def test_async_variant(self):
+        """
+        Test: The async variant sends the same requests.
+        """
+        chunks = split_transcript(TRANSCRIPT, 200)
+        questions = asyncio.run(agenerate_quiz_chunked(TRANSCRIPT))
+        self.assertEqual(self.server.requests, len(chunks))
+        self.assertEqual(len(questions), 10)
+
+
+class QuizTokenAccountingTests(TestCase):
+    """
+    Test suite for the token usage stored on generated quizzes.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='tokenuser', password='tokenpass123')
+        self.server = GeminiStubServer(reply=chunk_reply).start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+
+    @override_settings(QUIZLY_CHUNKED_GENERATION=True, QUIZLY_CHUNK_MIN_TOKENS=100, QUIZLY_CHUNK_TOKENS=200)
+    def test_usage_is_stored_on_quiz(self):
+        """
+        Test: The Gemini calls and tokens of the request are saved with the quiz.
+        """
+        with patch('quizzly_app.api.helpers.get_transcript_for_url', return_value=TRANSCRIPT):
+            data = create_quiz_from_youtube("https://www.youtube.com/watch?v=3ohjOltaO6Y", self.user)
+        quiz = Quiz.objects.get(pk=data["id"])
+        self.assertEqual(quiz.gemini_calls, self.server.requests)
+        self.assertGreater(quiz.gemini_calls, 1)
+        self.assertGreater(quiz.prompt_tokens, 0)
+        self.assertGreater(quiz.output_tokens, 0)
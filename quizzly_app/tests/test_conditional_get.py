@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzly_app.models import Question, Quiz
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    Test suite for ETag / Last-Modified support of the quiz list and detail endpoints.
+    Unchanged resources return 304 after a single aggregate query.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with two quizzes of 3 questions each and an authenticated client.
+        """
+        self.user = get_user_model().objects.create_user(username='etaguser', password='etagpass123')
+        self.client.force_authenticate(user=self.user)
+        self.quizzes = []
+        for i in range(2):
+            quiz = Quiz.objects.create(
+                title=f"Quiz {i}", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=self.user
+            )
+            Question.objects.bulk_create([
+                Question(quiz=quiz, question_title=f"Frage {j}", question_options=["A", "B"], answer="A")
+                for j in range(3)
+            ])
+            self.quizzes.append(quiz)
+        self.list_url = reverse('user_quizzes')
+        self.detail_url = reverse('user_quiz_detail', kwargs={'id': self.quizzes[0].id})
+
+    def test_list_not_modified(self):
+        """
+        Test: Repeating the list request with its ETag returns 304 without a body in one query.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('private', response['Cache-Control'])
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_list_if_modified_since_after_delete(self):
+        """
+        Test: The list sends no Last-Modified, so If-Modified-Since never hides a deleted quiz.
+        """
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', response)
+        self.quizzes[1].delete()
+        since = http_date(timezone.now().timestamp() + 60)
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), len(self.quizzes) - 1)
+
+    def test_list_changes_invalidate_etag(self):
+        """
+        Test: Editing a question, deleting a quiz or changing the query yields a new ETag.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+        question = self.quizzes[1].questions.first()
+        question.answer = "B"
+        question.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.quizzes[1].delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = self.client.get(self.list_url, {'fields': 'summary'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(summary.status_code, status.HTTP_200_OK)
+
+    def test_detail_not_modified(self):
+        """
+        Test: The detail endpoint answers 304 in one query without loading questions.
+        """
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_patch_invalidates_etag(self):
+        """
+        Test: After a PATCH the old ETag no longer matches.
+        """
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.patch(self.detail_url, {"title": "Neu"}, format='json')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], "Neu")
+
+    def test_detail_of_other_user_is_forbidden(self):
+        """
+        Test: A matching ETag does not bypass the owner check.
+        """
+        etag = self.client.get(self.detail_url)['ETag']
+        other = get_user_model().objects.create_user(username='etagother', password='otherpass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -2,8 +2,10 @@ from rest_framework.test import APITestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
+from django.test import override_settings
 
 
+@override_settings(QUIZLY_JOB_BACKEND='eager')
 class CreateQuizTests(APITestCase):
     """
     Test suite for the quiz creation API endpoint.
@@ -20,7 +22,8 @@ class CreateQuizTests(APITestCase):
             with patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', side_effect=Exception('Whisper failed!')):
                 data = {"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"}
                 response = self.client.post(self.url, data, format='json')
-                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+                self.assertEqual(response.data['status'], 'failed')
                 self.assertIn('Transcription failed', response.data['detail'])
                 self.assertIn('dummy_quiz', response.data)
                 quiz = response.data['dummy_quiz']
@@ -31,9 +34,13 @@ class CreateQuizTests(APITestCase):
         Test: Quiz creation fails due to yt-dlp error (invalid YouTube ID).
         Expects a dummy quiz in the response.
         """
-        data = {"url": "https://www.youtube.com/watch?v=invalidid"}
-        response = self.client.post(self.url, data, format='json')
-        self.assertEqual(response.status_code, 201)
+        from unittest.mock import patch
+        from yt_dlp.utils import DownloadError
+        error = DownloadError("ERROR: [youtube] invalidid: Video unavailable")
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', side_effect=error):
+            data = {"url": "https://www.youtube.com/watch?v=invalidid"}
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn('dummy_quiz', response.data)
         quiz = response.data['dummy_quiz']
         self.assertIn('title', quiz)
@@ -44,9 +51,13 @@ class CreateQuizTests(APITestCase):
         Test: Quiz creation results in no questions.
         Expects an empty questions list in the serialized quiz.
         """
-        data = {"url": "https://www.youtube.com/watch?v=example"}
-        response = self.client.post(self.url, data, format='json')
-        self.assertEqual(response.status_code, 201)
+        from unittest.mock import patch
+        from yt_dlp.utils import DownloadError
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube',
+                   side_effect=DownloadError("ERROR: [youtube] example: Video unavailable")):
+            data = {"url": "https://www.youtube.com/watch?v=example"}
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn('dummy_quiz', response.data)
         quiz = response.data['dummy_quiz']
         self.assertIn('questions', quiz)
@@ -76,14 +87,27 @@ class CreateQuizTests(APITestCase):
         Checks for all required quiz and question fields in the response.
         Handles both dummy and real quiz cases.
         """
-        data = {"url": "https://www.youtube.com/watch?v=example"}
-        response = self.client.post(self.url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        # Bei Dummy-Quiz liegen die Daten unter 'dummy_quiz', sonst direkt
+        import json
+        import os
+        from unittest.mock import patch
+        from quizzly_app.management.commands.loadtest_create_quiz import FAKE_QUESTIONS
+        from quizzly_app.utils import gemini
+        from quizzly_app.utils.gemini_stub import GeminiStubServer
+        with GeminiStubServer(reply=json.dumps(FAKE_QUESTIONS)) as server, \
+                override_settings(QUIZLY_GEMINI_BASE_URL=server.url, QUIZLY_GEMINI_CACHE=False), \
+                patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'}), \
+                patch('quizzly_app.api.helpers.get_transcript_for_url', return_value="Transkript"):
+            gemini.reset_clients()
+            self.addCleanup(gemini.reset_clients)
+            data = {"url": "https://www.youtube.com/watch?v=example"}
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'succeeded')
+        # Bei Dummy-Quiz liegen die Daten unter 'dummy_quiz', sonst unter 'quiz'
         if 'dummy_quiz' in response.data:
             quiz = response.data['dummy_quiz']
         else:
-            quiz = response.data
+            quiz = response.data['quiz']
         self.assertIn('id', quiz)
         self.assertIn('title', quiz)
         self.assertIn('description', quiz)
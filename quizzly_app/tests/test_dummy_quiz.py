@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from quizzly_app.api.helpers import create_dummy_quiz
+from quizzly_app.models import Question, Quiz
+from quizzly_app.utils.quiz_pipeline import DUMMY_QUESTIONS, dummy_questions
+
+URL = "https://www.youtube.com/watch?v=3ohjOltaO6Y"
+
+
+class DummyQuizTests(TestCase):
+    """
+    Test suite for the dummy quiz fallback.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='dummyuser', password='dummypass123')
+
+    def test_no_external_call(self):
+        """
+        Test: The dummy quiz is built from the template without calling Gemini.
+        """
+        with patch('quizzly_app.utils.gemini.gemini_generate_content', side_effect=AssertionError("Gemini called")):
+            data = create_dummy_quiz(URL, self.user, "Quiz creation failed: Download failed")
+        self.assertEqual(data["detail"], "Quiz creation failed: Download failed")
+        questions = data["dummy_quiz"]["questions"]
+        self.assertEqual(len(questions), 10)
+        self.assertEqual(questions[0]["question_title"], DUMMY_QUESTIONS[0]["question_title"])
+        self.assertTrue(Quiz.objects.get(pk=data["dummy_quiz"]["id"]).is_dummy)
+
+    def test_repeated_failures_share_one_dummy_quiz(self):
+        """
+        Test: Further failures for the same video reuse the dummy quiz and only update the error.
+        """
+        first = create_dummy_quiz(URL, self.user, "Erster Fehler")
+        # Savepoint, lookup, release, update of description/updated_at, questions.
+        with self.assertNumQueries(5):
+            second = create_dummy_quiz("https://youtu.be/3ohjOltaO6Y", self.user, "Zweiter Fehler")
+        self.assertEqual(first["dummy_quiz"]["id"], second["dummy_quiz"]["id"])
+        self.assertEqual(second["dummy_quiz"]["description"], "Zweiter Fehler")
+        self.assertEqual(len(second["dummy_quiz"]["questions"]), 10)
+        self.assertEqual(Quiz.objects.count(), 1)
+        self.assertEqual(Question.objects.count(), 10)
+
+    def test_dummy_quiz_is_per_user_and_video(self):
+        """
+        Test: Other users and other videos get their own dummy quiz.
+        """
+        other = get_user_model().objects.create_user(username='otheruser', password='otherpass123')
+        ids = {
+            create_dummy_quiz(URL, self.user, "Fehler")["dummy_quiz"]["id"],
+            create_dummy_quiz(URL, other, "Fehler")["dummy_quiz"]["id"],
+            create_dummy_quiz("https://www.youtube.com/watch?v=dQw4w9WgXcQ", self.user, "Fehler")["dummy_quiz"]["id"],
+        }
+        self.assertEqual(len(ids), 3)
+
+    def test_second_dummy_quiz_is_rejected(self):
+        """
+        Test: The database rejects a second dummy quiz for the same user and video.
+        """
+        create_dummy_quiz(URL, self.user, "Fehler")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Quiz.objects.create(title="Doppelt", video_url="https://youtu.be/3ohjOltaO6Y", owner=self.user, is_dummy=True)
+        Quiz.objects.create(title="Echt", video_url=URL, owner=self.user)
+        self.assertEqual(Quiz.objects.filter(owner=self.user).count(), 2)
+
+    def test_url_without_video_id_shares_one_dummy_quiz(self):
+        """
+        Test: URLs without a video id are matched by URL, and the database rejects a second dummy quiz for them.
+        """
+        url = "https://example.com/video"
+        first = create_dummy_quiz(url, self.user, "Erster Fehler")
+        second = create_dummy_quiz(url, self.user, "Zweiter Fehler")
+        self.assertEqual(first["dummy_quiz"]["id"], second["dummy_quiz"]["id"])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Quiz.objects.create(title="Doppelt", video_url=url, owner=self.user, is_dummy=True)
+
+    def test_real_quiz_is_not_reused(self):
+        """
+        Test: A generated quiz for the same video is never turned into a dummy quiz.
+        """
+        Quiz.objects.create(title="Echt", video_url=URL, owner=self.user)
+        data = create_dummy_quiz(URL, self.user, "Fehler")
+        self.assertEqual(Quiz.objects.filter(is_dummy=True).count(), 1)
+        self.assertNotEqual(data["dummy_quiz"]["title"], "Echt")
+
+    def test_template_is_not_mutated(self):
+        """
+        Test: Changing returned dummy questions does not change the shared template.
+        """
+        questions = dummy_questions()
+        questions[0]["question_options"].append("X")
+        self.assertEqual(len(DUMMY_QUESTIONS[0]["question_options"]), 4)
@@ -0,0 +1,141 @@
+import json
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quizzly_app.models import GeminiResponseCacheEntry
+from quizzly_app.utils import gemini, gemini_cache
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+from quizzly_app.utils.quiz_pipeline import generate_quiz_with_gemini
+
+QUESTIONS = [
+    {"question_title": f"Frage {i}", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+    for i in range(10)
+]
+
+
+class GeminiResponseCacheTests(TestCase):
+    """
+    Test suite for caching Gemini responses per model, template version and transcript.
+    """
+
+    def setUp(self):
+        """
+        Start a Gemini stand-in server and reset cache statistics.
+        """
+        self.server = GeminiStubServer(reply=json.dumps(QUESTIONS)).start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+        gemini_cache.stats.reset()
+
+    def test_identical_transcript_is_served_from_cache(self):
+        """
+        Test: The second generation for the same transcript does not call Gemini or bill tokens.
+        """
+        self.assertEqual(generate_quiz_with_gemini("Transkript"), QUESTIONS)
+        usage = gemini.TokenUsage()
+        self.assertEqual(generate_quiz_with_gemini("Transkript", usage=usage), QUESTIONS)
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(usage.calls, 0)
+        self.assertEqual(gemini_cache.stats.get('hits'), 1)
+
+    def test_key_depends_on_transcript_template_and_model(self):
+        """
+        Test: Changing any key part yields a different cache key.
+        """
+        key = gemini_cache.cache_key("gemini-2.5-flash", "quiz-v1", "Transkript")
+        self.assertNotEqual(key, gemini_cache.cache_key("gemini-2.5-flash", "quiz-v1", "Anderes Transkript"))
+        self.assertNotEqual(key, gemini_cache.cache_key("gemini-2.5-flash", "quiz-v2", "Transkript"))
+        self.assertNotEqual(key, gemini_cache.cache_key("gemini-2.5-pro", "quiz-v1", "Transkript"))
+
+    def test_unusable_response_is_not_cached(self):
+        """
+        Test: A response without valid questions is not stored, so the next request asks Gemini again.
+        """
+        self.server.reply = "Keine Fragen."
+        generate_quiz_with_gemini("Transkript")
+        generate_quiz_with_gemini("Transkript")
+        self.assertEqual(self.server.requests, 2)
+        self.assertFalse(GeminiResponseCacheEntry.objects.exists())
+
+    @override_settings(QUIZLY_GEMINI_CACHE=False)
+    def test_cache_can_be_disabled(self):
+        """
+        Test: With QUIZLY_GEMINI_CACHE=False every generation calls Gemini.
+        """
+        generate_quiz_with_gemini("Transkript")
+        generate_quiz_with_gemini("Transkript")
+        self.assertEqual(self.server.requests, 2)
+
+    @override_settings(QUIZLY_GEMINI_CACHE_TTL=60)
+    def test_expired_entry_is_a_miss(self):
+        """
+        Test: Entries older than the TTL are deleted on lookup.
+        """
+        generate_quiz_with_gemini("Transkript")
+        GeminiResponseCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        generate_quiz_with_gemini("Transkript")
+        self.assertEqual(self.server.requests, 2)
+
+    @override_settings(QUIZLY_GEMINI_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        """
+        Test: Above the size limit the least recently used entries are evicted.
+        """
+        for n in range(3):
+            gemini_cache.store_response(f"key{n}", "gemini-2.5-flash", "quiz-v1", "[]")
+            GeminiResponseCacheEntry.objects.filter(key=f"key{n}").update(
+                last_used_at=timezone.now() - timedelta(minutes=10 - n)
+            )
+        gemini_cache.evict()
+        self.assertEqual(
+            sorted(GeminiResponseCacheEntry.objects.values_list('key', flat=True)), ["key1", "key2"]
+        )
+
+
+class GeminiCacheCommandTests(TestCase):
+    """
+    Test suite for the gemini_cache management command.
+    """
+
+    def setUp(self):
+        for n, template in enumerate(["quiz-v1", "quiz-v1", "quiz-chunk-v1"]):
+            gemini_cache.store_response(f"key{n}", "gemini-2.5-flash", template, "[]")
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('gemini_cache', *args, stdout=out)
+        return out.getvalue()
+
+    def test_summary(self):
+        """
+        Test: The summary lists entries per template version.
+        """
+        output = self.call()
+        self.assertIn("quiz-v1 / gemini-2.5-flash: 2 entry(s)", output)
+        self.assertIn("Total: 3 entry(s).", output)
+
+    def test_purge_by_template(self):
+        """
+        Test: --purge --template deletes only entries of that template version.
+        """
+        self.assertIn("Deleted 2", self.call('--purge', '--template', 'quiz-v1'))
+        self.assertEqual(list(GeminiResponseCacheEntry.objects.values_list('key', flat=True)), ["key2"])
+
+    def test_list(self):
+        """
+        Test: --list shows the most recently used entries.
+        """
+        self.assertEqual(len(self.call('--list', '2').splitlines()), 2)
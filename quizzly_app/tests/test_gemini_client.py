@@ -0,0 +1,66 @@
+import os
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from quizzly_app.utils import gemini
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+
+
+class GeminiClientPoolTests(SimpleTestCase):
+    """
+    Test suite for the pooled Gemini client.
+    Runs the real client against a local stand-in server.
+    """
+
+    def setUp(self):
+        """
+        Start a stand-in server and point the client pool at it.
+        """
+        self.server = GeminiStubServer(reply="Hallo aus dem Stub").start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url, QUIZLY_GEMINI_MAX_CONCURRENCY=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+
+    def test_client_is_reused(self):
+        """
+        Test: Repeated calls share one client and one keep-alive connection.
+        """
+        for _ in range(3):
+            self.assertEqual(gemini.gemini_generate_content("Frage?"), "Hallo aus dem Stub")
+        self.assertIs(gemini.get_client(), gemini.get_client())
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_concurrency_is_limited(self):
+        """
+        Test: No more than QUIZLY_GEMINI_MAX_CONCURRENCY calls run at the same time.
+        """
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def reply(prompt):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            threading.Event().wait(0.05)
+            with lock:
+                active.pop()
+            return "ok"
+
+        self.server.reply = reply
+        threads = [threading.Thread(target=gemini.gemini_generate_content, args=("x",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.requests, 6)
+        self.assertLessEqual(max(peak), 2)
@@ -0,0 +1,192 @@
+import os
+from unittest.mock import patch
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from google.genai import errors
+
+from quizzly_app.api.helpers import create_dummy_quiz
+from quizzly_app.utils import gemini
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+from quizzly_app.utils.resilience import CircuitBreaker, CircuitOpenError
+
+RESILIENCE_SETTINGS = dict(
+    QUIZLY_GEMINI_MAX_RETRIES=2,
+    QUIZLY_GEMINI_RETRY_BASE_DELAY=0.01,
+    QUIZLY_GEMINI_RETRY_MAX_DELAY=0.02,
+    QUIZLY_GEMINI_BREAKER_MIN_CALLS=3,
+    QUIZLY_GEMINI_BREAKER_FAILURE_RATE=0.5,
+    QUIZLY_GEMINI_BREAKER_RESET_SECONDS=60,
+)
+
+
+class StubServerMixin:
+    """
+    Starts a Gemini stand-in server and points a fresh client pool at it.
+    """
+
+    def start_stub(self, **settings):
+        self.server = GeminiStubServer(reply="ok").start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(QUIZLY_GEMINI_BASE_URL=self.server.url, **{**RESILIENCE_SETTINGS, **settings})
+        override.enable()
+        self.addCleanup(override.disable)
+        env = patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        gemini.reset_clients()
+        self.addCleanup(gemini.reset_clients)
+        gemini.stats.reset()
+
+
+class GeminiResilienceTests(StubServerMixin, SimpleTestCase):
+    """
+    Test suite for retries, deadlines and the circuit breaker around Gemini calls.
+    """
+
+    def setUp(self):
+        self.start_stub()
+
+    def test_transient_errors_are_retried(self):
+        """
+        Test: 503 responses are retried until the call succeeds.
+        """
+        self.server.status = lambda number: 503 if number <= 2 else 200
+        self.assertEqual(gemini.gemini_generate_content("x"), "ok")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(gemini.stats.get('retries'), 2)
+        self.assertEqual(gemini.stats.get('successes'), 1)
+
+    def test_retries_are_limited(self):
+        """
+        Test: After QUIZLY_GEMINI_MAX_RETRIES retries the error is raised.
+        """
+        self.server.status = 503
+        with self.assertRaises(errors.ServerError):
+            gemini.gemini_generate_content("x")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(gemini.stats.get('failures'), 1)
+
+    def test_client_errors_are_not_retried(self):
+        """
+        Test: A 400 response is raised immediately and does not count against the breaker.
+        """
+        self.server.status = 400
+        for _ in range(3):
+            with self.assertRaises(errors.ClientError):
+                gemini.gemini_generate_content("x")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(gemini.get_breaker().state, CircuitBreaker.CLOSED)
+
+    @override_settings(QUIZLY_GEMINI_TIMEOUT_SECONDS=0.1, QUIZLY_GEMINI_MAX_RETRIES=0)
+    def test_timeout(self):
+        """
+        Test: A slow response is aborted after QUIZLY_GEMINI_TIMEOUT_SECONDS.
+        """
+        self.server.latency = 0.5
+        with self.assertRaises(httpx.TimeoutException):
+            gemini.gemini_generate_content("x")
+        self.assertEqual(gemini.stats.get('timeouts'), 1)
+
+    @override_settings(QUIZLY_GEMINI_MAX_RETRIES=0)
+    def test_breaker_opens_and_fails_fast(self):
+        """
+        Test: Once most recent calls failed, further calls are rejected without a request.
+        """
+        self.server.status = 503
+        for _ in range(3):
+            with self.assertRaises(errors.ServerError):
+                gemini.gemini_generate_content("x")
+        with self.assertRaises(CircuitOpenError):
+            gemini.gemini_generate_content("x")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(gemini.stats.get('short_circuits'), 1)
+
+    @override_settings(QUIZLY_GEMINI_MAX_RETRIES=0)
+    def test_async_calls_share_the_breaker(self):
+        """
+        Test: The async client is retried and short-circuited like the sync one.
+        """
+        import asyncio
+        self.server.status = 503
+        for _ in range(3):
+            with self.assertRaises(errors.ServerError):
+                gemini.gemini_generate_content("x")
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(gemini.agemini_generate_content("x"))
+        self.assertEqual(self.server.requests, 3)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """
+    Test suite for the CircuitBreaker state machine.
+    """
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker("Test", failure_rate=0.5, min_calls=4, window_seconds=10,
+                                      reset_seconds=5, clock=lambda: self.now)
+
+    def test_needs_min_calls(self):
+        """
+        Test: A few failures below min_calls keep the breaker closed.
+        """
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_old_outcomes_leave_the_window(self):
+        """
+        Test: Failures older than window_seconds are not counted.
+        """
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now = 20
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial(self):
+        """
+        Test: After reset_seconds one trial call is allowed; its success closes the breaker.
+        """
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.assertRaises(CircuitOpenError, self.breaker.before_call)
+        self.now = 6
+        self.breaker.before_call()
+        self.assertRaises(CircuitOpenError, self.breaker.before_call)
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_failure_reopens(self):
+        """
+        Test: A failed trial call opens the breaker again.
+        """
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.now = 6
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+
+class DummyQuizBreakerTests(StubServerMixin, TestCase):
+    """
+    Test suite for the dummy quiz fallback while Gemini is unavailable.
+    """
+
+    def setUp(self):
+        self.start_stub()
+        self.user = get_user_model().objects.create_user(username='breakeruser', password='pw123456')
+
+    def test_dummy_quiz_skips_gemini_when_open(self):
+        """
+        Test: With an open breaker the dummy quiz is created without calling Gemini.
+        """
+        breaker = gemini.get_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        data = create_dummy_quiz("https://www.youtube.com/watch?v=3ohjOltaO6Y", self.user, "Quiz creation failed")
+        self.assertEqual(len(data['dummy_quiz']['questions']), 10)
+        self.assertEqual(self.server.requests, 0)
@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from quizzly_app.api.helpers import acreate_quiz_from_youtube, create_quiz_from_youtube
+from quizzly_app.utils import gemini, metrics
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+from quizzly_app.utils.quiz_pipeline import _audio_conversion_hook
+from quizzly_app.utils.scratch import ScratchSpace
+from quizzly_app.utils.stages import PipelineStageError, pipeline_stage
+
+QUESTIONS = [
+    {"question_title": f"Frage {i}", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+    for i in range(10)
+]
+
+
+@override_settings(QUIZLY_METRICS=True)
+class SpanTests(SimpleTestCase):
+    """
+    Test suite for timing pipeline steps.
+    """
+
+    def setUp(self):
+        metrics.steps.reset()
+
+    def test_span_records_duration(self):
+        """
+        Test: A span adds one observation to the step's histogram.
+        """
+        with metrics.span("download"):
+            self.assertEqual(metrics.steps.snapshot()["in_flight"]["download"], 1)
+        snapshot = metrics.steps.snapshot()
+        self.assertEqual(snapshot["histograms"]["download"]["count"], 1)
+        self.assertEqual(snapshot["in_flight"]["download"], 0)
+        self.assertEqual(snapshot["errors"], {})
+
+    def test_pipeline_stage_counts_errors(self):
+        """
+        Test: A failing pipeline stage is timed and counted as an error of that stage.
+        """
+        with self.assertRaises(PipelineStageError):
+            with pipeline_stage("transcription"):
+                raise RuntimeError("Whisper failed!")
+        snapshot = metrics.steps.snapshot()
+        self.assertEqual(snapshot["errors"], {"transcription": 1})
+        self.assertEqual(snapshot["histograms"]["transcription"]["count"], 1)
+
+    def test_audio_conversion_hook(self):
+        """
+        Test: The yt-dlp postprocessor hook records the FFmpeg conversion time.
+        """
+        hook = _audio_conversion_hook()
+        hook({"status": "started", "postprocessor": "FFmpegExtractAudio"})
+        hook({"status": "finished", "postprocessor": "FFmpegExtractAudio"})
+        hook({"status": "finished", "postprocessor": "MoveFiles"})
+        self.assertEqual(metrics.steps.snapshot()["histograms"]["audio_conversion"]["count"], 1)
+
+    @override_settings(QUIZLY_METRICS=False)
+    def test_disabled_records_nothing(self):
+        """
+        Test: Without QUIZLY_METRICS spans are not recorded.
+        """
+        with metrics.span("download"):
+            pass
+        self.assertEqual(metrics.steps.snapshot()["histograms"], {})
+
+    def test_render_histogram(self):
+        """
+        Test: Histograms are rendered with cumulative buckets, sum and count.
+        """
+        metrics.observe("download", 0.3)
+        metrics.observe("download", 7)
+        text = metrics.render()
+        self.assertIn('quizly_pipeline_step_duration_seconds_bucket{step="download",le="0.25"} 0', text)
+        self.assertIn('quizly_pipeline_step_duration_seconds_bucket{step="download",le="0.5"} 1', text)
+        self.assertIn('quizly_pipeline_step_duration_seconds_bucket{step="download",le="+Inf"} 2', text)
+        self.assertIn('quizly_pipeline_step_duration_seconds_count{step="download"} 2', text)
+        self.assertIn('quizly_gemini_calls_total', text)
+
+    def test_render_does_not_create_scratch_space(self):
+        """
+        Test: Scratch gauges are only rendered once the scratch space exists; rendering never creates it.
+        """
+        space = ScratchSpace(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, space.root, ignore_errors=True)
+        with patch('quizzly_app.utils.scratch._scratch_space', None), \
+                patch('quizzly_app.utils.scratch.get_scratch_space', side_effect=AssertionError("created")):
+            self.assertNotIn('quizly_scratch_usage_bytes', metrics.render())
+        with patch('quizzly_app.utils.scratch._scratch_space', space):
+            self.assertIn('quizly_scratch_usage_bytes', metrics.render())
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    Test suite for the /metrics endpoint.
+    """
+
+    def setUp(self):
+        metrics.steps.reset()
+        self.url = reverse('metrics')
+
+    def test_disabled_returns_404(self):
+        """
+        Test: The endpoint does not exist while metrics are disabled.
+        """
+        with override_settings(QUIZLY_METRICS=False):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(QUIZLY_METRICS=True, QUIZLY_METRICS_TOKEN="geheim")
+    def test_token_required(self):
+        """
+        Test: With QUIZLY_METRICS_TOKEN set, scrapers must send it as Bearer token.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer geheim")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+
+    @override_settings(QUIZLY_METRICS=True, QUIZLY_METRICS_TOKEN=None)
+    def test_pipeline_steps_are_exported(self):
+        """
+        Test: A quiz generation shows up as generation, Gemini call, parse and saving spans.
+        """
+        user = get_user_model().objects.create_user(username='metricsuser', password='metricspass123')
+        with GeminiStubServer(reply=json.dumps(QUESTIONS)) as server, \
+                override_settings(QUIZLY_GEMINI_BASE_URL=server.url), \
+                patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'}), \
+                patch('quizzly_app.api.helpers.get_transcript_for_url', return_value="Transkript"):
+            gemini.reset_clients()
+            self.addCleanup(gemini.reset_clients)
+            create_quiz_from_youtube("https://www.youtube.com/watch?v=3ohjOltaO6Y", user)
+        text = self.client.get(self.url).content.decode()
+        for step in ("generation", "gemini_call", "parse", "saving"):
+            self.assertIn(f'quizly_pipeline_step_duration_seconds_count{{step="{step}"}} 1', text)
+
+    @override_settings(QUIZLY_METRICS=True, QUIZLY_METRICS_TOKEN=None, QUIZLY_STREAMING_TRANSCRIPTION=False)
+    def test_async_pipeline_records_each_step_once(self):
+        """
+        Test: The async pipeline records download and transcription once each.
+        """
+        user = get_user_model().objects.create_user(username='asyncmetrics', password='metricspass123')
+        with GeminiStubServer(reply=json.dumps(QUESTIONS)) as server, \
+                override_settings(QUIZLY_GEMINI_BASE_URL=server.url), \
+                patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'}), \
+                patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', return_value="audio.mp3"), \
+                patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', return_value="Transkript"):
+            gemini.reset_clients()
+            self.addCleanup(gemini.reset_clients)
+            async_to_sync(acreate_quiz_from_youtube)("https://www.youtube.com/watch?v=3ohjOltaO6Y", user)
+        histograms = metrics.steps.snapshot()["histograms"]
+        for step in ("download", "transcription", "saving"):
+            self.assertEqual(histograms[step]["count"], 1, step)
+        self.assertNotIn("db_write", histograms)
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from quizzly_app.management.commands.benchmark_transcription import synthetic_audio
+from quizzly_app.utils import parallel_transcription, quiz_pipeline
+from quizzly_app.utils.parallel_transcription import SAMPLE_RATE, find_split_points, split_audio
+
+
+class SilenceSplitTests(SimpleTestCase):
+    """
+    Test suite for splitting long audio at silence boundaries.
+    """
+
+    def test_splits_land_in_silence(self):
+        """
+        Test: Split points are moved into the nearest pause.
+        """
+        audio = np.full(60 * SAMPLE_RATE, 0.5, dtype=np.float32)
+        for pause in (18, 41):
+            audio[pause * SAMPLE_RATE:(pause + 1) * SAMPLE_RATE] = 0
+        splits = find_split_points(audio, segment_seconds=20, search_seconds=5)
+        self.assertEqual(len(splits), 2)
+        for split, pause in zip(splits, (18, 41)):
+            self.assertTrue(pause * SAMPLE_RATE <= split < (pause + 1) * SAMPLE_RATE, split)
+
+    def test_segments_cover_audio_in_order(self):
+        """
+        Test: The segments concatenate back to the original audio.
+        """
+        audio = synthetic_audio(95)
+        segments = split_audio(audio, 20)
+        self.assertGreaterEqual(len(segments), 4)
+        np.testing.assert_array_equal(np.concatenate(segments), audio)
+
+    def test_short_audio_is_not_split(self):
+        """
+        Test: Audio shorter than one segment stays in one piece.
+        """
+        audio = synthetic_audio(10)
+        self.assertEqual(len(split_audio(audio, 20)), 1)
+
+
+class LongAudioModeTests(SimpleTestCase):
+    """
+    Test suite for the long-audio switch in transcribe_audio.
+    """
+
+    @override_settings(QUIZLY_LONG_AUDIO_TRANSCRIPTION=True, QUIZLY_LONG_AUDIO_MIN_SECONDS=60)
+    def test_long_audio_uses_parallel_mode(self):
+        """
+        Test: Audio above the threshold is transcribed in parallel segments.
+        """
+        audio = np.zeros(120 * SAMPLE_RATE, dtype=np.float32)
+        with patch('whisper.audio.load_audio', return_value=audio):
+            with patch('quizzly_app.utils.parallel_transcription.transcribe_long_audio', return_value="lang") as long:
+                self.assertEqual(quiz_pipeline.transcribe_audio("talk.mp3"), "lang")
+        long.assert_called_once()
+
+
+class WorkerPoolTests(SimpleTestCase):
+    """
+    Test suite for the process-wide worker pool of the long-audio mode.
+    """
+
+    def setUp(self):
+        self.addCleanup(parallel_transcription.shutdown_pool)
+        self.addCleanup(setattr, parallel_transcription, '_worker_model', None)
+
+    def test_pool_is_reused(self):
+        """
+        Test: Consecutive transcriptions share one pool; another size or a shutdown replaces it.
+        """
+        pool = parallel_transcription.get_pool(2)
+        self.assertIs(parallel_transcription.get_pool(2), pool)
+        resized = parallel_transcription.get_pool(3)
+        self.assertIsNot(resized, pool)
+        parallel_transcription.shutdown_pool()
+        self.assertIsNot(parallel_transcription.get_pool(3), resized)
+
+    def test_worker_loads_model_once(self):
+        """
+        Test: A worker loads its model for the first segment only and replaces it for another model.
+        """
+        model = MagicMock()
+        model.transcribe.return_value = {"text": " Hallo "}
+        segment = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        with patch('whisper.load_model', return_value=model) as load_model:
+            for _ in range(3):
+                self.assertEqual(parallel_transcription._transcribe_segment(("tiny", segment)), "Hallo")
+            self.assertEqual(load_model.call_count, 1)
+            parallel_transcription._transcribe_segment(("base", segment))
+        self.assertEqual([call.args[0] for call in load_model.call_args_list], ["tiny", "base"])
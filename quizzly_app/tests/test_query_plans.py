@@ -0,0 +1,100 @@
+import re
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.test import TestCase
+from django.utils import timezone
+
+from quizzly_app.models import Quiz, Question, QuizJob, TranscriptCacheEntry
+
+
+FULL_SCAN_RE = re.compile(r'\bSCAN (quizzly_app_\w+)(?! USING)')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "Query plans are checked on SQLite only.")
+class HotQueryPlanTests(TestCase):
+    """
+    Regression tests for the query plans of the hot API and admin queries.
+    Fails if one of them falls back to a full table scan or an extra sort.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with a quiz and a question so all tables are populated.
+        """
+        self.user = get_user_model().objects.create_user(username='planuser', password='planpass123')
+        self.quiz = Quiz.objects.create(
+            title="Quiz", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=self.user
+        )
+        Question.objects.create(quiz=self.quiz, question_title="Frage", question_options=["A"], answer="A")
+
+    def assertUsesIndex(self, queryset, allow_sort=False):
+        """
+        Asserts that the query plan of the queryset has no full table scan
+        (and, unless allowed, no temporary sort).
+        """
+        plan = queryset.explain()
+        self.assertIsNone(FULL_SCAN_RE.search(plan), plan)
+        if not allow_sort:
+            self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_quiz_list(self):
+        """
+        Test: The quiz list filters by owner and orders by the index.
+        """
+        self.assertUsesIndex(Quiz.objects.filter(owner=self.user).order_by('-created_at', '-id'))
+
+    def test_quiz_list_cursor_page(self):
+        """
+        Test: A keyset page seeks into the (owner, created_at, id) index.
+        """
+        created_at = self.quiz.created_at
+        queryset = Quiz.objects.filter(owner=self.user).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=self.quiz.id)
+        ).order_by('-created_at', '-id')
+        self.assertUsesIndex(queryset)
+
+    def test_question_prefetch(self):
+        """
+        Test: Prefetching questions looks them up by quiz.
+        """
+        self.assertUsesIndex(Question.objects.filter(quiz_id__in=[self.quiz.id]))
+
+    def test_quiz_by_video_id(self):
+        """
+        Test: Quizzes can be looked up by normalized video id.
+        """
+        self.assertEqual(self.quiz.video_id, "3ohjOltaO6Y")
+        self.assertUsesIndex(Quiz.objects.filter(video_id="3ohjOltaO6Y"))
+
+    def test_admin_date_filters(self):
+        """
+        Test: The admin created_at filters use an index.
+        """
+        since = timezone.now() - timedelta(days=7)
+        self.assertUsesIndex(Quiz.objects.filter(created_at__gte=since), allow_sort=True)
+        self.assertUsesIndex(Question.objects.filter(created_at__gte=since), allow_sort=True)
+
+    def test_pending_jobs(self):
+        """
+        Test: The job worker finds pending jobs in creation order via the index.
+        """
+        self.assertUsesIndex(QuizJob.objects.filter(status=QuizJob.Status.PENDING).order_by('created_at', 'id'))
+
+    def test_transcript_cache_lookup(self):
+        """
+        Test: Transcript cache lookups use the unique (video_id, model_name) index.
+        """
+        self.assertUsesIndex(TranscriptCacheEntry.objects.filter(video_id="3ohjOltaO6Y", model_name="base"))
+
+    def test_quiz_list_validators(self):
+        """
+        Test: The ETag aggregate of the quiz list reads quizzes by owner and questions by quiz.
+        """
+        queryset = Quiz.objects.filter(owner=self.user).annotate(
+            question_count=Count('questions'), questions_modified=Max('questions__updated_at')
+        ).values('question_count')
+        self.assertUsesIndex(queryset, allow_sort=True)
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzly_app.models import Question, Quiz
+
+
+class UserQuizDetailTests(APITestCase):
+    """
+    Test suite for the quiz detail API endpoint.
+    Covers the scoped lookup (404 vs. 403), query counts and column-wise PATCH updates.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with a quiz of 5 questions, another user and an authenticated client.
+        """
+        self.user = get_user_model().objects.create_user(username='detailuser', password='detailpass123')
+        self.other = get_user_model().objects.create_user(username='otheruser', password='otherpass123')
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(
+            title="Quiz", description="Beschreibung", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=self.user
+        )
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, question_title=f"Frage {i}", question_options=["A", "B"], answer="A")
+            for i in range(5)
+        ])
+        self.url = reverse('user_quiz_detail', kwargs={'id': self.quiz.id})
+
+    def test_get_uses_two_queries(self):
+        """
+        Test: The quiz and its questions are loaded with two queries.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions']), 5)
+
+    def test_not_found_and_forbidden(self):
+        """
+        Test: A missing quiz returns 404, another user's quiz 403, each with one query.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('user_quiz_detail', kwargs={'id': self.quiz.id + 100}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.other)
+        for method in (self.client.get, self.client.patch, self.client.delete):
+            with self.assertNumQueries(1):
+                response = method(self.url, {"title": "Fremd"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Quiz.objects.filter(pk=self.quiz.pk, title="Quiz").exists())
+
+    def test_patch_writes_changed_columns_only(self):
+        """
+        Test: PATCH updates only the changed columns and updated_at.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {"title": "Neu", "description": "Beschreibung"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], "Neu")
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+        self.assertNotIn('"video_url"', updates[0])
+
+    def test_patch_video_url_updates_video_id(self):
+        """
+        Test: Changing the video URL also writes the normalized video id.
+        """
+        response = self.client.patch(self.url, {"video_url": "https://youtu.be/dQw4w9WgXcQ"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.video_id, "dQw4w9WgXcQ")
+
+    def test_patch_without_changes_does_not_write(self):
+        """
+        Test: A PATCH with unchanged values issues no UPDATE.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {"title": "Quiz"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries))
+
+    def test_delete(self):
+        """
+        Test: The owner can delete the quiz including its questions.
+        """
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Quiz.objects.filter(pk=self.quiz.pk).exists())
+        self.assertFalse(Question.objects.filter(quiz_id=self.quiz.pk).exists())
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+
+from quizzly_app.models import QuizJob
+from quizzly_app.utils.jobs import claimable_jobs, enqueue_quiz_job, run_quiz_job
+
+
+FAKE_QUESTIONS = [
+    {
+        "question_title": f"Frage {i + 1}",
+        "question_options": ["A", "B", "C", "D"],
+        "answer": "A",
+    }
+    for i in range(10)
+]
+
+
+def patch_pipeline():
+    """
+    Patches all external pipeline stages (yt-dlp, Whisper, Gemini) with fast fakes.
+    """
+    return (
+        patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', return_value='dummy_path.mp3'),
+        patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', return_value='Transkript'),
+        patch('quizzly_app.utils.quiz_pipeline.generate_quiz_with_gemini', return_value=FAKE_QUESTIONS),
+    )
+
+
+@override_settings(QUIZLY_JOB_BACKEND='eager')
+class QuizJobTests(APITestCase):
+    """
+    Test suite for the background quiz-generation jobs.
+    Covers enqueueing, job execution, status polling and access control.
+    """
+
+    def setUp(self):
+        """
+        Set up two users and authenticate the test client as the first one.
+        """
+        self.user = get_user_model().objects.create_user(
+            username='jobuser', email='jobuser@example.com', password='jobpass123'
+        )
+        self.other = get_user_model().objects.create_user(
+            username='otheruser', email='otheruser@example.com', password='otherpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('create_quiz')
+        self.data = {"url": "https://www.youtube.com/watch?v=3ohjOltaO6Y"}
+
+    def test_create_quiz_returns_job(self):
+        """
+        Test: POST createQuiz enqueues a job and returns 202 with the job id.
+        With the eager backend the job is already finished and contains the quiz.
+        """
+        p1, p2, p3 = patch_pipeline()
+        with p1, p2, p3:
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'succeeded')
+        self.assertEqual(response.data['progress'], 100)
+        self.assertEqual(len(response.data['quiz']['questions']), 10)
+
+    def test_job_detail(self):
+        """
+        Test: The job endpoint reports status and the resulting quiz.
+        """
+        p1, p2, p3 = patch_pipeline()
+        with p1, p2, p3:
+            job_id = self.client.post(self.url, self.data, format='json').data['id']
+        response = self.client.get(reverse('quiz_job_detail', kwargs={'id': job_id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], job_id)
+        self.assertEqual(response.data['stage'], 'done')
+        self.assertIn('quiz', response.data)
+
+    def test_job_detail_not_found(self):
+        """
+        Test: Polling an unknown job returns 404.
+        """
+        response = self.client.get(reverse('quiz_job_detail', kwargs={'id': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_job_detail_forbidden(self):
+        """
+        Test: Polling another user's job returns 403.
+        """
+        job = QuizJob.objects.create(owner=self.other, video_url=self.data['url'])
+        response = self.client.get(reverse('quiz_job_detail', kwargs={'id': job.id}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(QUIZLY_JOB_BACKEND='db')
+    def test_db_backend_leaves_job_pending(self):
+        """
+        Test: The DB backend only stores the job; a worker runs it later.
+        """
+        job = enqueue_quiz_job(self.data['url'], self.user)
+        self.assertEqual(job.status, QuizJob.Status.PENDING)
+        p1, p2, p3 = patch_pipeline()
+        with p1, p2, p3:
+            run_quiz_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.Status.SUCCEEDED)
+        self.assertIsNotNone(job.quiz_id)
+
+    def test_job_runs_only_once(self):
+        """
+        Test: A job that was already claimed is not executed again.
+        """
+        job = QuizJob.objects.create(
+            owner=self.user, video_url=self.data['url'], status=QuizJob.Status.RUNNING
+        )
+        with patch('quizzly_app.api.helpers.create_quiz_from_youtube') as create:
+            run_quiz_job(job.id)
+        create.assert_not_called()
+
+    @override_settings(QUIZLY_JOB_LEASE_SECONDS=60)
+    def test_abandoned_running_job_is_recovered(self):
+        """
+        Test: A running job whose lease expired is picked up and run again; a fresh one is not.
+        """
+        QuizJob.objects.create(owner=self.user, video_url=self.data['url'], status=QuizJob.Status.RUNNING)
+        job = QuizJob.objects.create(
+            owner=self.user, video_url=self.data['url'], status=QuizJob.Status.RUNNING, stage='transcription'
+        )
+        QuizJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(list(claimable_jobs().values_list('id', flat=True)), [job.id])
+        p1, p2, p3 = patch_pipeline()
+        with p1, p2, p3:
+            run_quiz_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.Status.SUCCEEDED)
+        self.assertIsNotNone(job.quiz_id)
+
+    def test_failed_stage_is_reported(self):
+        """
+        Test: A failing stage marks the job as failed and names the stage in the error.
+        """
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', side_effect=Exception('boom')):
+            with patch('quizzly_app.api.helpers.create_dummy_quiz', side_effect=Exception('offline')):
+                response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertIn('Download failed: boom', response.data['detail'])
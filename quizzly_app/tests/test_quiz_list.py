@@ -0,0 +1,121 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from quizzly_app.models import Quiz, Question
+
+
+class UserQuizListTests(APITestCase):
+    """
+    Test suite for the quiz list API endpoint.
+    Covers ownership filtering, constant query count, the summary mode and cursor pagination.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with quizzes, another user's quiz and an authenticated client.
+        """
+        self.user = get_user_model().objects.create_user(username='listuser', password='listpass123')
+        self.other = get_user_model().objects.create_user(username='otheruser', password='otherpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user_quizzes')
+        self.create_quizzes(self.user, 3)
+        self.create_quizzes(self.other, 1)
+
+    def create_quizzes(self, owner, count, questions=3):
+        """
+        Creates `count` quizzes with `questions` questions each for the given owner.
+        """
+        for i in range(count):
+            quiz = Quiz.objects.create(
+                title=f"Quiz {i}", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=owner
+            )
+            Question.objects.bulk_create([
+                Question(quiz=quiz, question_title=f"Frage {j}", question_options=["A", "B"], answer="A")
+                for j in range(questions)
+            ])
+
+    def test_list_only_own_quizzes(self):
+        """
+        Test: Only quizzes of the authenticated user are returned, with nested questions.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data[0]['questions']), 3)
+
+    def test_query_count_is_constant(self):
+        """
+        Test: The number of queries does not depend on the number of quizzes.
+        (ETag aggregate, quizzes, prefetched questions)
+        """
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        self.create_quizzes(self.user, 20)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 23)
+
+    def test_summary_mode(self):
+        """
+        Test: `?fields=summary` omits questions and returns the question count in one query
+        (plus the ETag aggregate).
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'fields': 'summary'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('questions', response.data[0])
+        self.assertEqual(response.data[0]['question_count'], 3)
+
+    def test_invalid_fields_parameter(self):
+        """
+        Test: Unknown `fields` values are rejected with 400.
+        """
+        response = self.client.get(self.url, {'fields': 'everything'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_pagination_walks_all_pages(self):
+        """
+        Test: Following `next` links returns every quiz exactly once, newest first.
+        Quizzes sharing the same created_at are ordered by id.
+        """
+        Quiz.objects.filter(owner=self.user).update(created_at=Quiz.objects.first().created_at)
+        self.create_quizzes(self.user, 4)
+        expected = list(Quiz.objects.filter(owner=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [quiz['id'] for quiz in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, expected)
+
+    def test_page_query_count_is_constant(self):
+        """
+        Test: Fetching a later page costs the same number of queries as the first.
+        """
+        self.create_quizzes(self.user, 10)
+        with self.assertNumQueries(3):
+            first = self.client.get(self.url, {'page_size': 5})
+        with self.assertNumQueries(3):
+            self.client.get(first.data['next'])
+
+    def test_page_size_is_capped(self):
+        """
+        Test: The page size cannot exceed QUIZLY_QUIZ_LIST_MAX_PAGE_SIZE.
+        """
+        with self.settings(QUIZLY_QUIZ_LIST_MAX_PAGE_SIZE=2):
+            response = self.client.get(self.url, {'page_size': 50, 'fields': 'summary'})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        """
+        Test: A malformed cursor returns 404.
+        """
+        response = self.client.get(self.url, {'cursor': 'kaputt'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,128 @@
+import json
+import os
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from quizzly_app.utils import gemini
+from quizzly_app.utils.gemini_stub import GeminiStubServer
+from quizzly_app.utils.quiz_pipeline import generate_quiz_with_gemini, parse_quiz_response, parse_stats
+
+
+def make_question(i, **overrides):
+    question = {
+        "question_title": f"Frage {i}",
+        "question_options": ["Rot", "Grün", "Blau", "Gelb"],
+        "answer": "Blau",
+    }
+    question.update(overrides)
+    return question
+
+
+QUESTIONS = [make_question(i) for i in range(1, 11)]
+
+
+class ParseQuizResponseTests(SimpleTestCase):
+    """
+    Test suite for parsing and salvaging Gemini quiz responses.
+    """
+
+    def setUp(self):
+        parse_stats.reset()
+
+    def test_valid_json(self):
+        """
+        Test: A valid JSON list is returned unchanged.
+        """
+        self.assertEqual(parse_quiz_response(json.dumps(QUESTIONS)), QUESTIONS)
+        self.assertEqual(parse_stats.get('complete'), 1)
+
+    def test_markdown_fence(self):
+        """
+        Test: A ```json code fence around the list is removed.
+        """
+        response = "```json\n" + json.dumps(QUESTIONS) + "\n```"
+        self.assertEqual(parse_quiz_response(response), QUESTIONS)
+
+    def test_truncated_output_is_salvaged(self):
+        """
+        Test: Complete questions before a cut-off are kept.
+        """
+        response = json.dumps(QUESTIONS[:3])[:-1] + ', {"question_title": "Frage 4", "question_opt'
+        self.assertEqual(parse_quiz_response(response), QUESTIONS[:3])
+        self.assertEqual(parse_stats.get('salvaged'), 1)
+
+    def test_stray_text_is_ignored(self):
+        """
+        Test: Questions surrounded by explanatory text are found.
+        """
+        response = "Hier ist dein Quiz:\n" + json.dumps(QUESTIONS[:2]) + "\nViel Spaß!"
+        self.assertEqual(parse_quiz_response(response), QUESTIONS[:2])
+
+    def test_wrapper_object(self):
+        """
+        Test: A list wrapped in an object (e.g. {"questions": [...]}) is unwrapped.
+        """
+        self.assertEqual(parse_quiz_response(json.dumps({"questions": QUESTIONS})), QUESTIONS)
+
+    def test_invalid_questions_are_dropped(self):
+        """
+        Test: Questions with missing fields, wrong option count or a foreign answer are dropped.
+        """
+        broken = [
+            make_question(11, question_options=["Rot", "Grün"]),
+            make_question(12, answer="Lila"),
+            {"question_title": "Ohne Optionen", "answer": "Rot"},
+            make_question(13, question_options=["Rot", "Rot", "Blau", "Gelb"]),
+            make_question(1),
+        ]
+        self.assertEqual(parse_quiz_response(json.dumps(QUESTIONS[:2] + broken)), QUESTIONS[:2])
+        self.assertEqual(parse_stats.get('dropped_questions'), 5)
+
+    def test_answer_index_and_letter(self):
+        """
+        Test: Answers given as option index or letter are resolved to the option text.
+        """
+        response = json.dumps([make_question(1, answer=2), make_question(2, answer="C)")])
+        self.assertEqual([q["answer"] for q in parse_quiz_response(response)], ["Blau", "Blau"])
+
+    def test_at_most_ten_questions(self):
+        """
+        Test: Extra questions beyond ten are cut off.
+        """
+        questions = [make_question(i) for i in range(15)]
+        self.assertEqual(len(parse_quiz_response(json.dumps(questions))), 10)
+
+    def test_unusable_response_falls_back_to_dummy(self):
+        """
+        Test: Without any valid question the dummy questions are returned.
+        """
+        questions = parse_quiz_response("Entschuldigung, das kann ich nicht.")
+        self.assertEqual(len(questions), 10)
+        self.assertTrue(questions[0]["question_title"].startswith("[Dummy]"))
+        self.assertEqual(parse_stats.get('failed'), 1)
+
+
+@override_settings(QUIZLY_GEMINI_CACHE=False)
+class StructuredOutputTests(SimpleTestCase):
+    """
+    Test suite for the schema-constrained Gemini request.
+    """
+
+    def test_request_uses_response_schema(self):
+        """
+        Test: Quiz generation asks Gemini for JSON matching the quiz schema.
+        """
+        with GeminiStubServer(reply=json.dumps(QUESTIONS)) as server, \
+                override_settings(QUIZLY_GEMINI_BASE_URL=server.url), \
+                patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'}):
+            gemini.reset_clients()
+            self.addCleanup(gemini.reset_clients)
+            self.assertEqual(generate_quiz_with_gemini("Transkript"), QUESTIONS)
+        config = server.bodies[0]["generationConfig"]
+        self.assertEqual(config["responseMimeType"], "application/json")
+        self.assertEqual(config["responseSchema"]["type"], "ARRAY")
+        self.assertEqual(
+            config["responseSchema"]["items"]["required"],
+            ["question_title", "question_options", "answer"],
+        )
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzly_app.api.helpers import create_dummy_quiz
+from quizzly_app.models import Question, Quiz
+from quizzly_app.utils import response_cache
+
+
+class ResponseCacheApiTests(APITestCase):
+    """
+    Test suite for serving the quiz list and detail from the response cache.
+    """
+
+    def setUp(self):
+        """
+        Set up a user with a quiz of 3 questions, an authenticated client and an empty cache.
+        """
+        response_cache.stats.reset()
+        response_cache.get_cache().clear()
+        self.user = get_user_model().objects.create_user(username='cacheuser', password='cachepass123')
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(
+            title="Quiz", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=self.user
+        )
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, question_title=f"Frage {j}", question_options=["A", "B"], answer="A")
+            for j in range(3)
+        ])
+        self.list_url = reverse('user_quizzes')
+        self.detail_url = reverse('user_quiz_detail', kwargs={'id': self.quiz.id})
+
+    def test_detail_served_from_cache(self):
+        """
+        Test: A repeated detail request is answered from the cache without loading questions.
+        """
+        first = self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.detail_url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(len(second.data['questions']), 3)
+        self.assertEqual(response_cache.stats.get('hits'), 1)
+        self.assertEqual(response_cache.stats.get('misses'), 1)
+        self.assertEqual(response_cache.hit_rate(), 0.5)
+
+    def test_list_served_from_cache(self):
+        """
+        Test: Full and summary lists are cached separately and answered with the aggregate query only.
+        """
+        full = self.client.get(self.list_url)
+        summary = self.client.get(self.list_url, {'fields': 'summary'})
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.list_url).content, full.content)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.list_url, {'fields': 'summary'}).content, summary.content)
+        self.assertEqual(response_cache.stats.get('hits'), 2)
+
+    def test_patch_invalidates(self):
+        """
+        Test: A PATCH drops the cached quiz and list, and the next GET returns the new title.
+        """
+        self.client.get(self.detail_url)
+        self.client.get(self.list_url)
+        self.client.patch(self.detail_url, {"title": "Neu"}, format='json')
+        cache = response_cache.get_cache()
+        self.assertIsNone(cache.get(response_cache.quiz_key(self.quiz.id)))
+        self.assertIsNone(cache.get(response_cache.list_key(self.user.id)))
+        self.assertEqual(self.client.get(self.detail_url).data['title'], "Neu")
+        self.assertEqual(self.client.get(self.list_url).data[0]['title'], "Neu")
+
+    def test_question_save_and_quiz_delete_invalidate(self):
+        """
+        Test: Saving a question and deleting a quiz drop the cached entries via signals.
+        """
+        self.client.get(self.detail_url)
+        question = self.quiz.questions.first()
+        question.question_title = "Geändert"
+        with self.assertNumQueries(1):
+            question.save()
+        self.assertIsNone(response_cache.get_cache().get(response_cache.quiz_key(self.quiz.id)))
+        self.assertEqual(self.client.get(self.detail_url).data['questions'][0]['question_title'], "Geändert")
+        self.client.get(self.list_url)
+        self.quiz.delete()
+        self.assertEqual(self.client.get(self.list_url).data, [])
+
+    def test_changes_without_signals_are_not_served_stale(self):
+        """
+        Test: A change that bypasses the signals changes the ETag, so the cached entry is not served.
+        """
+        self.client.get(self.detail_url)
+        self.quiz.questions.update(question_title="Direkt", updated_at=timezone.now())
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['questions'][0]['question_title'], "Direkt")
+        self.assertEqual(response_cache.stats.get('hits'), 0)
+
+    def test_dummy_quiz_update_invalidates(self):
+        """
+        Test: Reusing an existing dummy quiz drops its cached entry.
+        """
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        dummy_id = create_dummy_quiz(url, self.user, "Fehler 1")["dummy_quiz"]["id"]
+        detail_url = reverse('user_quiz_detail', kwargs={'id': dummy_id})
+        self.client.get(detail_url)
+        create_dummy_quiz(url, self.user, "Fehler 2")
+        self.assertIsNone(response_cache.get_cache().get(response_cache.quiz_key(dummy_id)))
+        self.assertEqual(self.client.get(detail_url).data['description'], "Fehler 2")
+
+    def test_file_backend_and_disabled_cache(self):
+        """
+        Test: A FileBasedCache alias serves cached responses, and without the alias the cache is disabled.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        file_caches = {
+            **settings.CACHES,
+            'quiz_responses': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory,
+                'TIMEOUT': None,
+            },
+        }
+        with override_settings(CACHES=file_caches):
+            first = self.client.get(self.detail_url)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(self.detail_url).content, first.content)
+            self.assertEqual(len(os.listdir(directory)), 1)
+        response_cache.stats.reset()
+        with override_settings(CACHES={'default': settings.CACHES['default']}):
+            self.assertIsNone(response_cache.get_cache())
+            self.assertEqual(self.client.get(self.detail_url).content, first.content)
+            self.client.get(self.detail_url)
+        self.assertEqual(response_cache.stats.get('hits') + response_cache.stats.get('misses'), 0)
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from quizzly_app.api.helpers import save_quiz_with_questions
+from quizzly_app.api.serializers import QuizSerializer
+from quizzly_app.models import Quiz, Question
+
+
+QUESTIONS = [
+    {
+        "question_title": f"Frage {i + 1}",
+        "question_options": ["A", "B", "C", "D"],
+        "answer": "B",
+    }
+    for i in range(10)
+]
+
+
+class SaveQuizWithQuestionsTests(TestCase):
+    """
+    Test suite for persisting a generated quiz and its questions.
+    Covers the single bulk insert, atomicity and query-free serialization.
+    """
+
+    def setUp(self):
+        """
+        Set up a quiz owner.
+        """
+        self.user = get_user_model().objects.create_user(username='bulkuser', password='bulkpass123')
+
+    def save(self, questions=QUESTIONS):
+        """
+        Saves a quiz with the given questions for the test user.
+        """
+        return save_quiz_with_questions(
+            title="Quiz", description="", url="https://www.youtube.com/watch?v=3ohjOltaO6Y",
+            user=self.user, questions_data=questions
+        )
+
+    def test_questions_inserted_in_one_statement(self):
+        """
+        Test: All questions are written with a single INSERT and not read back.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            quiz = self.save()
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "quizzly_app_question"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'quizzly_app_question' in q['sql']])
+        self.assertEqual(quiz.questions.count(), 10)
+
+    def test_serialization_uses_in_memory_questions(self):
+        """
+        Test: Serializing the returned quiz does not query the questions again.
+        """
+        quiz = self.save()
+        with self.assertNumQueries(0):
+            data = QuizSerializer(quiz).data
+        self.assertEqual([q['question_title'] for q in data['questions']], [q['question_title'] for q in QUESTIONS])
+        self.assertTrue(all(q['id'] for q in data['questions']))
+
+    def test_failed_insert_rolls_back_quiz(self):
+        """
+        Test: If a question cannot be stored, the quiz is not stored either.
+        """
+        broken = QUESTIONS[:2] + [{"question_title": "Kaputt", "question_options": ["A"]}]
+        with self.assertRaises(KeyError):
+            self.save(broken)
+        self.assertFalse(Quiz.objects.exists())
+        self.assertFalse(Question.objects.exists())
@@ -0,0 +1,144 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from quizzly_app.api.helpers import get_transcript_for_url
+from quizzly_app.utils.scratch import ScratchSpace, ScratchSpaceFull
+
+
+def write_file(directory, size, name="audio.mp3"):
+    """
+    Writes a file of the given size into the directory.
+    """
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return path
+
+
+class ScratchSpaceTests(SimpleTestCase):
+    """
+    Test suite for the scratch-space manager.
+    Covers cleanup, usage reporting and quota backpressure.
+    """
+
+    def setUp(self):
+        """
+        Create an isolated root directory for each test.
+        """
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_directory_removed_on_success_and_failure(self):
+        """
+        Test: Job directories are deleted whether the job succeeds or fails.
+        """
+        space = ScratchSpace(self.root)
+        with space.job_dir() as path:
+            write_file(path, 10)
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(RuntimeError):
+            with space.job_dir() as path:
+                raise RuntimeError("download failed")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_usage_and_stats(self):
+        """
+        Test: Usage reflects the files in active directories.
+        """
+        space = ScratchSpace(self.root, quota_bytes=1000)
+        with space.job_dir() as path:
+            write_file(path, 300)
+            stats = space.stats()
+            self.assertEqual(stats["usage_bytes"], 300)
+            self.assertEqual(stats["active_dirs"], 1)
+        self.assertEqual(space.usage(), 0)
+
+    def test_backpressure_waits_for_release(self):
+        """
+        Test: A new job waits until a running job frees its space.
+        """
+        space = ScratchSpace(self.root, quota_bytes=100, reserve_bytes=60, poll_interval=0.05)
+        first = space.acquire()
+        acquired = threading.Event()
+
+        def second_job():
+            with space.job_dir():
+                acquired.set()
+
+        thread = threading.Thread(target=second_job)
+        thread.start()
+        time.sleep(0.2)
+        self.assertFalse(acquired.is_set())
+        self.assertEqual(space.stats()["waiting"], 1)
+        space.release(first)
+        thread.join(2)
+        self.assertTrue(acquired.is_set())
+
+    def test_timeout_raises(self):
+        """
+        Test: If no space is freed in time, ScratchSpaceFull is raised.
+        """
+        space = ScratchSpace(self.root, quota_bytes=100, wait_timeout=0.1, poll_interval=0.02)
+        path = space.acquire()
+        write_file(path, 150)
+        with self.assertRaises(ScratchSpaceFull):
+            space.acquire()
+
+    def test_purge_stale(self):
+        """
+        Test: Leftover directories from crashed runs are removed, active ones are kept.
+        """
+        space = ScratchSpace(self.root)
+        active = space.acquire()
+        os.makedirs(os.path.join(self.root, "leftover"))
+        self.assertEqual(space.purge_stale(-1), 1)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(active)])
+
+    def test_other_processes_share_quota_and_keep_their_directories(self):
+        """
+        Test: Directories of other running processes count against the quota and are not purged;
+        those of dead processes are purged.
+        """
+        dead = subprocess.Popen([sys.executable, "-c", ""])
+        dead.wait()
+        other = os.path.join(self.root, f"quiz-{os.getppid()}-abc")
+        orphan = os.path.join(self.root, f"quiz-{dead.pid}-def")
+        os.makedirs(other)
+        os.makedirs(orphan)
+        write_file(orphan, 80)
+        space = ScratchSpace(self.root, quota_bytes=100, reserve_bytes=60, wait_timeout=0.1, poll_interval=0.02)
+        self.assertEqual(space.usage(), 80)
+        with self.assertRaises(ScratchSpaceFull):
+            space.acquire()
+        self.assertEqual(space.purge_stale(24 * 60 * 60), 1)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(other)])
+
+
+class PipelineScratchTests(TestCase):
+    """
+    Test suite for the scratch-space usage of the download pipeline.
+    """
+
+    def test_download_directory_is_cleaned_up(self):
+        """
+        Test: The downloaded audio file is deleted after transcription.
+        """
+        paths = []
+
+        def fake_download(url, tmp_dir=None):
+            paths.append(write_file(tmp_dir, 10))
+            return paths[-1]
+
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', side_effect=fake_download):
+            with patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', return_value="Hallo"):
+                get_transcript_for_url("https://www.youtube.com/watch?v=example")
+        self.assertFalse(os.path.exists(os.path.dirname(paths[0])))
@@ -0,0 +1,230 @@
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from quizzly_app.api.helpers import create_quiz_from_youtube
+from quizzly_app.models import PipelineLock, Quiz
+from quizzly_app.utils import single_flight
+from quizzly_app.utils.gemini import TokenUsage
+from quizzly_app.utils.single_flight import SingleFlight, acquire_lock, release_lock
+
+QUESTIONS = [
+    {"question_title": f"Frage {i}", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+    for i in range(10)
+]
+
+
+class SingleFlightGroupTests(SimpleTestCase):
+    """
+    Test suite for the in-process single-flight group.
+    """
+
+    def run_concurrently(self, group, func, callers=5):
+        """
+        Starts callers that all call group.do("key", func) and returns once all
+        but the leader are waiting.
+        """
+        results = []
+        errors = []
+        followers = single_flight.stats.get('followers')
+
+        def call():
+            try:
+                results.append(group.do("key", func))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for _ in range(500):
+            if single_flight.stats.get('followers') - followers == callers - 1:
+                break
+            threading.Event().wait(0.01)
+        return threads, results, errors
+
+    def test_concurrent_calls_share_one_run(self):
+        """
+        Test: Concurrent callers with the same key run func once and get the same result.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return "Ergebnis"
+
+        threads, results, _ = self.run_concurrently(group, func)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("Ergebnis", False)] + [("Ergebnis", True)] * 4)
+        self.assertEqual(group.in_flight(), [])
+
+    def test_error_is_shared(self):
+        """
+        Test: Followers receive the leader's error.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+
+        def func():
+            release.wait(5)
+            raise ValueError("Download kaputt")
+
+        threads, results, errors = self.run_concurrently(group, func, callers=3)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [])
+        self.assertEqual([str(error) for error in errors], ["Download kaputt"] * 3)
+
+    def test_follower_timeout_runs_itself(self):
+        """
+        Test: A follower that waits longer than the timeout runs func itself.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+        leader = threading.Thread(target=group.do, args=("key", lambda: release.wait(5)))
+        leader.start()
+        threading.Event().wait(0.05)
+        self.assertEqual(group.do("key", lambda: "selbst", timeout=0.05), ("selbst", False))
+        release.set()
+        leader.join()
+
+
+class PipelineLockTests(TestCase):
+    """
+    Test suite for the cross-process pipeline lock.
+    """
+
+    def test_lock_is_exclusive(self):
+        """
+        Test: Only one owner holds the lock for a key until it is released.
+        """
+        self.assertTrue(acquire_lock("3ohjOltaO6Y", owner="a"))
+        self.assertFalse(acquire_lock("3ohjOltaO6Y", owner="b"))
+        release_lock("3ohjOltaO6Y", owner="b")
+        self.assertTrue(PipelineLock.objects.filter(key="3ohjOltaO6Y").exists())
+        release_lock("3ohjOltaO6Y", owner="a")
+        self.assertTrue(acquire_lock("3ohjOltaO6Y", owner="b"))
+
+    def test_expired_lock_is_taken_over(self):
+        """
+        Test: A lock whose holder died (expired lease) is taken over.
+        """
+        PipelineLock.objects.create(key="3ohjOltaO6Y", owner="tot", expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lock("3ohjOltaO6Y", owner="b"))
+        self.assertEqual(PipelineLock.objects.get(key="3ohjOltaO6Y").owner, "b")
+
+    def test_waits_for_other_process(self):
+        """
+        Test: With the lock held by another process, the pipeline runs after the lock is released.
+        """
+        PipelineLock.objects.create(key="3ohjOltaO6Y", owner="anderer-prozess",
+                                    expires_at=timezone.now() + timedelta(minutes=5))
+        events = []
+
+        def other_process_finishes(seconds):
+            events.append("waited")
+            PipelineLock.objects.filter(key="3ohjOltaO6Y").delete()
+
+        with patch('quizzly_app.utils.single_flight.time.sleep', side_effect=other_process_finishes):
+            result = single_flight.single_flight("3ohjOltaO6Y", lambda: events.append("run") or "ok")
+        self.assertEqual(result, ("ok", False))
+        self.assertEqual(events, ["waited", "run"])
+        self.assertFalse(PipelineLock.objects.exists())
+
+    def test_waiter_takes_lock_after_release(self):
+        """
+        Test: A waiter runs the pipeline only while holding the lock itself, and waits
+        again if another waiter took the lock first.
+        """
+        PipelineLock.objects.create(key="3ohjOltaO6Y", owner="anderer-prozess",
+                                    expires_at=timezone.now() + timedelta(minutes=5))
+        events = []
+
+        def lock_changes_hands(seconds):
+            events.append("waited")
+            lock = PipelineLock.objects.get(key="3ohjOltaO6Y")
+            if lock.owner == "anderer-prozess":
+                # The leader failed; another waiting process becomes the next leader.
+                lock.owner = "dritter-prozess"
+                lock.save()
+            else:
+                lock.delete()
+
+        def run():
+            events.append(PipelineLock.objects.get(key="3ohjOltaO6Y").owner)
+            return "ok"
+
+        remote_waits = single_flight.stats.get('remote_waits')
+        with patch('quizzly_app.utils.single_flight.time.sleep', side_effect=lock_changes_hands):
+            result = single_flight.single_flight("3ohjOltaO6Y", run)
+        self.assertEqual(result, ("ok", False))
+        self.assertEqual(events, ["waited", "waited", single_flight.PROCESS_ID])
+        self.assertEqual(single_flight.stats.get('remote_waits') - remote_waits, 1)
+        self.assertFalse(PipelineLock.objects.exists())
+
+    def test_follower_timeout_goes_through_lock(self):
+        """
+        Test: A follower that stops waiting for a stuck leader in this process still takes the lock.
+        """
+        single_flight._group._calls["3ohjOltaO6Y"] = single_flight._Call()
+        self.addCleanup(single_flight._group._calls.pop, "3ohjOltaO6Y", None)
+        with self.settings(QUIZLY_SINGLE_FLIGHT_WAIT_TIMEOUT=0.01), \
+                patch('quizzly_app.utils.single_flight._run_with_lock', return_value="ok") as run_with_lock:
+            self.assertEqual(single_flight.single_flight("3ohjOltaO6Y", lambda: "direkt"), ("ok", False))
+        self.assertEqual(run_with_lock.call_args.args[0], "3ohjOltaO6Y")
+
+    def test_lock_is_released_after_error(self):
+        """
+        Test: The lock is released when the pipeline fails.
+        """
+        def fail():
+            raise RuntimeError("kaputt")
+
+        with self.assertRaises(RuntimeError):
+            single_flight.single_flight("3ohjOltaO6Y", fail)
+        self.assertFalse(PipelineLock.objects.exists())
+
+
+class SharedQuizCreationTests(TestCase):
+    """
+    Test suite for concurrent quiz creation for the same video.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='flightuser', password='flightpass123')
+
+    def test_follower_gets_own_quiz_copy(self):
+        """
+        Test: A request arriving while the same video is processed waits, skips the
+        pipeline and saves its own quiz with the shared questions.
+        """
+        release = threading.Event()
+        usage = TokenUsage()
+        usage.calls = 1
+
+        def leader_run():
+            release.wait(5)
+            return QUESTIONS, usage
+
+        leader = threading.Thread(target=single_flight._group.do, args=("3ohjOltaO6Y", leader_run))
+        leader.start()
+        threading.Event().wait(0.05)
+        threading.Timer(0.1, release.set).start()
+        with patch('quizzly_app.api.helpers.get_transcript_for_url', side_effect=AssertionError("pipeline ran")):
+            data = create_quiz_from_youtube("https://youtu.be/3ohjOltaO6Y", self.user)
+        leader.join()
+        quiz = Quiz.objects.get(pk=data["id"])
+        self.assertEqual(quiz.owner, self.user)
+        self.assertEqual(len(data["questions"]), 10)
+        self.assertEqual(quiz.gemini_calls, 0)
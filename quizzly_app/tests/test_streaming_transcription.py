@@ -0,0 +1,127 @@
+import io
+import subprocess
+import sys
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from quizzly_app.api.helpers import get_transcript_for_url
+from quizzly_app.utils import quiz_pipeline
+
+
+class FakeModel:
+    """
+    Stand-in for a Whisper model that reports the length of each chunk.
+    """
+
+    def __init__(self):
+        self.prompts = []
+
+    def transcribe(self, audio, initial_prompt=None):
+        self.prompts.append(initial_prompt)
+        return {"text": f" {len(audio)} "}
+
+
+def fake_use_model(model):
+    """
+    Returns a replacement for use_model that always yields the given model.
+    """
+    @contextmanager
+    def use_model(name):
+        yield model
+    return use_model
+
+
+def pcm_bytes(samples):
+    """
+    Encodes the given number of samples as s16le PCM.
+    """
+    return (np.arange(samples) % 100).astype(np.int16).tobytes()
+
+
+class StreamingTranscriptionTests(SimpleTestCase):
+    """
+    Test suite for the streaming transcription pipeline.
+    Covers PCM chunking, read-ahead buffering and chunk-wise transcription.
+    """
+
+    def test_iter_pcm_chunks(self):
+        """
+        Test: PCM is split into fixed-length float32 chunks with a shorter last chunk.
+        """
+        stream = io.BytesIO(pcm_bytes(quiz_pipeline.SAMPLE_RATE * 2 + 100))
+        chunks = list(quiz_pipeline.iter_pcm_chunks(stream, chunk_seconds=1))
+        self.assertEqual([len(c) for c in chunks], [16000, 16000, 100])
+        self.assertEqual(chunks[0].dtype, np.float32)
+        self.assertAlmostEqual(float(chunks[0][1]), 1 / 32768.0)
+
+    def test_read_ahead_keeps_order_and_raises(self):
+        """
+        Test: Buffered items arrive in order and producer errors reach the consumer.
+        """
+        self.assertEqual(list(quiz_pipeline.read_ahead(iter(range(10)), 2)), list(range(10)))
+
+        def broken():
+            yield 1
+            raise ValueError("decode error")
+        with self.assertRaises(ValueError):
+            list(quiz_pipeline.read_ahead(broken(), 2))
+
+    def test_transcribe_chunks_passes_context(self):
+        """
+        Test: Chunk texts are joined in order and the previous text is used as prompt.
+        """
+        model = FakeModel()
+        with patch.object(quiz_pipeline, 'use_model', fake_use_model(model)):
+            text = quiz_pipeline.transcribe_chunks([np.zeros(3), np.zeros(5)], "base")
+        self.assertEqual(text, "3 5")
+        self.assertEqual(model.prompts, [None, "3"])
+
+    def test_transcribe_audio_stream_from_pipe(self):
+        """
+        Test: A decoder process writing PCM to stdout is transcribed chunk by chunk.
+        """
+        script = f"import sys; sys.stdout.buffer.write(bytes({len(pcm_bytes(40000))}))"
+
+        def fake_open(stream_url, headers=None):
+            return subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        model = FakeModel()
+        with patch.object(quiz_pipeline, 'open_pcm_stream', fake_open):
+            with patch.object(quiz_pipeline, 'use_model', fake_use_model(model)):
+                text = quiz_pipeline.transcribe_audio_stream("https://stream", chunk_seconds=1)
+        self.assertEqual(text, "16000 16000 8000")
+
+    def test_decoder_failure_is_raised(self):
+        """
+        Test: A failing decoder process raises an error with its message.
+        """
+        script = "import sys; sys.stderr.write('no stream'); sys.exit(1)"
+
+        def fake_open(stream_url, headers=None):
+            return subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        with patch.object(quiz_pipeline, 'open_pcm_stream', fake_open):
+            with self.assertRaisesMessage(RuntimeError, "no stream"):
+                quiz_pipeline.transcribe_audio_stream("https://stream")
+
+
+@override_settings(QUIZLY_STREAMING_TRANSCRIPTION=True)
+class StreamingPipelineTests(TestCase):
+    """
+    Test suite for the streaming mode of get_transcript_for_url.
+    """
+
+    def test_streaming_mode_skips_mp3_download(self):
+        """
+        Test: In streaming mode the MP3 download is not used.
+        """
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube') as download:
+            with patch('quizzly_app.utils.quiz_pipeline.resolve_audio_stream', return_value=("https://stream", {})):
+                with patch('quizzly_app.utils.quiz_pipeline.transcribe_audio_stream', return_value="Hallo") as stream:
+                    transcript = get_transcript_for_url("https://www.youtube.com/watch?v=3ohjOltaO6Y")
+        self.assertEqual(transcript, "Hallo")
+        download.assert_not_called()
+        self.assertEqual(stream.call_args.args[:2], ("https://stream", {}))
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from quizzly_app.api.helpers import get_transcript_for_url
+from quizzly_app.models import TranscriptCacheEntry
+from quizzly_app.utils import transcript_cache
+from quizzly_app.utils.youtube import extract_video_id
+
+
+class ExtractVideoIdTests(SimpleTestCase):
+    """
+    Test suite for YouTube video id normalization.
+    """
+
+    def test_supported_url_formats(self):
+        """
+        Test: All common YouTube URL formats map to the same video id.
+        """
+        urls = [
+            "https://www.youtube.com/watch?v=3ohjOltaO6Y",
+            "https://youtube.com/watch?v=3ohjOltaO6Y&t=42s",
+            "https://m.youtube.com/watch?feature=share&v=3ohjOltaO6Y",
+            "https://youtu.be/3ohjOltaO6Y?si=abc",
+            "https://www.youtube.com/shorts/3ohjOltaO6Y",
+            "https://www.youtube.com/embed/3ohjOltaO6Y",
+        ]
+        for url in urls:
+            self.assertEqual(extract_video_id(url), "3ohjOltaO6Y", url)
+
+    def test_invalid_urls(self):
+        """
+        Test: URLs without a valid video id return None.
+        """
+        for url in ["", "not_a_url", "https://www.youtube.com/watch?v=example", "https://vimeo.com/3ohjOltaO6Y"]:
+            self.assertIsNone(extract_video_id(url), url)
+
+
+@override_settings(QUIZLY_WHISPER_MODEL='base', QUIZLY_TRANSCRIPT_CACHE_TTL=3600, QUIZLY_TRANSCRIPT_CACHE_MAX_ENTRIES=2)
+class TranscriptCacheTests(TestCase):
+    """
+    Test suite for the persistent transcript cache.
+    Covers cache hits, TTL expiry, size-based eviction and counters.
+    """
+    url = "https://www.youtube.com/watch?v=3ohjOltaO6Y"
+
+    def setUp(self):
+        """
+        Reset the in-process counters before each test.
+        """
+        transcript_cache.stats.reset()
+
+    def test_repeated_url_skips_download(self):
+        """
+        Test: The second request for the same video is served from the cache.
+        """
+        with patch('quizzly_app.utils.quiz_pipeline.extract_audio_from_youtube', return_value='a.mp3') as download:
+            with patch('quizzly_app.utils.quiz_pipeline.transcribe_audio', return_value='Hallo Welt') as transcribe:
+                self.assertEqual(get_transcript_for_url(self.url), 'Hallo Welt')
+                self.assertEqual(get_transcript_for_url("https://youtu.be/3ohjOltaO6Y"), 'Hallo Welt')
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(transcribe.call_count, 1)
+        self.assertEqual(transcript_cache.stats.get('hits'), 1)
+        self.assertEqual(transcript_cache.stats.get('misses'), 1)
+        self.assertEqual(TranscriptCacheEntry.objects.get().hits, 1)
+
+    def test_cache_is_per_model(self):
+        """
+        Test: A transcript cached for one Whisper model is not used for another.
+        """
+        transcript_cache.store_transcript("3ohjOltaO6Y", "tiny", "tiny transcript")
+        self.assertIsNone(transcript_cache.get_transcript("3ohjOltaO6Y", "base"))
+
+    def test_expired_entry_is_a_miss(self):
+        """
+        Test: Entries older than the TTL are deleted on lookup.
+        """
+        transcript_cache.store_transcript("3ohjOltaO6Y", "base", "alt")
+        TranscriptCacheEntry.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertIsNone(transcript_cache.get_transcript("3ohjOltaO6Y", "base"))
+        self.assertFalse(TranscriptCacheEntry.objects.exists())
+
+    def test_lru_eviction(self):
+        """
+        Test: Least recently used entries are evicted above the size limit.
+        """
+        transcript_cache.store_transcript("aaaaaaaaaaa", "base", "a")
+        transcript_cache.store_transcript("bbbbbbbbbbb", "base", "b")
+        TranscriptCacheEntry.objects.filter(video_id="aaaaaaaaaaa").update(
+            last_used_at=timezone.now() + timedelta(seconds=1)
+        )
+        transcript_cache.store_transcript("ccccccccccc", "base", "c")
+        remaining = set(TranscriptCacheEntry.objects.values_list('video_id', flat=True))
+        self.assertEqual(remaining, {"aaaaaaaaaaa", "ccccccccccc"})
+        self.assertEqual(transcript_cache.stats.get('evictions'), 1)
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from quizzly_app.utils.whisper_models import WhisperModelRegistry
+
+
+class FakeLoader:
+    """
+    Stand-in for whisper.load_model that records how often each model is loaded.
+    """
+
+    def __init__(self, delay=0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, name):
+        self.calls.append(name)
+        time.sleep(self.delay)
+        return {"name": name}
+
+
+SIZES = {"tiny": 100, "base": 200, "small": 500}
+
+
+class WhisperModelRegistryTests(SimpleTestCase):
+    """
+    Test suite for the process-wide Whisper model registry.
+    Covers single loading, LRU eviction under a memory budget and thread safety.
+    """
+
+    def make_registry(self, budget=None, delay=0):
+        """
+        Creates a registry with a fake loader and fixed model sizes.
+        """
+        loader = FakeLoader(delay)
+        registry = WhisperModelRegistry(
+            memory_budget_bytes=budget, loader=loader, sizer=lambda model: SIZES[model["name"]]
+        )
+        return registry, loader
+
+    def test_model_loaded_once(self):
+        """
+        Test: Repeated requests for the same model load it only once.
+        """
+        registry, loader = self.make_registry()
+        first = registry.get("base")
+        with registry.use("base") as second:
+            self.assertIs(first, second)
+        self.assertEqual(loader.calls, ["base"])
+
+    def test_lru_eviction_under_budget(self):
+        """
+        Test: The least recently used model is evicted when the budget is exceeded.
+        """
+        registry, loader = self.make_registry(budget=350)
+        registry.get("tiny")
+        registry.get("base")
+        registry.get("tiny")
+        registry.get("small")
+        self.assertEqual(registry.loaded_models(), ["small"])
+        registry.get("tiny")
+        registry.get("base")
+        self.assertEqual(registry.loaded_models(), ["tiny", "base"])
+        self.assertEqual(registry.evictions, 3)
+
+    def test_model_in_use_is_not_evicted(self):
+        """
+        Test: A model currently used for inference stays loaded.
+        """
+        registry, loader = self.make_registry(budget=250)
+        with registry.use("base"):
+            registry.get("tiny")
+            self.assertIn("base", registry.loaded_models())
+
+    def test_concurrent_requests_share_one_load(self):
+        """
+        Test: Threads requesting the same model at once trigger a single load.
+        """
+        registry, loader = self.make_registry(delay=0.05)
+        threads = [threading.Thread(target=registry.get, args=("base",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(loader.calls, ["base"])
+
+    def test_memory_usage_waits_for_registry_lock(self):
+        """
+        Test: memory_usage() does not read the models while a load or eviction holds the registry lock.
+        """
+        registry, loader = self.make_registry()
+        registry.get("base")
+        result = []
+        with registry._lock:
+            thread = threading.Thread(target=lambda: result.append(registry.memory_usage()))
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual(result, [])
+        thread.join()
+        self.assertEqual(result, [SIZES["base"]])
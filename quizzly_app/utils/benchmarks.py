@@ -0,0 +1,208 @@
+"""
+Helpers for the benchmark suite (`manage.py benchmark`).
+Seeds reproducible benchmark data in a throwaway database, summarizes latency
+samples and compares a benchmark report against a stored baseline to detect
+regressions.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from quizzly_app.models import Question, Quiz
+
+# Metrics where a higher value is better; all other compared metrics are timings or counts.
+HIGHER_IS_BETTER = frozenset({"requests_per_second"})
+
+COMPARED_METRICS = frozenset({
+    "p50_ms", "p95_ms", "mean_ms", "queries", "requests_per_second", "seconds_per_audio_minute",
+})
+
+# Keys identifying an entry within a list of results, e.g. the data size or the Whisper model.
+IDENTITY_KEYS = ("quizzes", "model")
+
+
+@contextmanager
+def throwaway_database(live_db=False):
+    """
+    Runs the block against a new test database that is destroyed afterwards,
+    so seeded benchmark data never reaches the configured database.
+    Args:
+        live_db (bool): Use the configured database instead (the caller deletes its data).
+    """
+    if live_db:
+        yield
+        return
+    test_settings = connections[DEFAULT_DB_ALIAS].settings_dict['TEST']
+    old_test_settings = dict(test_settings)
+    directory = None
+    if connections[DEFAULT_DB_ALIAS].vendor == 'sqlite' and not test_settings.get('NAME'):
+        # A file, because the shared in-memory test database fails concurrent writes
+        # with "database table is locked".
+        directory = tempfile.mkdtemp(prefix='quizly-benchmark-')
+        test_settings['NAME'] = os.path.join(directory, 'db.sqlite3')
+    try:
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set()
+        )
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+    finally:
+        test_settings.clear()
+        test_settings.update(old_test_settings)
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def seed_quizzes(users, quizzes_per_user, questions_per_quiz=10, prefix=None):
+    """
+    Creates users, each owning the given number of quizzes with questions.
+    Args:
+        users (int): Number of users to create.
+        quizzes_per_user (int): Quizzes per user.
+        questions_per_quiz (int): Questions per quiz.
+        prefix (str): Username prefix; defaults to a random "bench-" prefix.
+    Returns:
+        list: The created users.
+    """
+    prefix = prefix or f"bench-{uuid.uuid4().hex[:8]}"
+    created = [
+        get_user_model().objects.create_user(username=f"{prefix}-{index}")
+        for index in range(users)
+    ]
+    for user in created:
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(
+                title=f"Quiz {number + 1}",
+                description="Benchmark-Quiz",
+                video_url=f"https://www.youtube.com/watch?v=bench{number:06d}",
+                video_id=f"bench{number:06d}",
+                owner=user,
+            )
+            for number in range(quizzes_per_user)
+        ])
+        Question.objects.bulk_create([
+            Question(
+                quiz=quiz,
+                question_title=f"Frage {number + 1}",
+                question_options=["A", "B", "C", "D"],
+                answer="A",
+            )
+            for quiz in quizzes
+            for number in range(questions_per_quiz)
+        ], batch_size=500)
+    return created
+
+
+def seed_revoked_tokens(count, user=None, batch_size=10000):
+    """
+    Creates `count` blacklisted, unexpired refresh token entries.
+    Returns the jti prefix that identifies them for delete_revoked_tokens.
+    """
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    expires_at = timezone.now() + timedelta(days=1)
+    for start in range(0, count, batch_size):
+        OutstandingToken.objects.bulk_create([
+            OutstandingToken(user=user, jti=f"{prefix}{number}", token="", expires_at=expires_at)
+            for number in range(start, min(start + batch_size, count))
+        ])
+    ids = OutstandingToken.objects.filter(jti__startswith=prefix).values_list('id', flat=True)
+    batch = []
+    for token_id in ids.iterator(chunk_size=batch_size):
+        batch.append(BlacklistedToken(token_id=token_id))
+        if len(batch) == batch_size:
+            BlacklistedToken.objects.bulk_create(batch)
+            batch = []
+    BlacklistedToken.objects.bulk_create(batch)
+    return prefix
+
+
+def delete_revoked_tokens(prefix, batch_size=10000):
+    """
+    Deletes the token entries created by seed_revoked_tokens.
+    """
+    BlacklistedToken.objects.filter(token__jti__startswith=prefix).delete()
+    tokens = OutstandingToken.objects.filter(jti__startswith=prefix)
+    while True:
+        ids = list(tokens.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        OutstandingToken.objects.filter(id__in=ids).delete()
+
+
+def percentile(samples, fraction):
+    """
+    Returns the given percentile (0..1) of the samples using the nearest-rank method.
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize_latencies(samples):
+    """
+    Summarizes latency samples (seconds) as p50, p95 and mean in milliseconds.
+    """
+    return {
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+    }
+
+
+def flatten_report(report, path=""):
+    """
+    Flattens a benchmark report to {metric path: value} for the compared metrics.
+    Entries of result lists are addressed by their identity key, e.g.
+    "list[quizzes=100].p95_ms".
+    """
+    metrics = {}
+    if isinstance(report, dict):
+        for key, value in report.items():
+            child = f"{path}.{key}" if path else key
+            if key in COMPARED_METRICS and isinstance(value, (int, float)):
+                metrics[child] = value
+            else:
+                metrics.update(flatten_report(value, child))
+    elif isinstance(report, list):
+        for index, entry in enumerate(report):
+            identity = next((key for key in IDENTITY_KEYS if isinstance(entry, dict) and key in entry), None)
+            label = f"{identity}={entry[identity]}" if identity else str(index)
+            metrics.update(flatten_report(entry, f"{path}[{label}]"))
+    return metrics
+
+
+def compare_reports(baseline, current, tolerance=0.2):
+    """
+    Compares a benchmark report against a baseline report.
+    Args:
+        baseline (dict): Previously stored report.
+        current (dict): Report of this run.
+        tolerance (float): Allowed relative slowdown (0.2 = 20 %).
+    Returns:
+        list: (metric, baseline value, current value, relative change) of each
+            metric that got worse by more than the tolerance.
+    """
+    before = flatten_report(baseline)
+    after = flatten_report(current)
+    regressions = []
+    for metric, old in sorted(before.items()):
+        new = after.get(metric)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if metric.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append((metric, old, new, round(change, 3)))
+    return regressions
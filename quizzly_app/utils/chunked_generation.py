@@ -0,0 +1,246 @@
+"""
+Map-reduce quiz generation for long transcripts.
+The transcript is split at sentence boundaries into chunks of at most
+QUIZLY_CHUNK_TOKENS tokens. Candidate questions are generated for all chunks
+concurrently (map), then near-duplicates are removed and the final questions are
+picked round-robin across the chunks, so they cover the whole video (reduce).
+Tokens are counted with tiktoken; by default with the multilingual encoding
+bundled with Whisper, which needs no download.
+"""
+
+import asyncio
+import functools
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+
+from django.conf import settings
+
+from quizzly_app.utils.quiz_pipeline import (
+    OPTION_COUNT,
+    QUESTION_COUNT,
+    QUIZ_RESPONSE_SCHEMA,
+    acached_quiz_response,
+    dummy_questions,
+    extract_questions,
+    lookup_cached_response,
+    parse_stats,
+    store_cached_response,
+)
+from quizzly_app.utils.stats import Counters
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+')
+WORD_RE = re.compile(r'\w+')
+
+# Part of the Gemini response cache key; bump when the chunk prompt changes.
+CHUNK_PROMPT_VERSION = "quiz-chunk-v1"
+
+stats = Counters('chunked_quizzes', 'chunks', 'chunk_failures')
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name=None):
+    """
+    Returns the tiktoken encoding used to count tokens.
+    Args:
+        name (str): A tiktoken encoding name (e.g. "cl100k_base"); None uses
+            Whisper's bundled multilingual encoding.
+    """
+    if name:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    from whisper.tokenizer import get_encoding as get_whisper_encoding
+    return get_whisper_encoding("multilingual")
+
+
+def _encoding():
+    return get_encoding(getattr(settings, 'QUIZLY_TOKEN_ENCODING', None))
+
+
+def count_tokens(text):
+    """
+    Returns the number of tokens in the text.
+    """
+    return len(_encoding().encode(text, disallowed_special=()))
+
+
+def should_chunk(transcript):
+    """
+    Returns True if chunked generation is enabled and the transcript exceeds QUIZLY_CHUNK_MIN_TOKENS.
+    """
+    if not getattr(settings, 'QUIZLY_CHUNKED_GENERATION', False):
+        return False
+    return count_tokens(transcript) > getattr(settings, 'QUIZLY_CHUNK_MIN_TOKENS', 8000)
+
+
+def split_transcript(transcript, max_tokens):
+    """
+    Splits a transcript into chunks of at most max_tokens tokens.
+    Chunks end at sentence boundaries; a single sentence longer than the budget is
+    cut at token boundaries.
+    Args:
+        transcript (str): The transcript text.
+        max_tokens (int): Token budget per chunk.
+    Returns:
+        list: Chunk texts in transcript order.
+    """
+    encoding = _encoding()
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in SENTENCE_END_RE.split(transcript.strip()):
+        if not sentence:
+            continue
+        tokens = encoding.encode(sentence, disallowed_special=())
+        pieces = [tokens[i:i + max_tokens] for i in range(0, len(tokens), max_tokens)]
+        for piece in pieces:
+            if current and current_tokens + len(piece) > max_tokens:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(sentence if len(pieces) == 1 else encoding.decode(piece))
+            current_tokens += len(piece)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def questions_per_chunk(chunk_count):
+    """
+    Returns how many candidate questions to request per chunk.
+    Asks for a few more than needed so duplicates and invalid questions can be dropped.
+    """
+    return min(QUESTION_COUNT, math.ceil(QUESTION_COUNT / chunk_count) + 2)
+
+
+def build_chunk_prompt(chunk, index, total, count):
+    """
+    Builds the Gemini prompt for one transcript chunk.
+    """
+    return (
+        f"Erstelle {count} Quizfragen mit jeweils {OPTION_COUNT} Antwortmöglichkeiten zu folgendem Abschnitt "
+        f"({index} von {total}) eines Transkripts. Die Fragen sollen nur Inhalte dieses Abschnitts abfragen. "
+        "Gib die Fragen als JSON-Liste mit den Feldern 'question_title', 'question_options' und 'answer' zurück."
+        "\nAbschnitt:\n" + chunk
+    )
+
+
+def _title_words(question):
+    return frozenset(WORD_RE.findall(question["question_title"].casefold()))
+
+
+def _similar(words, other, threshold):
+    if not words or not other:
+        return words == other
+    return len(words & other) / len(words | other) >= threshold
+
+
+def select_questions(groups, count=QUESTION_COUNT, threshold=0.8):
+    """
+    Reduces candidate questions from all chunks to the final quiz.
+    Questions whose titles share at least `threshold` of their words (Jaccard)
+    with an earlier question are dropped; the rest is picked round-robin across
+    chunks so every part of the transcript is covered.
+    Args:
+        groups (list): One list of candidate questions per chunk, in transcript order.
+        count (int): Number of questions to select.
+        threshold (float): Word overlap above which two titles count as duplicates.
+    Returns:
+        list: At most `count` questions.
+    """
+    seen = []
+    unique_groups = []
+    for group in groups:
+        unique = []
+        for question in group:
+            words = _title_words(question)
+            if any(_similar(words, other, threshold) for other in seen):
+                continue
+            seen.append(words)
+            unique.append(question)
+        unique_groups.append(unique)
+    selected = []
+    for row in zip_longest(*unique_groups):
+        selected.extend(question for question in row if question is not None)
+    return selected[:count]
+
+
+def _plan(transcript):
+    chunks = split_transcript(transcript, getattr(settings, 'QUIZLY_CHUNK_TOKENS', 4000))
+    workers = max(1, min(getattr(settings, 'QUIZLY_CHUNK_WORKERS', 4), len(chunks)))
+    stats.incr('chunked_quizzes')
+    stats.incr('chunks', len(chunks))
+    return chunks, questions_per_chunk(len(chunks)), workers
+
+
+def _reduce(results):
+    """
+    Combines per-chunk results; failed chunks are skipped unless all chunks failed.
+    """
+    groups = [result for result in results if not isinstance(result, BaseException)]
+    stats.incr('chunk_failures', len(results) - len(groups))
+    if not groups:
+        raise results[0]
+    questions = select_questions(groups)
+    if not questions:
+        parse_stats.incr('failed')
+        return dummy_questions()
+    return questions
+
+
+def generate_quiz_chunked(transcript, usage=None):
+    """
+    Generates quiz questions from a long transcript chunk by chunk.
+    Chunks missing from the response cache are sent to Gemini concurrently from
+    QUIZLY_CHUNK_WORKERS threads; cache reads and writes stay in the calling thread.
+    Args:
+        transcript (str): The transcript text.
+        usage (TokenUsage): Optional accumulator for the billed Gemini tokens.
+    Returns:
+        list: List of question dicts with 'question_title', 'question_options', and 'answer'.
+    """
+    from quizzly_app.utils.gemini import gemini_generate_content
+    chunks, count, workers = _plan(transcript)
+    prompts = [build_chunk_prompt(chunk, index + 1, len(chunks), count) for index, chunk in enumerate(chunks)]
+    cached = [
+        lookup_cached_response(CHUNK_PROMPT_VERSION, (chunk, index + 1, len(chunks), count))
+        for index, chunk in enumerate(chunks)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            index: pool.submit(gemini_generate_content, prompts[index], response_schema=QUIZ_RESPONSE_SCHEMA, usage=usage)
+            for index, (_, response) in enumerate(cached)
+            if response is None
+        }
+    results = []
+    for index, (key, response) in enumerate(cached):
+        future = futures.get(index)
+        if future is not None:
+            if future.exception() is not None:
+                results.append(future.exception())
+                continue
+            response = future.result()
+            store_cached_response(key, CHUNK_PROMPT_VERSION, response)
+        results.append(extract_questions(response))
+    return _reduce(results)
+
+
+async def agenerate_quiz_chunked(transcript, usage=None):
+    """
+    Async variant of generate_quiz_chunked; at most QUIZLY_CHUNK_WORKERS chunks are in flight.
+    """
+    chunks, count, workers = _plan(transcript)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def generate(index, chunk):
+        prompt = build_chunk_prompt(chunk, index + 1, len(chunks), count)
+        key_parts = (chunk, index + 1, len(chunks), count)
+        async with semaphore:
+            response = await acached_quiz_response(prompt, CHUNK_PROMPT_VERSION, key_parts, usage=usage)
+        return extract_questions(response)
+
+    results = await asyncio.gather(
+        *(generate(index, chunk) for index, chunk in enumerate(chunks)), return_exceptions=True
+    )
+    return _reduce(list(results))
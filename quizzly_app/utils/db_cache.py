@@ -0,0 +1,93 @@
+"""
+Expiry and least-recently-used eviction shared by the database-backed caches
+(transcript cache, Gemini response cache).
+The cache model needs `hits`, `created_at` and `last_used_at` fields; each
+cache module only decides which fields form the key and which hold the value.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class DatabaseCache:
+    """
+    Cache of model rows that expire after a TTL and are evicted least recently used first.
+    Args:
+        model (Model): The cache entry model.
+        ttl_setting (str): Name of the setting holding the TTL in seconds (None = never expire).
+        max_entries_setting (str): Name of the setting holding the size limit (None = unlimited).
+        stats (Counters): Counters with 'hits', 'misses', 'stores' and 'evictions'.
+    """
+
+    def __init__(self, model, ttl_setting, max_entries_setting, stats):
+        self.model = model
+        self.ttl_setting = ttl_setting
+        self.max_entries_setting = max_entries_setting
+        self.stats = stats
+
+    def ttl(self):
+        """
+        Returns the configured TTL as timedelta, or None if entries never expire.
+        """
+        seconds = getattr(settings, self.ttl_setting, None)
+        return timedelta(seconds=seconds) if seconds else None
+
+    def get(self, **lookup):
+        """
+        Looks up an entry and records the hit or miss.
+        Expired entries are deleted and count as a miss.
+        Returns:
+            Model | None: The cached entry or None.
+        """
+        entry = self.model.objects.filter(**lookup).first()
+        now = timezone.now()
+        ttl = self.ttl()
+        if entry is not None and ttl is not None and entry.created_at < now - ttl:
+            entry.delete()
+            entry = None
+        if entry is None:
+            self.stats.incr('misses')
+            return None
+        self.model.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+        self.stats.incr('hits')
+        return entry
+
+    def store(self, lookup, values):
+        """
+        Stores an entry under the key fields in `lookup` and evicts entries above the size limit.
+        """
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                self.model.objects.update_or_create(
+                    **lookup, defaults={**values, 'created_at': now, 'last_used_at': now}
+                )
+        except IntegrityError:
+            # Another worker stored the same entry concurrently.
+            pass
+        self.stats.incr('stores')
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes expired entries and the least recently used entries above the size limit.
+        Returns the number of deleted entries.
+        """
+        deleted = 0
+        ttl = self.ttl()
+        if ttl is not None:
+            deleted += self.model.objects.filter(created_at__lt=timezone.now() - ttl).delete()[0]
+        max_entries = getattr(settings, self.max_entries_setting, None)
+        if max_entries is not None:
+            stale_ids = list(
+                self.model.objects.order_by('-last_used_at', '-id').values_list('id', flat=True)[max_entries:]
+            )
+            if stale_ids:
+                deleted += self.model.objects.filter(id__in=stale_ids).delete()[0]
+        if deleted:
+            self.stats.incr('evictions', deleted)
+        return deleted
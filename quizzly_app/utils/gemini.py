@@ -1,21 +1,337 @@
+"""
+Process-level Gemini client pool.
+One genai.Client (and with it one keep-alive HTTP connection pool) is created per
+API key and base URL and reused by all threads. QUIZLY_GEMINI_MAX_CONCURRENCY limits
+the number of concurrent calls per process. QUIZLY_GEMINI_BASE_URL points the
+client at another endpoint, e.g. a local stand-in server in tests.
+
+Every call has a deadline, transient errors (timeouts, connection errors, 429 and
+5xx responses) are retried with jittered backoff, and a circuit breaker rejects calls
+immediately while most recent calls failed. Outcomes are counted in `stats`.
+"""
+
+import asyncio
 import os
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
 from google import genai
+from google.genai import errors, types
+
+from quizzly_app.utils.metrics import span
+from quizzly_app.utils.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from quizzly_app.utils.stats import Counters
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+TRANSIENT_STATUS_CODES = {408, 429}
+
+stats = Counters('calls', 'successes', 'failures', 'retries', 'timeouts', 'short_circuits')
+
+_clients = {}
+_async_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+_semaphore = None
+_semaphore_lock = threading.Lock()
+_async_semaphores = weakref.WeakKeyDictionary()
+_breaker = None
+
+
+def _create_client(api_key, base_url):
+    """
+    Creates a Gemini client with a keep-alive connection pool sized to the concurrency limit.
+    """
+    max_connections = getattr(settings, 'QUIZLY_GEMINI_MAX_CONCURRENCY', 8)
+    http_options = types.HttpOptions(
+        base_url=base_url,
+        client_args={
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=getattr(settings, 'QUIZLY_GEMINI_KEEPALIVE_SECONDS', 60),
+            ),
+        },
+    )
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+class TokenUsage:
+    """
+    Thread-safe accumulator for the tokens billed over several Gemini calls.
+    Pass one instance as `usage` to all calls made for a single quiz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def add(self, response):
+        """
+        Adds the usage metadata of a Gemini response.
+        """
+        metadata = getattr(response, "usage_metadata", None)
+        with self._lock:
+            self.calls += 1
+            if metadata is not None:
+                self.prompt_tokens += metadata.prompt_token_count or 0
+                self.output_tokens += metadata.candidates_token_count or 0
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.output_tokens
 
 
-def gemini_generate_content(prompt, model="gemini-2.5-flash"):
+def get_client(api_key=None):
+    """
+    Returns the shared Gemini client for the configured API key and base URL.
+    Args:
+        api_key (str): Overrides the API key from the environment.
+    Returns:
+        genai.Client: The pooled client.
+    """
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+    key = (api_key, getattr(settings, 'QUIZLY_GEMINI_BASE_URL', None))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(*key)
+            _clients[key] = client
+        return client
+
+
+def get_async_client(api_key=None):
+    """
+    Returns the Gemini client used for async calls on the running event loop.
+    Async connections belong to one event loop, so each loop gets its own client.
+    """
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+    key = (api_key, getattr(settings, 'QUIZLY_GEMINI_BASE_URL', None))
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = _create_client(*key)
+            clients[key] = client
+        return client
+
+
+def get_semaphore():
+    """
+    Returns the semaphore limiting concurrent Gemini calls in this process.
+    """
+    global _semaphore
+    with _semaphore_lock:
+        if _semaphore is None:
+            _semaphore = threading.BoundedSemaphore(getattr(settings, 'QUIZLY_GEMINI_MAX_CONCURRENCY', 8))
+        return _semaphore
+
+
+def get_async_semaphore():
+    """
+    Returns the asyncio semaphore limiting concurrent Gemini calls on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _semaphore_lock:
+        semaphore = _async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(getattr(settings, 'QUIZLY_GEMINI_MAX_CONCURRENCY', 8))
+            _async_semaphores[loop] = semaphore
+        return semaphore
+
+
+def get_breaker():
+    """
+    Returns the circuit breaker shared by all Gemini calls in this process.
+    """
+    global _breaker
+    with _semaphore_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                "Gemini",
+                failure_rate=getattr(settings, 'QUIZLY_GEMINI_BREAKER_FAILURE_RATE', 0.5),
+                min_calls=getattr(settings, 'QUIZLY_GEMINI_BREAKER_MIN_CALLS', 10),
+                window_seconds=getattr(settings, 'QUIZLY_GEMINI_BREAKER_WINDOW_SECONDS', 60),
+                reset_seconds=getattr(settings, 'QUIZLY_GEMINI_BREAKER_RESET_SECONDS', 30),
+            )
+        return _breaker
+
+
+def reset_clients():
+    """
+    Drops all pooled clients, the concurrency limit and the circuit breaker, e.g. after settings changed.
+    """
+    global _semaphore, _breaker
+    with _clients_lock:
+        _clients.clear()
+        _async_clients.clear()
+    with _semaphore_lock:
+        _semaphore = None
+        _breaker = None
+        _async_semaphores.clear()
+
+
+def is_transient(error):
+    """
+    Returns True for errors worth retrying: timeouts, connection errors, 408/429 and 5xx responses.
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, errors.ServerError):
+        return True
+    return isinstance(error, errors.APIError) and error.code in TRANSIENT_STATUS_CODES
+
+
+class _RetryPolicy:
+    """
+    Tracks the deadline and attempts of one logical Gemini call.
+    """
+
+    def __init__(self):
+        self.timeout = getattr(settings, 'QUIZLY_GEMINI_TIMEOUT_SECONDS', 60)
+        self.max_retries = getattr(settings, 'QUIZLY_GEMINI_MAX_RETRIES', 2)
+        self.base_delay = getattr(settings, 'QUIZLY_GEMINI_RETRY_BASE_DELAY', 0.5)
+        self.max_delay = getattr(settings, 'QUIZLY_GEMINI_RETRY_MAX_DELAY', 8.0)
+        self.deadline = time.monotonic() + getattr(settings, 'QUIZLY_GEMINI_DEADLINE_SECONDS', 120)
+        self.attempt = 0
+
+    def config(self, response_schema=None):
+        """
+        Returns the request config limiting this attempt to the remaining time.
+        With a response schema, Gemini is asked for JSON matching that schema.
+        """
+        remaining = max(self.deadline - time.monotonic(), 0.001)
+        options = {}
+        if response_schema is not None:
+            options["response_mime_type"] = "application/json"
+            options["response_schema"] = types.Schema.model_validate(response_schema)
+        return types.GenerateContentConfig(
+            http_options=types.HttpOptions(timeout=max(1, int(min(self.timeout, remaining) * 1000))),
+            **options
+        )
+
+    def retry_delay(self, error):
+        """
+        Records a failed attempt and returns the backoff delay, or None if the error is final.
+        """
+        breaker = get_breaker()
+        if isinstance(error, httpx.TimeoutException):
+            stats.incr('timeouts')
+        if not is_transient(error):
+            # The service answered; the request itself was bad.
+            breaker.record_success()
+            return None
+        breaker.record_failure()
+        self.attempt += 1
+        if self.attempt > self.max_retries:
+            return None
+        delay = backoff_delay(self.attempt, self.base_delay, self.max_delay)
+        if time.monotonic() + delay >= self.deadline:
+            return None
+        stats.incr('retries')
+        return delay
+
+
+def _before_attempt():
+    try:
+        get_breaker().before_call()
+    except CircuitOpenError:
+        stats.incr('short_circuits')
+        stats.incr('failures')
+        raise
+
+
+def _on_success(response, usage):
+    get_breaker().record_success()
+    stats.incr('successes')
+    if usage is not None:
+        usage.add(response)
+    return response.text
+
+
+def gemini_generate_content(prompt, model=DEFAULT_MODEL, response_schema=None, usage=None):
     """
     Sends a prompt to the Gemini API and returns the generated text.
     The API key is automatically loaded from the .env file.
+    Uses the pooled client, so only the first call pays for client setup and TLS handshake.
     Args:
         prompt (str): The prompt to send to Gemini.
         model (str): The Gemini model to use (default: "gemini-2.5-flash").
+        response_schema (dict): Optional schema; the response is then JSON matching it.
+        usage (TokenUsage): Optional accumulator for the billed tokens.
     Returns:
         str: The generated text response from Gemini.
+    Raises:
+        CircuitOpenError: If the circuit breaker is open (no request is sent).
     """
-    api_key = os.getenv('GEMINI_API_KEY')
-    client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt
-    )
-    return response.text
+    with span("gemini_call"):
+        return _generate_content(prompt, model, response_schema, usage)
+
+
+def _generate_content(prompt, model, response_schema, usage):
+    client = get_client()
+    policy = _RetryPolicy()
+    stats.incr('calls')
+    while True:
+        _before_attempt()
+        try:
+            with get_semaphore():
+                response = client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=policy.config(response_schema)
+                )
+        except Exception as error:
+            delay = policy.retry_delay(error)
+            if delay is None:
+                stats.incr('failures')
+                raise
+            time.sleep(delay)
+        else:
+            return _on_success(response, usage)
+
+
+async def agemini_generate_content(prompt, model=DEFAULT_MODEL, response_schema=None, usage=None):
+    """
+    Async variant of gemini_generate_content using the client's asyncio API.
+    Waiting for Gemini does not block a thread, so one event loop can serve many calls.
+    Args:
+        prompt (str): The prompt to send to Gemini.
+        model (str): The Gemini model to use (default: "gemini-2.5-flash").
+        response_schema (dict): Optional schema; the response is then JSON matching it.
+        usage (TokenUsage): Optional accumulator for the billed tokens.
+    Returns:
+        str: The generated text response from Gemini.
+    Raises:
+        CircuitOpenError: If the circuit breaker is open (no request is sent).
+    """
+    with span("gemini_call"):
+        return await _agenerate_content(prompt, model, response_schema, usage)
+
+
+async def _agenerate_content(prompt, model, response_schema, usage):
+    client = get_async_client()
+    policy = _RetryPolicy()
+    stats.incr('calls')
+    while True:
+        _before_attempt()
+        try:
+            async with get_async_semaphore():
+                response = await client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=policy.config(response_schema)
+                )
+        except Exception as error:
+            delay = policy.retry_delay(error)
+            if delay is None:
+                stats.incr('failures')
+                raise
+            await asyncio.sleep(delay)
+        else:
+            return _on_success(response, usage)
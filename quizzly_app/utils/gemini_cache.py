@@ -0,0 +1,82 @@
+"""
+Persistent cache for Gemini responses.
+Entries are keyed by a hash of the model, the prompt template version and the
+prompt inputs (e.g. the transcript). Bump the template version whenever a prompt
+or its response schema changes, so old responses are no longer used.
+Entries expire after QUIZLY_GEMINI_CACHE_TTL seconds and the least recently used
+entries are evicted above QUIZLY_GEMINI_CACHE_MAX_ENTRIES (see db_cache).
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+
+from quizzly_app.models import GeminiResponseCacheEntry
+from quizzly_app.utils.db_cache import DatabaseCache
+from quizzly_app.utils.stats import Counters
+
+stats = Counters('hits', 'misses', 'stores', 'evictions')
+
+_cache = DatabaseCache(GeminiResponseCacheEntry, 'QUIZLY_GEMINI_CACHE_TTL', 'QUIZLY_GEMINI_CACHE_MAX_ENTRIES', stats)
+
+
+def is_enabled():
+    """
+    Returns True if Gemini responses are cached.
+    """
+    return getattr(settings, 'QUIZLY_GEMINI_CACHE', True)
+
+
+def cache_key(model_name, template_version, *parts):
+    """
+    Returns the cache key (SHA-256 hex digest) for a request.
+    Args:
+        model_name (str): Gemini model name.
+        template_version (str): Version of the prompt template.
+        *parts (str): Inputs filled into the template, e.g. the transcript.
+    """
+    payload = json.dumps([model_name, template_version, *parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_response(key):
+    """
+    Looks up a cached response and records the hit or miss.
+    Expired entries are deleted and count as a miss.
+    Returns:
+        str | None: The cached response text or None.
+    """
+    entry = _cache.get(key=key)
+    return entry.response if entry is not None else None
+
+
+def store_response(key, model_name, template_version, response):
+    """
+    Stores a response in the cache and evicts entries above the size limit.
+    """
+    _cache.store(
+        {'key': key},
+        {'model_name': model_name, 'template_version': template_version, 'response': response},
+    )
+
+
+def evict():
+    """
+    Deletes expired entries and the least recently used entries above the size limit.
+    Returns the number of deleted entries.
+    """
+    return _cache.evict()
+
+
+def purge(template_version=None, model_name=None):
+    """
+    Deletes all entries, or only those of one template version and/or model.
+    Returns the number of deleted entries.
+    """
+    entries = GeminiResponseCacheEntry.objects.all()
+    if template_version:
+        entries = entries.filter(template_version=template_version)
+    if model_name:
+        entries = entries.filter(model_name=model_name)
+    return entries.delete()[0]
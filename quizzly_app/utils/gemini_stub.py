@@ -0,0 +1,123 @@
+"""
+Local stand-in for the Gemini REST API.
+Serves `POST /<version>/models/<model>:generateContent` with a configurable
+reply and latency, so tests and benchmarks can run the real client code
+(via QUIZLY_GEMINI_BASE_URL) without network access.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH_RE = re.compile(r'^/[^/]+/models/(?P<model>[^/:]+):generateContent')
+
+
+class GeminiStubServer:
+    """
+    Threaded HTTP server answering generateContent requests.
+    `reply` may be a string or a callable receiving the prompt text.
+    `status` may be an int or a callable receiving the request number (starting at 1).
+    Counts requests and distinct TCP connections (to observe keep-alive).
+    """
+
+    def __init__(self, reply="[]", latency=0.0, status=200):
+        self.reply = reply
+        self.latency = latency
+        self.status = status
+        self.requests = 0
+        self.prompts = []
+        self.bodies = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Base URL to use as QUIZLY_GEMINI_BASE_URL.
+        """
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                match = GENERATE_PATH_RE.match(self.path)
+                if match is None:
+                    self._send(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                    return
+                prompt = "".join(
+                    part.get("text", "")
+                    for content in body.get("contents", [])
+                    for part in content.get("parts", [])
+                )
+                with stub._lock:
+                    stub.requests += 1
+                    number = stub.requests
+                    stub.prompts.append(prompt)
+                    stub.bodies.append(body)
+                    stub.connections.add(self.client_address)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status = stub.status(number) if callable(stub.status) else stub.status
+                if status != 200:
+                    self._send(status, {"error": {"code": status, "message": "Stub error", "status": "UNAVAILABLE"}})
+                    return
+                text = stub.reply(prompt) if callable(stub.reply) else stub.reply
+                self._send(200, {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                    "usageMetadata": {
+                        "promptTokenCount": len(prompt.split()),
+                        "candidatesTokenCount": len(text.split()),
+                        "totalTokenCount": len(prompt.split()) + len(text.split()),
+                    },
+                    "modelVersion": match.group("model"),
+                })
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (e.g. timed out) before the reply was sent.
+                    self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,195 @@
+"""
+Background job queue for quiz generation.
+Jobs are stored as QuizJob rows and executed by a local thread pool,
+so no external broker is required. Supported backends (QUIZLY_JOB_BACKEND):
+    "thread": run jobs in an in-process worker pool (default).
+    "eager":  run jobs inline in the calling thread (tests, debugging).
+    "db":     only store the job; a separate `process_quiz_jobs` worker runs it.
+A running job renews its lease (updated_at) with every pipeline stage. Jobs
+running without a renewal for QUIZLY_JOB_LEASE_SECONDS, e.g. because their
+process was restarted, are claimed again by the worker.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from quizzly_app.models import QuizJob
+from quizzly_app.utils.stages import STAGE_PROGRESS, pipeline_stage
+
+_executor = None
+_executor_lock = threading.Lock()
+_stage_semaphores = {}
+_stage_semaphores_lock = threading.Lock()
+
+
+def get_job_backend():
+    """
+    Returns the configured job backend name.
+    """
+    return getattr(settings, 'QUIZLY_JOB_BACKEND', 'thread')
+
+
+def get_executor():
+    """
+    Returns the process-wide worker pool, creating it on first use.
+    The pool size is read from QUIZLY_JOB_WORKERS.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'QUIZLY_JOB_WORKERS', 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quiz-job')
+        return _executor
+
+
+def get_stage_semaphore(stage):
+    """
+    Returns the semaphore limiting concurrency of the given pipeline stage.
+    Limits are read from QUIZLY_JOB_STAGE_CONCURRENCY; stages without a limit return None.
+    Args:
+        stage (str): The pipeline stage name.
+    Returns:
+        threading.BoundedSemaphore | None: The stage semaphore or None if unlimited.
+    """
+    limits = getattr(settings, 'QUIZLY_JOB_STAGE_CONCURRENCY', {})
+    limit = limits.get(stage)
+    if not limit:
+        return None
+    with _stage_semaphores_lock:
+        semaphore = _stage_semaphores.get((stage, limit))
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(limit)
+            _stage_semaphores[(stage, limit)] = semaphore
+        return semaphore
+
+
+def enqueue_quiz_job(url, user):
+    """
+    Creates a QuizJob for the given YouTube URL and hands it to the configured backend.
+    Args:
+        url (str): The YouTube video URL.
+        user (User): The owner of the job and the resulting quiz.
+    Returns:
+        QuizJob: The created job (already finished when using the eager backend).
+    """
+    job = QuizJob.objects.create(owner=user, video_url=url)
+    backend = get_job_backend()
+    if backend == 'eager':
+        run_quiz_job(job.pk)
+        job.refresh_from_db()
+    elif backend == 'thread':
+        transaction.on_commit(lambda: submit_quiz_job(job.pk))
+    return job
+
+
+def submit_quiz_job(job_id):
+    """
+    Submits a job to the worker pool.
+    Returns the future of the running job.
+    """
+    return get_executor().submit(_run_in_worker, job_id)
+
+
+def _run_in_worker(job_id):
+    """
+    Runs a job inside a pool thread, taking care of the thread's DB connection.
+    """
+    close_old_connections()
+    try:
+        run_quiz_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def claimable_jobs():
+    """
+    Returns the jobs a worker may claim: pending jobs and running jobs whose lease expired.
+    """
+    lease = timedelta(seconds=getattr(settings, 'QUIZLY_JOB_LEASE_SECONDS', 3600))
+    return QuizJob.objects.filter(
+        Q(status=QuizJob.Status.PENDING)
+        | Q(status=QuizJob.Status.RUNNING, updated_at__lt=timezone.now() - lease)
+    )
+
+
+def claim_quiz_job(job_id):
+    """
+    Atomically moves a pending job, or a running job with an expired lease, to running.
+    Returns True if this caller claimed the job, False if another worker did.
+    """
+    now = timezone.now()
+    claimed = claimable_jobs().filter(pk=job_id).update(
+        status=QuizJob.Status.RUNNING,
+        started_at=now,
+        updated_at=now,
+    )
+    return claimed == 1
+
+
+def run_quiz_job(job_id):
+    """
+    Claims and executes a single quiz-generation job.
+    On success the job references the created quiz; on failure a dummy quiz is
+    created (as the synchronous endpoint did) and the error is stored on the job.
+    Args:
+        job_id (int): Primary key of the QuizJob.
+    """
+    if not claim_quiz_job(job_id):
+        return
+    from quizzly_app.api.helpers import create_quiz_from_youtube, create_dummy_quiz
+    job = QuizJob.objects.select_related('owner').get(pk=job_id)
+    try:
+        quiz_data = create_quiz_from_youtube(job.video_url, job.owner, stage=job_stage(job))
+    except Exception as e:
+        error_msg = f"Quiz creation failed: {str(e)}"
+        quiz_id = None
+        try:
+            quiz_id = create_dummy_quiz(job.video_url, job.owner, error_msg)["dummy_quiz"]["id"]
+        except Exception as dummy_error:
+            error_msg = f"{error_msg} (dummy quiz failed: {str(dummy_error)})"
+        _finish_job(job, QuizJob.Status.FAILED, quiz_id=quiz_id, error=error_msg)
+    else:
+        _finish_job(job, QuizJob.Status.SUCCEEDED, quiz_id=quiz_data["id"])
+
+
+def _finish_job(job, status, quiz_id=None, error=""):
+    """
+    Stores the final state of a job.
+    """
+    job.status = status
+    job.quiz_id = quiz_id
+    job.error = error
+    job.progress = 100
+    job.stage = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'quiz', 'error', 'progress', 'stage', 'finished_at', 'updated_at'])
+
+
+def job_stage(job):
+    """
+    Returns a stage context-manager factory bound to the given job.
+    Each stage records its name and progress on the job and respects the
+    per-stage concurrency limit before running.
+    """
+    @contextmanager
+    def stage(name):
+        job.stage = name
+        job.progress = STAGE_PROGRESS.get(name, job.progress)
+        job.save(update_fields=['stage', 'progress', 'updated_at'])
+        semaphore = get_stage_semaphore(name)
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            with pipeline_stage(name):
+                yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+    return stage
@@ -0,0 +1,200 @@
+"""
+In-process metrics for the quiz pipeline in Prometheus text format.
+`span(step)` times one step (download, transcription, Gemini call, ...) and
+records a duration histogram, an in-flight gauge and an error counter per step.
+The statistics Counters of the caches, the Gemini client etc. are exported as
+counters as well. With QUIZLY_METRICS disabled, spans do nothing.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, math.inf)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def is_enabled():
+    """
+    Returns True if pipeline metrics are collected.
+    """
+    return getattr(settings, 'QUIZLY_METRICS', False)
+
+
+class StepMetrics:
+    """
+    Thread-safe duration histograms, in-flight gauges and error counters per pipeline step.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._in_flight = {}
+        self._errors = {}
+
+    def start(self, step):
+        with self._lock:
+            self._in_flight[step] = self._in_flight.get(step, 0) + 1
+
+    def finish(self, step, seconds, failed=False):
+        with self._lock:
+            self._in_flight[step] -= 1
+            if failed:
+                self._errors[step] = self._errors.get(step, 0) + 1
+            histogram = self._histograms.get(step)
+            if histogram is None:
+                histogram = self._histograms[step] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of all histograms, gauges and error counters.
+        """
+        with self._lock:
+            return {
+                "histograms": {
+                    step: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                    for step, h in self._histograms.items()
+                },
+                "in_flight": dict(self._in_flight),
+                "errors": dict(self._errors),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._in_flight.clear()
+            self._errors.clear()
+
+
+steps = StepMetrics()
+
+
+@contextmanager
+def span(step):
+    """
+    Context manager timing one pipeline step.
+    Args:
+        step (str): Step name, e.g. "download" or "gemini_call".
+    """
+    if not is_enabled():
+        yield
+        return
+    steps.start(step)
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        steps.finish(step, time.perf_counter() - started, failed)
+
+
+def observe(step, seconds, failed=False):
+    """
+    Records a step that was timed elsewhere (e.g. from a callback).
+    """
+    if is_enabled():
+        steps.start(step)
+        steps.finish(step, seconds, failed)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter_groups():
+    """
+    Returns the statistics Counters exported as `quizly_<group>_<name>_total`.
+    """
+    from quizzly_app.utils import (
+        chunked_generation, gemini, gemini_cache, response_cache, single_flight, transcript_cache,
+    )
+    from quizzly_app.utils.quiz_pipeline import parse_stats
+    from user_auth_app import revocation, user_cache
+    return {
+        "gemini": gemini.stats,
+        "gemini_cache": gemini_cache.stats,
+        "transcript_cache": transcript_cache.stats,
+        "quiz_parse": parse_stats,
+        "chunked_generation": chunked_generation.stats,
+        "single_flight": single_flight.stats,
+        "auth_user_cache": user_cache.stats,
+        "token_revocation": revocation.stats,
+        "response_cache": response_cache.stats,
+    }
+
+
+def _gauges():
+    """
+    Returns current resource gauges as (name, help, value).
+    """
+    from quizzly_app.utils import response_cache
+    from quizzly_app.utils.scratch import peek_scratch_space
+    from quizzly_app.utils.whisper_models import get_registry
+    registry = get_registry()
+    gauges = [
+        ("quizly_whisper_models_loaded", "Whisper models currently loaded.", len(registry.loaded_models())),
+        ("quizly_whisper_memory_bytes", "Estimated memory used by loaded Whisper models.", registry.memory_usage()),
+        ("quizly_whisper_loads_total", "Whisper model loads.", registry.loads),
+        ("quizly_whisper_evictions_total", "Whisper model evictions.", registry.evictions),
+        ("quizly_response_cache_hit_ratio", "Share of quiz responses served from the cache.",
+         round(response_cache.hit_rate(), 4)),
+    ]
+    # Only once this process used the scratch space; creating it would purge directories.
+    space = peek_scratch_space()
+    if space is not None:
+        scratch = space.stats()
+        gauges += [
+            ("quizly_scratch_usage_bytes", "Disk space used by downloaded audio.", scratch["usage_bytes"]),
+            ("quizly_scratch_quota_bytes", "Scratch space quota (0 = unlimited).", scratch["quota_bytes"] or 0),
+            ("quizly_scratch_active_dirs", "Jobs currently holding a scratch directory.", scratch["active_dirs"]),
+            ("quizly_scratch_waiting", "Downloads waiting for scratch space.", scratch["waiting"]),
+        ]
+    return gauges
+
+
+def render():
+    """
+    Renders all metrics in the Prometheus text exposition format.
+    """
+    snapshot = steps.snapshot()
+    lines = [
+        "# HELP quizly_pipeline_step_duration_seconds Duration of quiz pipeline steps.",
+        "# TYPE quizly_pipeline_step_duration_seconds histogram",
+    ]
+    for step, histogram in sorted(snapshot["histograms"].items()):
+        for bound, count in zip(steps.buckets, histogram["buckets"]):
+            lines.append(
+                f'quizly_pipeline_step_duration_seconds_bucket{{step="{step}",le="{_format_value(bound)}"}} {count}'
+            )
+        lines.append(f'quizly_pipeline_step_duration_seconds_sum{{step="{step}"}} {histogram["sum"]!r}')
+        lines.append(f'quizly_pipeline_step_duration_seconds_count{{step="{step}"}} {histogram["count"]}')
+    lines += [
+        "# HELP quizly_pipeline_step_in_flight Quiz pipeline steps currently running.",
+        "# TYPE quizly_pipeline_step_in_flight gauge",
+    ]
+    lines += [f'quizly_pipeline_step_in_flight{{step="{step}"}} {value}' for step, value in sorted(snapshot["in_flight"].items())]
+    lines += [
+        "# HELP quizly_pipeline_step_errors_total Failed quiz pipeline steps.",
+        "# TYPE quizly_pipeline_step_errors_total counter",
+    ]
+    lines += [f'quizly_pipeline_step_errors_total{{step="{step}"}} {value}' for step, value in sorted(snapshot["errors"].items())]
+    for group, counters in _counter_groups().items():
+        for name, value in sorted(counters.snapshot().items()):
+            metric = f"quizly_{group}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, help_text, value in _gauges():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
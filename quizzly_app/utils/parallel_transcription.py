@@ -0,0 +1,187 @@
+"""
+Long-audio mode for Whisper transcription.
+Audio is split at silence boundaries into segments, which are transcribed in a
+process pool and stitched back together in order.
+The pool is created once per process and kept between videos, so each worker
+loads its Whisper model only once; it is shut down when the process exits.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Model of the current worker process as (model name, model).
+_worker_model = None
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def frame_energy(audio, frame_samples):
+    """
+    Returns the RMS energy of consecutive frames of the audio.
+    """
+    frames = len(audio) // frame_samples
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    trimmed = audio[:frames * frame_samples].reshape(frames, frame_samples)
+    return np.sqrt(np.mean(trimmed.astype(np.float32) ** 2, axis=1))
+
+
+def find_split_points(audio, segment_seconds, search_seconds=5.0, frame_ms=30, sample_rate=SAMPLE_RATE):
+    """
+    Finds sample offsets to split the audio into segments of about segment_seconds.
+    Each split is moved to the quietest frame within search_seconds of the target
+    position, so words are not cut in half.
+    Args:
+        audio (numpy.ndarray): Mono audio samples.
+        segment_seconds (float): Target segment length in seconds.
+        search_seconds (float): How far a split may move to find silence.
+        frame_ms (int): Frame length used for the energy analysis.
+        sample_rate (int): Sample rate of the audio.
+    Returns:
+        list: Increasing sample offsets where the audio should be split.
+    """
+    frame_samples = int(sample_rate * frame_ms / 1000)
+    energy = frame_energy(audio, frame_samples)
+    segment_samples = int(segment_seconds * sample_rate)
+    search_frames = int(search_seconds * sample_rate / frame_samples)
+    splits = []
+    target = segment_samples
+    while target < len(audio) - segment_samples // 4:
+        center = target // frame_samples
+        start = max(center - search_frames, 0)
+        end = min(center + search_frames + 1, len(energy))
+        if start < end:
+            split = (start + int(np.argmin(energy[start:end]))) * frame_samples
+        else:
+            split = target
+        if splits and split <= splits[-1]:
+            split = target
+        splits.append(split)
+        target = split + segment_samples
+    return splits
+
+
+def split_audio(audio, segment_seconds, **kwargs):
+    """
+    Splits the audio at silence boundaries into segments of about segment_seconds.
+    Returns a list of audio arrays in their original order.
+    """
+    bounds = [0] + find_split_points(audio, segment_seconds, **kwargs) + [len(audio)]
+    return [audio[start:end] for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _init_worker(torch_threads):
+    """
+    Limits the torch threads of a worker process, so the workers share the CPU cores.
+    """
+    import torch
+    torch.set_num_threads(torch_threads)
+
+
+def _transcribe_segment(task):
+    """
+    Transcribes one segment in a worker process.
+    The worker loads the model on first use and keeps it for later segments;
+    a different model name replaces it, so each worker holds one model.
+    """
+    global _worker_model
+    model_name, segment = task
+    if _worker_model is None or _worker_model[0] != model_name:
+        import whisper
+        _worker_model = None
+        _worker_model = (model_name, whisper.load_model(model_name))
+    return _worker_model[1].transcribe(segment)["text"].strip()
+
+
+def default_workers():
+    """
+    Returns the number of worker processes, based on the available CPU cores.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_pool(workers=None):
+    """
+    Returns the process-wide worker pool, created on first use.
+    A pool of a different size replaces the current one (e.g. in benchmarks).
+    Args:
+        workers (int): Number of worker processes (default: available CPU cores).
+    """
+    global _pool, _pool_workers
+    workers = max(1, workers or default_workers())
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(max(1, default_workers() // workers),),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Shuts the worker pool down; the next transcription starts a new one.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool, _pool_workers = _pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def transcribe_segments(segments, model_name="base", workers=None):
+    """
+    Transcribes audio segments in the process pool and joins the text in order.
+    Args:
+        segments (list): Audio arrays at 16 kHz.
+        model_name (str): Whisper model name (default: "base").
+        workers (int): Number of worker processes (default: available CPU cores).
+    Returns:
+        str: Transcribed text of all segments.
+    """
+    pool = get_pool(workers)
+    try:
+        texts = list(pool.map(_transcribe_segment, [(model_name, segment) for segment in segments]))
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a fresh pool for the next video.
+        with _pool_lock:
+            broken = _pool is pool
+        if broken:
+            shutdown_pool()
+        raise
+    return " ".join(text for text in texts if text)
+
+
+def transcribe_long_audio(audio, model_name="base", segment_seconds=120, workers=None):
+    """
+    Splits long audio at silence boundaries and transcribes the segments in parallel.
+    Args:
+        audio (numpy.ndarray): Mono audio samples at 16 kHz.
+        model_name (str): Whisper model name (default: "base").
+        segment_seconds (float): Target segment length in seconds.
+        workers (int): Number of worker processes (default: available CPU cores).
+    Returns:
+        str: Transcribed text from the audio.
+    """
+    return transcribe_segments(split_audio(audio, segment_seconds), model_name, workers)
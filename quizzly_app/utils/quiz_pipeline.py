@@ -1,18 +1,65 @@
 import yt_dlp
-import whisper
+import json
 import tempfile
 import os
+import queue
+import subprocess
+import threading
+import time
 
+import numpy as np
+from django.conf import settings
 
-def extract_audio_from_youtube(url):
+from quizzly_app.utils.metrics import observe, span
+from quizzly_app.utils.stats import Counters
+from quizzly_app.utils.whisper_models import use_model
+
+SAMPLE_RATE = 16000
+
+QUESTION_COUNT = 10
+OPTION_COUNT = 4
+
+# Part of the Gemini response cache key; bump when the quiz prompt or schema changes.
+QUIZ_PROMPT_VERSION = "quiz-v1"
+
+# Structured output: Gemini is constrained to return exactly this JSON shape.
+QUIZ_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "min_items": 1,
+    "max_items": QUESTION_COUNT,
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "question_title": {"type": "STRING"},
+            "question_options": {
+                "type": "ARRAY",
+                "items": {"type": "STRING"},
+                "min_items": OPTION_COUNT,
+                "max_items": OPTION_COUNT,
+            },
+            "answer": {"type": "STRING", "description": "Exact text of the correct option."},
+        },
+        "required": ["question_title", "question_options", "answer"],
+        "property_ordering": ["question_title", "question_options", "answer"],
+    },
+}
+
+# Outcome of parsing Gemini responses: complete, salvaged (some questions recovered), failed (dummy used)
+parse_stats = Counters('complete', 'salvaged', 'failed', 'dropped_questions')
+
+
+def extract_audio_from_youtube(url, tmp_dir=None):
     """
     Downloads the audio from a YouTube URL as mp3 and returns the file path.
     Args:
         url (str): The YouTube video URL.
+        tmp_dir (str): Directory for the download; the caller owns and deletes it.
+            A new temporary directory is created if omitted.
     Returns:
         str: Path to the downloaded mp3 file.
     """
-    tmp_dir = tempfile.mkdtemp()
+    if tmp_dir is None:
+        tmp_dir = tempfile.mkdtemp()
     tmp_filename = os.path.join(tmp_dir, '%(id)s.%(ext)s')
     ydl_opts = {
         "format": "bestaudio/best",
@@ -24,6 +71,7 @@ def extract_audio_from_youtube(url):
             'preferredcodec': 'mp3',
             'preferredquality': '192',
         }],
+        "postprocessor_hooks": [_audio_conversion_hook()],
     }
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=True)
@@ -32,56 +80,492 @@ def extract_audio_from_youtube(url):
     return audio_path
 
 
+def _audio_conversion_hook():
+    """
+    Returns a yt-dlp postprocessor hook timing the FFmpeg audio conversion as the "audio_conversion" span.
+    """
+    started = {}
+
+    def hook(status):
+        if status.get('postprocessor') != 'FFmpegExtractAudio':
+            return
+        if status.get('status') == 'started':
+            started['at'] = time.perf_counter()
+        elif status.get('status') == 'finished' and 'at' in started:
+            observe("audio_conversion", time.perf_counter() - started.pop('at'))
+
+    return hook
+
+
 def transcribe_audio(audio_path, model_name="base"):
     """
     Transcribes the audio file using Whisper and returns the transcript text.
+    The model is taken from the process-wide registry, so it is loaded only once.
+    With QUIZLY_LONG_AUDIO_TRANSCRIPTION, audio longer than
+    QUIZLY_LONG_AUDIO_MIN_SECONDS is split and transcribed in parallel.
     Args:
         audio_path (str): Path to the audio file.
         model_name (str): Whisper model name (default: "base").
     Returns:
         str: Transcribed text from the audio.
     """
-    model = whisper.load_model(model_name)
-    result = model.transcribe(audio_path)
+    audio = audio_path
+    if getattr(settings, 'QUIZLY_LONG_AUDIO_TRANSCRIPTION', False):
+        from whisper.audio import load_audio
+        from quizzly_app.utils.parallel_transcription import transcribe_long_audio
+        audio = load_audio(audio_path)
+        if len(audio) >= getattr(settings, 'QUIZLY_LONG_AUDIO_MIN_SECONDS', 600) * SAMPLE_RATE:
+            return transcribe_long_audio(
+                audio,
+                model_name=model_name,
+                segment_seconds=getattr(settings, 'QUIZLY_LONG_AUDIO_SEGMENT_SECONDS', 120),
+                workers=getattr(settings, 'QUIZLY_LONG_AUDIO_WORKERS', None),
+            )
+    with use_model(model_name) as model:
+        result = model.transcribe(audio)
     return result["text"]
 
 
-def generate_quiz_with_gemini(transcript):
+def resolve_audio_stream(url):
     """
-    Sends the transcript to Gemini-Flash AI and receives quiz questions.
-    Returns a list of questions with title, options, and answer.
+    Resolves the direct URL of the best audio stream without downloading it.
+    Args:
+        url (str): The YouTube video URL.
+    Returns:
+        tuple: (stream_url, http_headers) needed to fetch the audio stream.
+    """
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "quiet": True,
+        "noplaylist": True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return info["url"], info.get("http_headers", {})
+
+
+def open_pcm_stream(stream_url, headers=None):
+    """
+    Starts FFmpeg decoding the remote audio stream to 16 kHz mono PCM on stdout.
+    Nothing is written to disk.
+    Args:
+        stream_url (str): Direct URL of the audio stream.
+        headers (dict): HTTP headers required by the stream host.
+    Returns:
+        subprocess.Popen: The running FFmpeg process.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+    cmd += ["-i", stream_url, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def iter_pcm_chunks(stream, chunk_seconds=30):
+    """
+    Reads 16-bit PCM from a binary stream and yields float32 chunks for Whisper.
+    Args:
+        stream: Binary file-like object with s16le mono PCM at 16 kHz.
+        chunk_seconds (int): Length of each chunk in seconds.
+    Yields:
+        numpy.ndarray: Audio samples scaled to [-1, 1].
+    """
+    chunk_bytes = chunk_seconds * SAMPLE_RATE * 2
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            return
+        if len(data) % 2:
+            data = data[:-1]
+        yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+def read_ahead(iterable, size):
+    """
+    Consumes an iterable in a background thread, buffering up to `size` items.
+    Lets decoding continue while the caller is busy (e.g. transcribing).
+    Errors raised by the iterable are re-raised in the caller.
+    """
+    items = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+        except Exception as exc:
+            put(("error", exc))
+            return
+        put(("end", None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            kind, item = items.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def transcribe_chunks(chunks, model_name="base"):
+    """
+    Transcribes consecutive audio chunks and joins the text in order.
+    The end of the previous chunk is passed as prompt to keep context across chunks.
+    Args:
+        chunks (iterable): float32 audio arrays at 16 kHz.
+        model_name (str): Whisper model name (default: "base").
+    Returns:
+        str: Transcribed text from all chunks.
+    """
+    texts = []
+    for chunk in chunks:
+        prompt = texts[-1][-200:] if texts else None
+        with use_model(model_name) as model:
+            result = model.transcribe(chunk, initial_prompt=prompt)
+        text = result["text"].strip()
+        if text:
+            texts.append(text)
+    return " ".join(texts)
+
+
+def transcribe_audio_stream(stream_url, headers=None, model_name="base", chunk_seconds=30, read_ahead_chunks=4):
+    """
+    Transcribes a remote audio stream while it is still being downloaded.
+    FFmpeg decodes the stream straight to PCM, which is transcribed chunk by chunk,
+    skipping the MP3 round-trip and any intermediate file.
+    Args:
+        stream_url (str): Direct URL of the audio stream.
+        headers (dict): HTTP headers required by the stream host.
+        model_name (str): Whisper model name (default: "base").
+        chunk_seconds (int): Length of each transcribed chunk in seconds.
+        read_ahead_chunks (int): Number of decoded chunks buffered ahead of transcription.
+    Returns:
+        str: Transcribed text from the audio.
+    """
+    process = open_pcm_stream(stream_url, headers)
+    try:
+        chunks = read_ahead(iter_pcm_chunks(process.stdout, chunk_seconds), read_ahead_chunks)
+        transcript = transcribe_chunks(chunks, model_name)
+        process.wait()
+        if process.returncode != 0:
+            error = process.stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"FFmpeg failed: {error}")
+        return transcript
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def build_quiz_prompt(transcript):
+    """
+    Builds the Gemini prompt asking for 10 quiz questions about the transcript.
     Args:
         transcript (str): The transcript text to generate questions from.
     Returns:
-        list: List of question dicts with 'question_title', 'question_options', and 'answer'.
+        str: The prompt text.
     """
-    from quizzly_app.utils.gemini import gemini_generate_content
-    prompt = (
+    return (
         "Erstelle ein Quiz mit 10 Fragen und jeweils 4 Antwortmöglichkeiten aus folgendem Transkript. "
         "Gib die Fragen als JSON-Liste mit den Feldern 'question_title', 'question_options' und 'answer' zurück.\nTranskript:\n" + transcript
     )
-    response = gemini_generate_content(prompt)
-    import json
-    # Entferne Markdown-Wrapper
-    if response.strip().startswith('```json'):
-        response = response.strip()[7:]
-    if response.strip().endswith('```'):
-        response = response.strip()[:-3]
-    response = response.strip()
-    try:
-        questions = json.loads(response)
-    except Exception:
-        # Fallback: Dummy-Fragen falls Parsing fehlschlägt
-        questions = []
-        for i in range(10):
-            questions.append({
-                "question_title": f"[Dummy] KI/Parsing-Fehler – Beispiel-Frage {i+1}",
-                "question_options": [
-                    "Die KI konnte keine echte Antwort generieren.",
-                    "Dies ist eine Dummy-Option.",
-                    "Bitte prüfen Sie die Eingabedaten.",
-                    "Kontaktieren Sie ggf. den Support."
-                ],
-                "answer": "Keine echte Antwort vorhanden (Dummy)"
-            })
+
+
+def parse_quiz_response(response):
+    """
+    Parses the Gemini response into a list of validated questions.
+    Valid JSON is used as is. Otherwise every complete question object is salvaged
+    from the text (e.g. when the output was cut off or contains stray text).
+    Questions with a wrong shape are dropped; dummy questions are only returned
+    if no valid question is left.
+    Args:
+        response (str): The raw text returned by Gemini.
+    Returns:
+        list: List of question dicts with 'question_title', 'question_options', and 'answer'.
+    """
+    with span("parse"):
+        questions, candidates, complete = _decode_questions(response)
+    if not questions:
+        parse_stats.incr('failed')
+        return dummy_questions()
+    parse_stats.incr('dropped_questions', max(len(candidates) - len(questions), 0))
+    parse_stats.incr('complete' if complete and len(questions) == len(candidates) else 'salvaged')
     return questions
+
+
+def extract_questions(response):
+    """
+    Returns the valid questions contained in a Gemini response (possibly none).
+    Unlike parse_quiz_response there is no dummy fallback.
+    """
+    return _decode_questions(response)[0]
+
+
+def _decode_questions(response):
+    """
+    Decodes and validates the questions of a response.
+    Returns:
+        tuple: (valid questions, all candidates, whether the response was valid JSON).
+    """
+    text = _strip_code_fence(response or "")
+    try:
+        candidates = list(_question_candidates([json.loads(text)]))
+        complete = True
+    except ValueError:
+        candidates = list(_question_candidates(_iter_json_objects(text)))
+        complete = False
+    return validate_questions(candidates), candidates, complete
+
+
+def _strip_code_fence(text):
+    """
+    Removes a surrounding Markdown code fence (```json ... ```).
+    """
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+    if text.endswith('```'):
+        text = text[:-3]
+    return text.strip()
+
+
+def _iter_json_objects(text):
+    """
+    Yields every JSON object that can be decoded from the text, left to right.
+    An object that cannot be decoded (e.g. cut off) is skipped, but objects nested
+    in it are still found.
+    """
+    decoder = json.JSONDecoder()
+    position = text.find('{')
+    while position != -1:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except ValueError:
+            position = text.find('{', position + 1)
+            continue
+        yield value
+        position = text.find('{', end)
+
+
+def _question_candidates(values):
+    """
+    Yields question-like dicts from decoded JSON values.
+    Accepts a list of questions, a single question or an object wrapping a list (e.g. {"questions": [...]}).
+    """
+    for value in values:
+        if isinstance(value, list):
+            yield from (item for item in value if isinstance(item, dict))
+        elif isinstance(value, dict) and 'question_title' in value:
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                if isinstance(item, list):
+                    yield from (entry for entry in item if isinstance(entry, dict))
+
+
+def validate_questions(candidates):
+    """
+    Normalizes question dicts and drops invalid ones and duplicates.
+    Args:
+        candidates (list): Decoded question dicts.
+    Returns:
+        list: At most QUESTION_COUNT valid questions.
+    """
+    questions = []
+    titles = set()
+    for candidate in candidates:
+        question = normalize_question(candidate)
+        if question is None or question["question_title"] in titles:
+            continue
+        titles.add(question["question_title"])
+        questions.append(question)
+    return questions[:QUESTION_COUNT]
+
+
+def normalize_question(item):
+    """
+    Checks the shape of one question and normalizes it.
+    A question needs a title, OPTION_COUNT distinct non-empty options and an answer
+    that is one of the options. The answer may also be given as an option index or
+    letter ("B"), which is resolved to the option text.
+    Returns:
+        dict: The normalized question, or None if it is invalid.
+    """
+    title = item.get('question_title')
+    options = item.get('question_options')
+    if not isinstance(title, str) or not title.strip():
+        return None
+    if not isinstance(options, list) or len(options) != OPTION_COUNT:
+        return None
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return None
+    options = [option.strip() for option in options]
+    if len(set(options)) != OPTION_COUNT:
+        return None
+    answer = _resolve_answer(item.get('answer'), options)
+    if answer is None:
+        return None
+    return {"question_title": title.strip(), "question_options": options, "answer": answer}
+
+
+def _resolve_answer(answer, options):
+    """
+    Returns the option text the answer refers to, or None.
+    """
+    if isinstance(answer, bool):
+        return None
+    if isinstance(answer, int):
+        return options[answer] if 0 <= answer < len(options) else None
+    if not isinstance(answer, str):
+        return None
+    answer = answer.strip()
+    if answer in options:
+        return answer
+    letter = answer.rstrip(').:').upper()
+    if len(letter) == 1 and 'A' <= letter < chr(ord('A') + len(options)):
+        return options[ord(letter) - ord('A')]
+    matches = [option for option in options if option.casefold() == answer.casefold()]
+    return matches[0] if len(matches) == 1 else None
+
+
+DUMMY_QUESTIONS = tuple(
+    {
+        "question_title": f"[Dummy] KI/Parsing-Fehler – Beispiel-Frage {i+1}",
+        "question_options": (
+            "Die KI konnte keine echte Antwort generieren.",
+            "Dies ist eine Dummy-Option.",
+            "Bitte prüfen Sie die Eingabedaten.",
+            "Kontaktieren Sie ggf. den Support."
+        ),
+        "answer": "Keine echte Antwort vorhanden (Dummy)"
+    }
+    for i in range(QUESTION_COUNT)
+)
+
+
+def dummy_questions():
+    """
+    Returns 10 placeholder questions used when no real questions could be generated.
+    Built from the precomputed DUMMY_QUESTIONS template; no external call is made.
+    """
+    return [
+        {**question, "question_options": list(question["question_options"])}
+        for question in DUMMY_QUESTIONS
+    ]
+
+
+def lookup_cached_response(template_version, key_parts):
+    """
+    Looks up a cached Gemini response for a quiz prompt.
+    Args:
+        template_version (str): Version of the prompt template.
+        key_parts (tuple): The inputs the prompt was built from (e.g. the transcript).
+    Returns:
+        tuple: (cache key or None if caching is disabled, cached response or None).
+    """
+    from quizzly_app.utils import gemini_cache
+    from quizzly_app.utils.gemini import DEFAULT_MODEL
+    if not gemini_cache.is_enabled():
+        return None, None
+    key = gemini_cache.cache_key(DEFAULT_MODEL, template_version, *key_parts)
+    return key, gemini_cache.get_response(key)
+
+
+def store_cached_response(key, template_version, response):
+    """
+    Caches a Gemini response if it contains at least one valid question,
+    so a broken response is not served again.
+    """
+    from quizzly_app.utils import gemini_cache
+    from quizzly_app.utils.gemini import DEFAULT_MODEL
+    if key is not None and extract_questions(response):
+        gemini_cache.store_response(key, DEFAULT_MODEL, template_version, response)
+
+
+def cached_quiz_response(prompt, template_version, key_parts, usage=None):
+    """
+    Returns Gemini's schema-constrained response to a quiz prompt.
+    The response cache is consulted first and updated after a call.
+    Args:
+        prompt (str): The prompt text.
+        template_version (str): Version of the prompt template.
+        key_parts (tuple): The inputs the prompt was built from (e.g. the transcript).
+        usage (TokenUsage): Optional accumulator for the billed Gemini tokens.
+    Returns:
+        str: The raw response text.
+    """
+    from quizzly_app.utils.gemini import gemini_generate_content
+    key, response = lookup_cached_response(template_version, key_parts)
+    if response is None:
+        response = gemini_generate_content(prompt, response_schema=QUIZ_RESPONSE_SCHEMA, usage=usage)
+        store_cached_response(key, template_version, response)
+    return response
+
+
+async def acached_quiz_response(prompt, template_version, key_parts, usage=None):
+    """
+    Async variant of cached_quiz_response.
+    """
+    from asgiref.sync import sync_to_async
+    from quizzly_app.utils.gemini import agemini_generate_content
+    key, response = await sync_to_async(lookup_cached_response)(template_version, key_parts)
+    if response is None:
+        response = await agemini_generate_content(prompt, response_schema=QUIZ_RESPONSE_SCHEMA, usage=usage)
+        await sync_to_async(store_cached_response)(key, template_version, response)
+    return response
+
+
+def generate_quiz_with_gemini(transcript, usage=None):
+    """
+    Sends the transcript to Gemini-Flash AI and receives quiz questions.
+    The response is constrained to QUIZ_RESPONSE_SCHEMA (JSON mode) and cached
+    per transcript (see gemini_cache).
+    Long transcripts are split into token-budgeted chunks when
+    QUIZLY_CHUNKED_GENERATION is enabled (see chunked_generation).
+    Returns a list of questions with title, options, and answer.
+    Args:
+        transcript (str): The transcript text to generate questions from.
+        usage (TokenUsage): Optional accumulator for the billed Gemini tokens.
+    Returns:
+        list: List of question dicts with 'question_title', 'question_options', and 'answer'.
+    """
+    from quizzly_app.utils import chunked_generation
+    if chunked_generation.should_chunk(transcript):
+        return chunked_generation.generate_quiz_chunked(transcript, usage=usage)
+    response = cached_quiz_response(build_quiz_prompt(transcript), QUIZ_PROMPT_VERSION, (transcript,), usage=usage)
+    return parse_quiz_response(response)
+
+
+async def agenerate_quiz_with_gemini(transcript, usage=None):
+    """
+    Async variant of generate_quiz_with_gemini.
+    Awaits the Gemini call without blocking a thread.
+    Args:
+        transcript (str): The transcript text to generate questions from.
+        usage (TokenUsage): Optional accumulator for the billed Gemini tokens.
+    Returns:
+        list: List of question dicts with 'question_title', 'question_options', and 'answer'.
+    """
+    from quizzly_app.utils import chunked_generation
+    if chunked_generation.should_chunk(transcript):
+        return await chunked_generation.agenerate_quiz_chunked(transcript, usage=usage)
+    response = await acached_quiz_response(
+        build_quiz_prompt(transcript), QUIZ_PROMPT_VERSION, (transcript,), usage=usage
+    )
+    return parse_quiz_response(response)
@@ -0,0 +1,130 @@
+"""
+Resilience helpers for calls to external services: jittered exponential backoff
+and a circuit breaker that fails fast while the error rate of recent calls is high.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the service while the circuit breaker is open.
+    """
+
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} unavailable (circuit open, retry in {retry_after:.0f}s)")
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker based on the failure rate within a sliding time window.
+    closed: calls pass; the breaker opens once at least `min_calls` calls within
+        `window_seconds` failed at a rate of `failure_rate` or more.
+    open: calls are rejected with CircuitOpenError for `reset_seconds`.
+    half-open: one trial call passes; success closes the breaker, failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_rate=0.5, min_calls=10, window_seconds=60, reset_seconds=30, clock=time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self):
+        """
+        Current state; an open breaker turns half-open once reset_seconds have passed.
+        """
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    def _prune(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def before_call(self):
+        """
+        Reserves a call. Raises CircuitOpenError if the call is not allowed.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                raise CircuitOpenError(self.name, self.reset_seconds - (self._clock() - self._opened_at))
+            if state == self.HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError(self.name, 0)
+                self._trial_running = True
+
+    def record_success(self):
+        """
+        Records a successful call.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._trial_running = False
+                return
+            now = self._clock()
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self):
+        """
+        Records a failed call and opens the breaker if the failure rate is too high.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._state == self.HALF_OPEN:
+                self._open(now)
+                return
+            self._outcomes.append((now, False))
+            self._prune(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._trial_running = False
+
+    def reset(self):
+        """
+        Closes the breaker and forgets all recorded calls.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+            self._trial_running = False
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=8.0):
+    """
+    Returns the sleep time before retry number `attempt` (starting at 1).
+    Uses exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
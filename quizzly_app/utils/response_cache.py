@@ -0,0 +1,141 @@
+"""
+Cache of rendered quiz JSON for the quiz detail and the (non-paginated) quiz list.
+Entries are stored per quiz and per user list (full or summary) together with
+the ETag of the state they were rendered from (see get_quiz_list_validators and
+get_quiz_detail_validators). An entry is only served while its ETag still
+matches, so a change made by another process is never served stale, even with
+a per-process cache.
+Saving or deleting a quiz and saving a question drops the affected entries right
+away (see QuizzlyAppConfig.ready); create_questions, which bypasses the
+signals with bulk_create, calls invalidate_quiz itself.
+Entries live in the Django cache CACHES["quiz_responses"] (LocMemCache or
+FileBasedCache, see QUIZLY_RESPONSE_CACHE); without that alias the cache is disabled.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from quizzly_app.utils.stats import Counters
+
+CACHE_ALIAS = 'quiz_responses'
+
+stats = Counters('hits', 'misses', 'stores', 'invalidations')
+
+
+def get_cache():
+    """
+    Returns the Django cache holding the responses, or None if the alias is not configured.
+    """
+    if CACHE_ALIAS not in settings.CACHES:
+        return None
+    return caches[CACHE_ALIAS]
+
+
+def quiz_key(quiz_id):
+    return f"quiz:{quiz_id}"
+
+
+def list_key(user_id, summary=False):
+    return f"quizzes:{user_id}:{'summary' if summary else 'full'}"
+
+
+def get_or_render(key, etag, build):
+    """
+    Returns the rendered JSON for the key if cached for the given ETag, otherwise
+    renders build() and stores it.
+    Args:
+        key (str): quiz_key or list_key.
+        etag (str): ETag of the current state the data is built from.
+        build (callable): Returns the serialized data.
+    Returns:
+        str: The rendered JSON.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None and cached[0] == etag:
+            stats.incr('hits')
+            return cached[1]
+        stats.incr('misses')
+    body = JSONRenderer().render(build()).decode('utf-8')
+    if cache is not None:
+        cache.set(key, (etag, body))
+        stats.incr('stores')
+    return body
+
+
+class RenderedJSONResponse(Response):
+    """
+    DRF response whose JSON body is already rendered, so it is sent as it is.
+    `data` is only parsed from the body when accessed (e.g. by the test client).
+    """
+
+    def __init__(self, body, status=None):
+        super().__init__(status=status)
+        self.body = body
+        self.content = body
+        self['Content-Type'] = 'application/json'
+
+    @property
+    def data(self):
+        if self._data is None and self.body is not None:
+            self._data = json.loads(self.body)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self.body = None
+
+
+def json_response(request, body):
+    """
+    Returns rendered JSON as response. The body is sent as it is if the request
+    negotiated JSON; other renderers (e.g. the browsable API) render the data again.
+    """
+    if isinstance(getattr(request, 'accepted_renderer', None), JSONRenderer):
+        return RenderedJSONResponse(body)
+    return Response(json.loads(body))
+
+
+def invalidate_quiz(quiz_id, owner_id=None):
+    """
+    Drops the cached detail of a quiz and the cached lists of its owner.
+    """
+    cache = get_cache()
+    if cache is None:
+        return
+    keys = [quiz_key(quiz_id)]
+    if owner_id is not None:
+        keys += [list_key(owner_id), list_key(owner_id, summary=True)]
+    cache.delete_many(keys)
+    stats.incr('invalidations')
+
+
+def hit_rate():
+    """
+    Returns the share of lookups answered from the cache (0.0 without lookups).
+    """
+    counts = stats.snapshot()
+    lookups = counts['hits'] + counts['misses']
+    return counts['hits'] / lookups if lookups else 0.0
+
+
+def quiz_changed(sender, instance, **kwargs):
+    """
+    post_save / post_delete receiver for Quiz.
+    """
+    invalidate_quiz(instance.pk, instance.owner_id)
+
+
+def question_saved(sender, instance, **kwargs):
+    """
+    post_save receiver for Question. Only the quiz detail is dropped, without
+    loading the quiz for its owner; the owner's lists are not served stale
+    because the saved question changes their ETag.
+    """
+    invalidate_quiz(instance.quiz_id)
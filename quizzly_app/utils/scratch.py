@@ -0,0 +1,237 @@
+"""
+Scratch-space manager for downloaded audio.
+Every pipeline run gets its own directory below QUIZLY_SCRATCH_DIR, which is
+removed when the run finishes (successfully or not). A disk quota shared by all
+processes using the same root applies backpressure: new downloads wait until
+enough space is free. Directory names carry the pid of the owning process, so
+usage of other processes is counted and only directories of dead processes are
+purged. The root must therefore be local to the host.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class ScratchSpaceFull(Exception):
+    """
+    Raised when no scratch space becomes available within the wait timeout.
+    """
+
+
+def owner_pid(name):
+    """
+    Returns the pid of the process owning a job directory, or None for foreign names.
+    Job directories are named "<prefix><pid>-<random>".
+    """
+    parts = name.rsplit("-", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return None
+    return int(parts[1])
+
+
+def pid_alive(pid):
+    """
+    Returns True if a process with the given pid exists.
+    """
+    if os.name == "nt":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def directory_size(path):
+    """
+    Returns the total size in bytes of all files below the given directory.
+    """
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ScratchSpace:
+    """
+    Owns per-job scratch directories and enforces a disk quota on the whole root.
+    Each directory of a running process counts with at least `reserve_bytes`
+    (the expected size of a download) so that concurrent downloads cannot
+    overshoot the quota before their files have grown.
+    """
+
+    def __init__(self, root, quota_bytes=None, reserve_bytes=0, wait_timeout=None, poll_interval=0.5):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.reserve_bytes = reserve_bytes
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._active = set()
+        self._waiting = 0
+        self._condition = threading.Condition()
+        os.makedirs(root, exist_ok=True)
+
+    def _job_dirs(self):
+        """
+        Returns (path, reserved) for every directory below the root; directories
+        of dead processes and of this process that are no longer active hold no reservation.
+        """
+        with os.scandir(self.root) as entries:
+            paths = [entry.path for entry in entries if entry.is_dir()]
+        # Read after scanning, so a directory created meanwhile is never taken as abandoned.
+        with self._condition:
+            active = set(self._active)
+        pid = os.getpid()
+        dirs = []
+        for path in paths:
+            owner = owner_pid(os.path.basename(path))
+            if owner == pid:
+                reserved = path in active
+            else:
+                reserved = owner is not None and pid_alive(owner)
+            dirs.append((path, reserved))
+        return dirs
+
+    def usage(self):
+        """
+        Returns the bytes currently used below the root, by all processes.
+        """
+        return sum(directory_size(path) for path, _ in self._job_dirs())
+
+    def _committed(self):
+        """
+        Returns the bytes accounted against the quota (actual size or reservation).
+        """
+        return sum(
+            max(directory_size(path), self.reserve_bytes if reserved else 0)
+            for path, reserved in self._job_dirs()
+        )
+
+    def _has_room(self):
+        """
+        Returns True if one more job directory fits into the quota.
+        A job always starts if nothing else is using the root.
+        """
+        if self.quota_bytes is None:
+            return True
+        committed = self._committed()
+        return committed == 0 or committed + self.reserve_bytes <= self.quota_bytes
+
+    def acquire(self, prefix="quiz-"):
+        """
+        Creates a new job directory, waiting while the quota is exhausted.
+        Raises ScratchSpaceFull if no space is freed within the wait timeout.
+        Returns the path of the new directory.
+        """
+        deadline = None if self.wait_timeout is None else time.monotonic() + self.wait_timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while not self._has_room():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise ScratchSpaceFull("Scratch space quota exceeded.")
+                    timeout = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting -= 1
+            path = tempfile.mkdtemp(prefix=f"{prefix}{os.getpid()}-", dir=self.root)
+            self._active.add(path)
+            return path
+
+    def release(self, path):
+        """
+        Deletes a job directory and wakes up waiting jobs.
+        """
+        shutil.rmtree(path, ignore_errors=True)
+        with self._condition:
+            self._active.discard(path)
+            self._condition.notify_all()
+
+    @contextmanager
+    def job_dir(self, prefix="quiz-"):
+        """
+        Context manager yielding a job directory that is removed afterwards.
+        """
+        path = self.acquire(prefix)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def purge_stale(self, max_age_seconds):
+        """
+        Removes directories below the root that were left behind by dead processes.
+        Directories whose name carries no pid are removed once older than max_age_seconds.
+        Cleans up after crashed processes. Returns the number of removed directories.
+        """
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        for path, reserved in self._job_dirs():
+            if reserved:
+                continue
+            if owner_pid(os.path.basename(path)) is None and os.stat(path).st_mtime >= cutoff:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def stats(self):
+        """
+        Returns current usage figures for monitoring.
+        """
+        with self._condition:
+            active = len(self._active)
+            waiting = self._waiting
+        return {
+            "usage_bytes": self.usage(),
+            "quota_bytes": self.quota_bytes,
+            "active_dirs": active,
+            "waiting": waiting,
+        }
+
+
+_scratch_space = None
+_scratch_space_lock = threading.Lock()
+
+
+def get_scratch_space():
+    """
+    Returns the process-wide scratch space, configured from settings.
+    Directories left by dead processes are purged on first use.
+    """
+    global _scratch_space
+    with _scratch_space_lock:
+        if _scratch_space is None:
+            root = getattr(settings, 'QUIZLY_SCRATCH_DIR', None) or os.path.join(tempfile.gettempdir(), 'quizly')
+            quota_mb = getattr(settings, 'QUIZLY_SCRATCH_QUOTA_MB', None)
+            reserve_mb = getattr(settings, 'QUIZLY_SCRATCH_RESERVE_MB', 0)
+            _scratch_space = ScratchSpace(
+                root=root,
+                quota_bytes=quota_mb * 1024 * 1024 if quota_mb else None,
+                reserve_bytes=reserve_mb * 1024 * 1024,
+                wait_timeout=getattr(settings, 'QUIZLY_SCRATCH_WAIT_TIMEOUT', None),
+            )
+            _scratch_space.purge_stale(getattr(settings, 'QUIZLY_SCRATCH_STALE_AFTER', 24 * 60 * 60))
+        return _scratch_space
+
+
+def peek_scratch_space():
+    """
+    Returns the process-wide scratch space if it was already created, otherwise None.
+    Unlike get_scratch_space it never touches the filesystem (e.g. for /metrics).
+    """
+    return _scratch_space
@@ -0,0 +1,174 @@
+"""
+Single-flight coordination of identical quiz pipeline runs.
+Within a process, concurrent calls with the same key wait for the first call
+(the leader) and share its result. Across processes a PipelineLock row marks the
+key as in progress; other processes wait until the row is released and then
+take the lock one after another, so the pipeline never runs concurrently for a
+key. After a successful run this is cheap because the transcript and the Gemini
+response are cached; after a failed run only the next lock holder retries.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from quizzly_app.models import PipelineLock
+from quizzly_app.utils.stats import Counters
+
+stats = Counters('leaders', 'followers', 'remote_waits', 'takeovers', 'wait_timeouts')
+
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class _Call:
+    """
+    An in-progress call that followers wait for.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe in-process single-flight group.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        """
+        Runs func once per key at a time; concurrent callers with the same key
+        wait and receive the same result (or error).
+        If a follower waits longer than timeout seconds it runs func itself.
+        Returns:
+            tuple: (result, shared) where shared is True for followers.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        if not leader:
+            stats.incr('followers')
+            if call.done.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            stats.incr('wait_timeouts')
+            return func(), False
+        stats.incr('leaders')
+        try:
+            call.result = func()
+            return call.result, False
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """
+        Returns the keys currently being computed.
+        """
+        with self._lock:
+            return list(self._calls)
+
+
+_group = SingleFlight()
+
+
+def acquire_lock(key, owner=PROCESS_ID, lease_seconds=None):
+    """
+    Tries to take the cross-process lock for key.
+    An expired lock (its holder died) is taken over.
+    Returns True if the lock was acquired.
+    """
+    lease_seconds = lease_seconds or getattr(settings, 'QUIZLY_SINGLE_FLIGHT_LEASE_SECONDS', 3600)
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=lease_seconds)
+    try:
+        with transaction.atomic():
+            PipelineLock.objects.create(key=key, owner=owner, acquired_at=now, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        pass
+    taken_over = PipelineLock.objects.filter(key=key, expires_at__lt=now).update(
+        owner=owner, acquired_at=now, expires_at=expires_at
+    )
+    if taken_over:
+        stats.incr('takeovers')
+    return bool(taken_over)
+
+
+def release_lock(key, owner=PROCESS_ID):
+    """
+    Releases the cross-process lock for key if it is held by owner.
+    """
+    PipelineLock.objects.filter(key=key, owner=owner).delete()
+
+
+def wait_for_release(key, timeout, poll_interval=None):
+    """
+    Waits until no live lock exists for key.
+    Returns True if the lock was released (or expired) within timeout seconds.
+    """
+    poll_interval = poll_interval or getattr(settings, 'QUIZLY_SINGLE_FLIGHT_POLL_INTERVAL', 1.0)
+    deadline = time.monotonic() + timeout
+    while PipelineLock.objects.filter(key=key, expires_at__gte=timezone.now()).exists():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+    return True
+
+
+def _run_with_lock(key, func):
+    """
+    Runs func while holding the cross-process lock for key.
+    If another process holds it, waits for its release and tries to take the lock
+    again, so waiting processes run one after another instead of all at once.
+    Only after QUIZLY_SINGLE_FLIGHT_WAIT_TIMEOUT seconds in total does func run
+    without the lock.
+    """
+    deadline = time.monotonic() + getattr(settings, 'QUIZLY_SINGLE_FLIGHT_WAIT_TIMEOUT', 1800)
+    while not acquire_lock(key):
+        stats.incr('remote_waits')
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not wait_for_release(key, remaining):
+            stats.incr('wait_timeouts')
+            return func()
+    try:
+        return func()
+    finally:
+        release_lock(key)
+
+
+def single_flight(key, func):
+    """
+    Runs func at most once at a time per key, in this process and across processes.
+    Args:
+        key (str): Identifies identical work, e.g. the YouTube video id. None disables coordination.
+        func (callable): The work to run.
+    Returns:
+        tuple: (result, shared) where shared is True if the result was computed
+            by another caller in this process.
+    """
+    if key is None or not getattr(settings, 'QUIZLY_SINGLE_FLIGHT', True):
+        return func(), False
+    timeout = getattr(settings, 'QUIZLY_SINGLE_FLIGHT_WAIT_TIMEOUT', 1800)
+    # Followers that stop waiting for a stuck leader also go through the lock.
+    return _group.do(key, lambda: _run_with_lock(key, func), timeout=timeout)
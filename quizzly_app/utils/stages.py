@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+from quizzly_app.utils.metrics import span
+
+
+STAGE_LABELS = {
+    "download": "Download",
+    "transcription": "Transcription",
+    "generation": "Quiz generation",
+    "saving": "Saving",
+}
+
+STAGE_PROGRESS = {
+    "download": 10,
+    "transcription": 40,
+    "generation": 70,
+    "saving": 90,
+}
+
+
+class PipelineStageError(Exception):
+    """
+    Raised when a stage of the quiz pipeline fails.
+    Keeps the stage name so callers can report where the pipeline stopped.
+    """
+
+    def __init__(self, stage, error):
+        self.stage = stage
+        self.error = error
+        label = STAGE_LABELS.get(stage, stage.capitalize())
+        super().__init__(f"{label} failed: {error}")
+
+
+@contextmanager
+def pipeline_stage(name):
+    """
+    Context manager wrapping a single stage of the quiz pipeline.
+    Re-raises any error as PipelineStageError labelled with the stage name.
+    The stage is timed as a metrics span.
+    Args:
+        name (str): The stage name (e.g. "download", "transcription").
+    """
+    try:
+        with span(name):
+            yield
+    except PipelineStageError:
+        raise
+    except Exception as exc:
+        raise PipelineStageError(name, exc) from exc
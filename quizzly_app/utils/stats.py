@@ -0,0 +1,40 @@
+import threading
+
+
+class Counters:
+    """
+    Thread-safe named counters for in-process statistics (cache hits, errors, ...).
+    """
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._values = {name: 0 for name in names}
+
+    def incr(self, name, amount=1):
+        """
+        Increments the counter with the given name.
+        """
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name):
+        """
+        Returns the current value of a counter.
+        """
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self):
+        """
+        Returns a copy of all counter values.
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        """
+        Sets all counters back to zero.
+        """
+        with self._lock:
+            for name in self._values:
+                self._values[name] = 0
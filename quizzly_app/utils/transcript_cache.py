@@ -0,0 +1,48 @@
+"""
+Persistent transcript cache keyed by YouTube video id and Whisper model name.
+Entries expire after QUIZLY_TRANSCRIPT_CACHE_TTL seconds and the least recently
+used entries are evicted above QUIZLY_TRANSCRIPT_CACHE_MAX_ENTRIES (see db_cache).
+"""
+
+from quizzly_app.models import TranscriptCacheEntry
+from quizzly_app.utils.db_cache import DatabaseCache
+from quizzly_app.utils.stats import Counters
+
+stats = Counters('hits', 'misses', 'stores', 'evictions')
+
+_cache = DatabaseCache(
+    TranscriptCacheEntry, 'QUIZLY_TRANSCRIPT_CACHE_TTL', 'QUIZLY_TRANSCRIPT_CACHE_MAX_ENTRIES', stats
+)
+
+
+def get_transcript(video_id, model_name):
+    """
+    Looks up a cached transcript and records the hit or miss.
+    Expired entries are deleted and count as a miss.
+    Args:
+        video_id (str): Normalized YouTube video id.
+        model_name (str): Whisper model name used for the transcript.
+    Returns:
+        str | None: The cached transcript or None.
+    """
+    entry = _cache.get(video_id=video_id, model_name=model_name)
+    return entry.transcript if entry is not None else None
+
+
+def store_transcript(video_id, model_name, transcript):
+    """
+    Stores a transcript in the cache and evicts entries above the size limit.
+    Args:
+        video_id (str): Normalized YouTube video id.
+        model_name (str): Whisper model name used for the transcript.
+        transcript (str): The transcript text.
+    """
+    _cache.store({'video_id': video_id, 'model_name': model_name}, {'transcript': transcript})
+
+
+def evict():
+    """
+    Deletes expired entries and the least recently used entries above the size limit.
+    Returns the number of deleted entries.
+    """
+    return _cache.evict()
@@ -0,0 +1,195 @@
+"""
+Process-wide registry for Whisper models.
+Each model is loaded once per process and shared by all threads. Models are
+kept in LRU order and evicted when the loaded models exceed the configured
+memory budget (QUIZLY_WHISPER_MEMORY_BUDGET_MB).
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from quizzly_app.utils.metrics import span
+
+
+def load_whisper_model(name):
+    """
+    Loads a Whisper model from disk.
+    Args:
+        name (str): Whisper model name (e.g. "base", "small").
+    Returns:
+        whisper.Whisper: The loaded model.
+    """
+    import whisper
+    return whisper.load_model(name)
+
+
+def estimate_model_bytes(model):
+    """
+    Estimates the memory used by a torch model from its parameters and buffers.
+    Returns 0 for objects that are not torch modules.
+    """
+    total = 0
+    for tensors in (getattr(model, 'parameters', None), getattr(model, 'buffers', None)):
+        if tensors is None:
+            continue
+        for tensor in tensors():
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class _Entry:
+    """
+    A loaded model with its lock, size and number of active users.
+    """
+
+    def __init__(self, model, size):
+        self.model = model
+        self.size = size
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class WhisperModelRegistry:
+    """
+    Thread-safe LRU cache of loaded Whisper models.
+    A model is loaded at most once even if several threads request it at the
+    same time. Inference on a model is serialized by a per-model lock, because
+    Whisper installs decoding hooks on the model while transcribing.
+    """
+
+    def __init__(self, memory_budget_bytes=None, loader=load_whisper_model, sizer=estimate_model_bytes):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loader = loader
+        self._sizer = sizer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def _get_entry(self, name):
+        """
+        Returns the registry entry for a model, loading it if necessary.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                return entry
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    self._entries.move_to_end(name)
+                    return entry
+            with span("model_load"):
+                model = self._loader(name)
+            entry = _Entry(model, self._sizer(model))
+            with self._lock:
+                self._entries[name] = entry
+                self.loads += 1
+                self._evict(keep=name)
+            return entry
+
+    def _evict(self, keep):
+        """
+        Evicts least-recently-used models that are not in use until the budget is met.
+        Must be called with the registry lock held.
+        """
+        if self.memory_budget_bytes is None:
+            return
+        for name in list(self._entries):
+            if self._memory_usage_locked() <= self.memory_budget_bytes:
+                break
+            entry = self._entries[name]
+            if name == keep or entry.users:
+                continue
+            del self._entries[name]
+            self.evictions += 1
+
+    def get(self, name):
+        """
+        Returns the loaded model for the given name.
+        Callers that run inference should prefer `use()`, which serializes access.
+        """
+        return self._get_entry(name).model
+
+    @contextmanager
+    def use(self, name):
+        """
+        Context manager yielding the model for exclusive use by the current thread.
+        The model cannot be evicted while it is in use.
+        Args:
+            name (str): Whisper model name.
+        """
+        entry = self._get_entry(name)
+        with self._lock:
+            entry.users += 1
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.users -= 1
+
+    def preload(self, names):
+        """
+        Loads the given models ahead of the first request.
+        """
+        for name in names:
+            self._get_entry(name)
+
+    def memory_usage(self):
+        """
+        Returns the estimated bytes used by all loaded models.
+        """
+        with self._lock:
+            return self._memory_usage_locked()
+
+    def _memory_usage_locked(self):
+        """
+        Must be called with the registry lock held.
+        """
+        return sum(entry.size for entry in self._entries.values())
+
+    def loaded_models(self):
+        """
+        Returns the names of the loaded models, least recently used first.
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        """
+        Drops all loaded models.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the process-wide model registry, configured from settings.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            budget_mb = getattr(settings, 'QUIZLY_WHISPER_MEMORY_BUDGET_MB', None)
+            budget = budget_mb * 1024 * 1024 if budget_mb else None
+            _registry = WhisperModelRegistry(memory_budget_bytes=budget)
+        return _registry
+
+
+def use_model(name):
+    """
+    Shortcut for `get_registry().use(name)`.
+    """
+    return get_registry().use(name)
@@ -0,0 +1,37 @@
+import re
+from urllib.parse import parse_qs, urlparse
+
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def extract_video_id(url):
+    """
+    Extracts the normalized YouTube video id from a URL.
+    Supports watch, youtu.be, shorts and embed URLs.
+    Args:
+        url (str): The YouTube video URL.
+    Returns:
+        str | None: The 11-character video id, or None if the URL has no valid id.
+    """
+    if not url:
+        return None
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.startswith('m.'):
+        host = host[2:]
+    candidate = None
+    if host == 'youtu.be':
+        candidate = parsed.path.lstrip('/').split('/')[0]
+    elif host in ('youtube.com', 'music.youtube.com', 'youtube-nocookie.com'):
+        if parsed.path == '/watch':
+            candidate = parse_qs(parsed.query).get('v', [None])[0]
+        else:
+            parts = parsed.path.strip('/').split('/')
+            if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                candidate = parts[1]
+    if candidate and VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
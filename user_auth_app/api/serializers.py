@@ -1,5 +1,11 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from ..revocation import RevocableRefreshToken
+from ..user_cache import add_user_claims
 
 
 class RegistrationSerializer(serializers.ModelSerializer):
@@ -63,3 +69,56 @@ class RegistrationSerializer(serializers.ModelSerializer):
         account.save()
         
         return account
+
+
+class CookieTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer that adds the username and is_active claims,
+    so the user can be resolved from the access token alone.
+    """
+    token_class = RevocableRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        """
+        Returns the refresh token for the user including the user claims.
+        Access tokens created from it copy these claims.
+        """
+        return add_user_claims(super().get_token(user), user)
+
+
+class CookieTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer that renews the user claims of the new access token,
+    so changes to the user are picked up on the next refresh.
+    Blacklisted refresh tokens are rejected via the RevocationStore.
+    """
+    token_class = RevocableRefreshToken
+
+    def validate(self, attrs):
+        """
+        Validates the refresh token and returns the new access token with current user claims.
+        Mirrors TokenRefreshSerializer.validate, but loads the user only once for
+        both the is_active check and the claims.
+        """
+        refresh = self.token_class(attrs['refresh'])
+        access = refresh.access_token
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+            add_user_claims(access, user)
+
+        data = {'access': str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
@@ -3,10 +3,11 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .serializers import RegistrationSerializer
+from ..revocation import RevocableRefreshToken
+from ..user_cache import resolve_user
+from .serializers import CookieTokenObtainPairSerializer, CookieTokenRefreshSerializer, RegistrationSerializer
 
 class CookieJWTAuthentication(JWTAuthentication):
     """
@@ -15,6 +16,8 @@ class CookieJWTAuthentication(JWTAuthentication):
     This class overrides the default JWTAuthentication to retrieve the access token
     from the 'access_token' cookie. If the token is present and valid, it authenticates
     the user. Otherwise, it falls back to the default authentication method.
+    Depending on QUIZLY_AUTH_USER_MODE the user is resolved from a cache or from the
+    token claims instead of the database (see user_auth_app.user_cache).
 
     Args:
         request (Request): The HTTP request object.
@@ -33,6 +36,9 @@ class CookieJWTAuthentication(JWTAuthentication):
                 return None
         return super().authenticate(request)
 
+    def get_user(self, validated_token):
+        return resolve_user(validated_token, super().get_user)
+
 
 class RegistrationView(APIView):
     """
@@ -95,6 +101,7 @@ class CookieTokenObtainPairView(TokenObtainPairView):
         Response: 200 OK with user info and cookies if login succeeds.
                   401 Unauthorized if credentials are invalid.
     """
+    serializer_class = CookieTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
         """
@@ -160,6 +167,7 @@ class CookieTokenRefreshView(TokenRefreshView):
                   400 Bad Request if refresh token is missing.
                   401 Unauthorized if refresh token is invalid.
     """
+    serializer_class = CookieTokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
         """
@@ -238,7 +246,7 @@ class LogoutView(APIView):
             refresh_token = request.COOKIES.get('refresh_token')
             if refresh_token:
                 try:
-                    token = RefreshToken(refresh_token)
+                    token = RevocableRefreshToken(refresh_token)
                     token.blacklist()
                 except Exception:
                     pass  # Ignore if token is already invalid
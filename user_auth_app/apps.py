@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class UserAuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_auth_app'
+
+    def ready(self):
+        """
+        Invalidates cached users when a user is saved or deleted.
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from .user_cache import invalidate_user
+
+        def on_user_change(sender, instance, created=False, **kwargs):
+            # A new user has no tokens or cache entry yet.
+            if not created:
+                invalidate_user(instance.pk)
+
+        User = get_user_model()
+        post_save.connect(on_user_change, sender=User, weak=False, dispatch_uid='user_cache_save')
+        post_delete.connect(on_user_change, sender=User, weak=False, dispatch_uid='user_cache_delete')
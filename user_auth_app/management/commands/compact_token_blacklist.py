@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    """
+    Purges expired refresh tokens from the outstanding token list and the blacklist.
+    An expired token is rejected by its expiry anyway, so its blacklist entry is no
+    longer needed. Rows are deleted in batches to keep transactions short.
+    Run it periodically (e.g. from cron) or with --interval as a long-running job.
+    """
+    help = "Deletes expired outstanding and blacklisted refresh tokens."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help="Tokens deleted per transaction.")
+        parser.add_argument('--interval', type=float,
+                            help="Repeat every INTERVAL seconds instead of running once.")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = self.compact(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired token(s)."))
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
+
+    def compact(self, batch_size):
+        """
+        Deletes expired tokens batch by batch and returns their number.
+        """
+        deleted = 0
+        now = timezone.now()
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
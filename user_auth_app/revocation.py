@@ -0,0 +1,254 @@
+"""
+Fast lookup of revoked (blacklisted) refresh tokens.
+The blacklist itself is simplejwt's token_blacklist app. Every process keeps an
+in-memory Bloom filter of the revoked token ids (jti) in front of it, so the
+common case – a token that was never revoked – is answered without a query.
+Only when the filter reports a possible match is the database consulted; the
+answer is kept in a small LRU cache.
+The filter picks up tokens revoked by other processes every
+QUIZLY_TOKEN_REVOCATION_SYNC_SECONDS and is rebuilt from the database every
+QUIZLY_TOKEN_REVOCATION_REBUILD_SECONDS, which drops tokens removed by
+`manage.py compact_token_blacklist`. Each sync re-reads the last
+QUIZLY_TOKEN_REVOCATION_SYNC_OVERLAP rows below its watermark, so rows that
+committed after a row with a higher id are not missed. While another thread is
+syncing a filter older than the sync interval, "not revoked" answers are
+confirmed in the database.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from quizzly_app.utils.stats import Counters
+
+stats = Counters(
+    'checks', 'filter_negatives', 'cache_hits', 'db_checks', 'false_positives', 'stale_checks', 'syncs', 'rebuilds',
+)
+
+
+class BloomFilter:
+    """
+    Bloom filter for strings: no false negatives, false positives at about `error_rate`
+    as long as at most `capacity` items were added.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: position_i = h1 + i * h2.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """
+    Thread-safe front of the token blacklist: Bloom filter plus LRU cache of database answers.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, sync_seconds=5, rebuild_seconds=3600,
+                 cache_size=4096, sync_overlap=1000, clock=time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.cache_size = cache_size
+        self.sync_overlap = sync_overlap
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Held by the one thread that syncs or rebuilds the filter.
+        self._refresh_lock = threading.Lock()
+        self._filter = None
+        self._watermark = 0
+        self._synced_at = None
+        self._built_at = None
+        self._cache = OrderedDict()
+
+    def rebuild(self):
+        """
+        Loads the ids of all revoked, unexpired tokens into a new filter.
+        """
+        # Rows revoked while loading have a higher id and are added by the next sync.
+        watermark = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        jtis = list(
+            BlacklistedToken.objects.filter(id__lte=watermark, token__expires_at__gt=timezone.now())
+            .values_list('token__jti', flat=True)
+        )
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._filter = bloom
+            self._watermark = watermark
+            self._built_at = self._synced_at = self.clock()
+            self._cache.clear()
+        stats.incr('rebuilds')
+
+    def sync(self):
+        """
+        Adds tokens revoked since the last sync (e.g. by other processes) to the filter.
+        The last `sync_overlap` rows below the watermark are read again, so a row
+        that committed after a row with a higher id is still picked up.
+        """
+        with self._lock:
+            start = max(0, self._watermark - self.sync_overlap)
+        rows = list(BlacklistedToken.objects.filter(id__gt=start).order_by('id').values_list('id', 'token__jti'))
+        with self._lock:
+            for row_id, jti in rows:
+                if row_id > self._watermark or jti not in self._filter:
+                    self._filter.add(jti)
+                    self._cache.pop(jti, None)
+                self._watermark = max(self._watermark, row_id)
+            self._synced_at = self.clock()
+            overfull = self._filter.count > self._filter.capacity
+        stats.incr('syncs')
+        if overfull:
+            self.rebuild()
+
+    def _refresh(self):
+        """
+        Builds the filter on first use and syncs or rebuilds it when due.
+        Only one thread refreshes at a time; the others go on with the current filter.
+        Returns:
+            bool: False if the filter is older than the sync interval because
+            another thread is still refreshing it.
+        """
+        if self._filter is None:
+            with self._refresh_lock:
+                if self._filter is None:
+                    self.rebuild()
+            return True
+        now = self.clock()
+        rebuild = now - self._built_at >= self.rebuild_seconds
+        if not rebuild and now - self._synced_at < self.sync_seconds:
+            return True
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            if rebuild:
+                self.rebuild()
+            else:
+                self.sync()
+        finally:
+            self._refresh_lock.release()
+        return True
+
+    def is_revoked(self, jti):
+        """
+        Returns True if the token id is on the blacklist.
+        """
+        stats.incr('checks')
+        fresh = self._refresh()
+        with self._lock:
+            negative = jti not in self._filter
+            if not negative and jti in self._cache:
+                self._cache.move_to_end(jti)
+                stats.incr('cache_hits')
+                return self._cache[jti]
+        if negative:
+            if fresh:
+                stats.incr('filter_negatives')
+                return False
+            # The filter may miss tokens revoked since its last sync.
+            stats.incr('stale_checks')
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        stats.incr('db_checks')
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if not revoked:
+            stats.incr('false_positives')
+        self._remember(jti, revoked)
+        return revoked
+
+    def add(self, jti):
+        """
+        Marks a token id as revoked in this process right away.
+        """
+        self._refresh()
+        with self._lock:
+            self._filter.add(jti)
+        self._remember(jti, True)
+
+    def _remember(self, jti, revoked):
+        with self._lock:
+            self._cache[jti] = revoked
+            self._cache.move_to_end(jti)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def is_enabled():
+    """
+    Returns True if blacklist lookups go through the in-memory filter.
+    """
+    return getattr(settings, 'QUIZLY_TOKEN_REVOCATION_FILTER', True)
+
+
+def get_store():
+    """
+    Returns the process-wide RevocationStore.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RevocationStore(
+                capacity=getattr(settings, 'QUIZLY_TOKEN_REVOCATION_CAPACITY', 100000),
+                sync_seconds=getattr(settings, 'QUIZLY_TOKEN_REVOCATION_SYNC_SECONDS', 5),
+                rebuild_seconds=getattr(settings, 'QUIZLY_TOKEN_REVOCATION_REBUILD_SECONDS', 3600),
+                sync_overlap=getattr(settings, 'QUIZLY_TOKEN_REVOCATION_SYNC_OVERLAP', 1000),
+            )
+        return _store
+
+
+def reset_store():
+    """
+    Drops the process-wide store, e.g. after the blacklist was changed in tests.
+    """
+    global _store
+    with _store_lock:
+        _store = None
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check goes through the RevocationStore.
+    """
+
+    def check_blacklist(self):
+        if not is_enabled():
+            return super().check_blacklist()
+        if get_store().is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        if is_enabled():
+            get_store().add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -0,0 +1,150 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from user_auth_app.revocation import BloomFilter, RevocableRefreshToken, get_store, reset_store, stats
+
+
+class BloomFilterTests(SimpleTestCase):
+    """
+    Test suite for the Bloom filter in front of the token blacklist.
+    """
+
+    def test_no_false_negatives(self):
+        """
+        Test: Every added item is reported as contained; few others are.
+        """
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for number in range(1000):
+            bloom.add(f"revoked-{number}")
+        self.assertTrue(all(f"revoked-{number}" in bloom for number in range(1000)))
+        false_positives = sum(f"valid-{number}" in bloom for number in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(QUIZLY_TOKEN_REVOCATION_SYNC_SECONDS=0)
+class TokenBlacklistTests(APITestCase):
+    """
+    Test suite for logout revocation and the blacklist check on refresh.
+    """
+
+    def setUp(self):
+        """
+        Set up a test user and log in with cookies.
+        """
+        reset_store()
+        self.addCleanup(reset_store)
+        self.user = get_user_model().objects.create_user(username='revokeuser', password='revokepass123')
+        self.client.post(reverse('token_obtain_pair'), {'username': 'revokeuser', 'password': 'revokepass123'})
+        self.refresh_url = reverse('token_refresh')
+
+    def blacklist_queries(self):
+        """
+        Refreshes the access token and returns the response and the number of blacklist queries.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.refresh_url)
+        return response, sum(1 for query in queries if 'token_blacklist_blacklistedtoken' in query['sql'])
+
+    def test_logout_revokes_refresh_token(self):
+        """
+        Test: After logout the old refresh token can no longer be used.
+        """
+        refresh_token = self.client.cookies['refresh_token'].value
+        self.client.post(reverse('logout'))
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=RevocableRefreshToken(refresh_token, verify=False)['jti']).exists())
+        self.client.cookies['refresh_token'] = refresh_token
+        self.assertEqual(self.client.post(self.refresh_url).status_code, 401)
+
+    def test_valid_token_skips_blacklist_lookup(self):
+        """
+        Test: A token that was never revoked is accepted by the filter without a lookup.
+        """
+        store = get_store()
+        store.rebuild()
+        store.sync_seconds = 60
+        response, queries = self.blacklist_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 0)
+
+    def test_revocation_by_other_process_is_synced(self):
+        """
+        Test: A token blacklisted directly in the database is rejected after the next sync.
+        """
+        self.assertEqual(self.client.post(self.refresh_url).status_code, 200)
+        jti = RevocableRefreshToken(self.client.cookies['refresh_token'].value)['jti']
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        response, queries = self.blacklist_queries()
+        self.assertEqual(response.status_code, 401)
+        self.assertGreater(queries, 0)
+
+    def test_late_committed_revocation_is_synced(self):
+        """
+        Test: A row that commits after a row with a higher id is picked up by the next sync.
+        """
+        other = OutstandingToken.objects.create(
+            user=self.user, jti='other-jti', token='other', expires_at=timezone.now() + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(id=10, token=other)
+        self.assertEqual(self.client.post(self.refresh_url).status_code, 200)
+        jti = RevocableRefreshToken(self.client.cookies['refresh_token'].value)['jti']
+        BlacklistedToken.objects.create(id=5, token=OutstandingToken.objects.get(jti=jti))
+        self.assertEqual(self.client.post(self.refresh_url).status_code, 401)
+
+    def test_stale_filter_negative_is_confirmed(self):
+        """
+        Test: While another thread holds the sync, a filter older than the sync interval is not trusted.
+        """
+        store = get_store()
+        store.rebuild()
+        store.sync_seconds = 60
+        jti = RevocableRefreshToken(self.client.cookies['refresh_token'].value)['jti']
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        store._synced_at -= 120
+        stale_checks = stats.get('stale_checks')
+        with store._refresh_lock:
+            response, queries = self.blacklist_queries()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(queries, 1)
+        self.assertEqual(stats.get('stale_checks'), stale_checks + 1)
+
+    @override_settings(QUIZLY_TOKEN_REVOCATION_FILTER=False)
+    def test_filter_disabled(self):
+        """
+        Test: Without the filter every refresh checks the blacklist table.
+        """
+        checks = stats.get('checks')
+        response, queries = self.blacklist_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 1)
+        self.assertEqual(stats.get('checks'), checks)
+
+
+class CompactTokenBlacklistTests(TestCase):
+    """
+    Test suite for the compact_token_blacklist command.
+    """
+
+    def test_deletes_expired_tokens_only(self):
+        """
+        Test: Expired tokens and their blacklist entries are deleted in batches.
+        """
+        now = timezone.now()
+        for number in range(5):
+            token = OutstandingToken.objects.create(jti=f"expired-{number}", token="", expires_at=now - timedelta(minutes=1))
+            BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(jti="valid", token="", expires_at=now + timedelta(days=1))
+        out = StringIO()
+        call_command('compact_token_blacklist', batch_size=2, stdout=out)
+        self.assertIn("Deleted 5 expired token(s).", out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ["valid"])
+        self.assertFalse(BlacklistedToken.objects.exists())
@@ -0,0 +1,152 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user_auth_app import user_cache
+from user_auth_app.user_cache import UserCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class UserCacheTests(SimpleTestCase):
+    """
+    Test suite for the in-process user cache.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = UserCache(ttl=60, max_entries=2, clock=self.clock)
+        self.users = [get_user_model()(pk=pk, username=f"user{pk}") for pk in (1, 2, 3)]
+
+    def test_entries_expire(self):
+        """
+        Test: A cached user is dropped after the TTL.
+        """
+        self.cache.put(self.users[0])
+        self.assertIs(self.cache.get(1), self.users[0])
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get(1))
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        Test: Above max_entries the least recently used user is evicted.
+        """
+        self.cache.put(self.users[0])
+        self.cache.put(self.users[1])
+        self.cache.get(1)
+        self.cache.put(self.users[2])
+        self.assertIsNotNone(self.cache.get(1))
+        self.assertIsNone(self.cache.get(2))
+
+    def test_invalidate_records_change(self):
+        """
+        Test: Invalidation drops the user and marks tokens issued before as outdated.
+        """
+        self.cache.put(self.users[0])
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1))
+        self.assertTrue(self.cache.changed_since(1, 999))
+        self.assertFalse(self.cache.changed_since(1, 1001))
+        self.assertFalse(self.cache.changed_since(2, 999))
+
+
+class UserResolutionTests(APITestCase):
+    """
+    Test suite for resolving the authenticated user in CookieJWTAuthentication.
+    """
+
+    def setUp(self):
+        """
+        Set up a test user and log in with cookies.
+        """
+        user_cache.get_cache().clear()
+        self.user = get_user_model().objects.create_user(username='cacheuser', password='cachepass123')
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'cacheuser', 'password': 'cachepass123'})
+        self.access_token = response.cookies['access_token'].value
+        self.url = reverse('user_quizzes')
+
+    def user_queries(self):
+        """
+        Requests the quiz list and returns the number of queries on the user table.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return sum(1 for query in queries if 'auth_user' in query['sql'])
+
+    def test_login_adds_user_claims(self):
+        """
+        Test: The access token carries the username and is_active claims.
+        """
+        token = AccessToken(self.access_token)
+        self.assertEqual(token['username'], 'cacheuser')
+        self.assertTrue(token['is_active'])
+
+    def test_db_mode_queries_user(self):
+        """
+        Test: By default every request loads the user.
+        """
+        self.assertEqual(self.user_queries(), 1)
+        self.assertEqual(self.user_queries(), 1)
+
+    @override_settings(QUIZLY_AUTH_USER_MODE='cached')
+    def test_cached_mode(self):
+        """
+        Test: The user is loaded once; deactivating it invalidates the cache entry.
+        """
+        self.assertEqual(self.user_queries(), 1)
+        self.assertEqual(self.user_queries(), 0)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    @override_settings(QUIZLY_AUTH_USER_MODE='stateless')
+    def test_stateless_mode(self):
+        """
+        Test: The user comes from the token claims until it is changed in this process.
+        """
+        self.assertEqual(self.user_queries(), 0)
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(self.user_queries(), 1)
+        self.assertEqual(self.user_queries(), 0)
+
+    @override_settings(QUIZLY_AUTH_USER_MODE='stateless')
+    def test_stateless_user_owns_quizzes(self):
+        """
+        Test: A user built from the token claims passes the quiz owner check.
+        """
+        from quizzly_app.models import Quiz
+        quiz = Quiz.objects.create(title="Quiz", video_url="https://www.youtube.com/watch?v=3ohjOltaO6Y", owner=self.user)
+        response = self.client.get(reverse('user_quiz_detail', kwargs={'id': quiz.id}))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUIZLY_AUTH_USER_MODE='stateless')
+    def test_stateless_token_without_claims(self):
+        """
+        Test: Tokens issued without user claims fall back to loading the user.
+        """
+        self.client.cookies['access_token'] = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.user_queries(), 1)
+
+    def test_refresh_renews_claims(self):
+        """
+        Test: A refreshed access token carries the current username, with one user query.
+        """
+        refresh = RefreshToken.for_user(self.user)
+        refresh['username'] = 'outdated'
+        self.client.cookies['refresh_token'] = str(refresh)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('token_refresh'))
+        self.assertEqual(sum(1 for query in queries if 'auth_user' in query['sql']), 1)
+        self.assertEqual(AccessToken(response.data['access'])['username'], 'cacheuser')
@@ -0,0 +1,192 @@
+"""
+Resolution of the authenticated user without a database query per request.
+QUIZLY_AUTH_USER_MODE selects how CookieJWTAuthentication turns a validated
+access token into a user:
+- "db": load the user from the database on every request (default).
+- "cached": keep loaded users in a small in-process LRU cache for
+  QUIZLY_AUTH_USER_CACHE_TTL seconds.
+- "stateless": build the user from the token's username and is_active claims;
+  tokens without these claims, or issued before the user was changed in this
+  process, fall back to the cache.
+Saving or deleting a user invalidates its cache entry (see UserAuthAppConfig.ready).
+Changes made by other processes or by queryset.update() are seen after the
+TTL in "cached" mode. In "stateless" mode the claims are trusted until the
+access token expires: a user deactivated in another process keeps access for
+the token's full lifetime (ACCESS_TOKEN_LIFETIME) and gets new claims with the
+next refresh.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from rest_framework_simplejwt.settings import api_settings
+
+from quizzly_app.utils.stats import Counters
+
+CLAIM_FIELDS = ("username", "is_active")
+
+stats = Counters('hits', 'misses', 'stateless', 'invalidations')
+
+
+class UserCache:
+    """
+    Thread-safe LRU cache of users by id with a time-to-live.
+    Ids are compared as strings, since tokens carry the user id as string.
+    Also remembers when a user was last invalidated, so tokens issued before
+    the change are not trusted in stateless mode.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._changed = OrderedDict()
+
+    def get(self, user_id):
+        """
+        Returns the cached user or None if missing or expired.
+        """
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, user):
+        """
+        Caches a user and evicts the least recently used users above the size limit.
+        """
+        key = str(user.pk)
+        with self._lock:
+            self._entries[key] = (user, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """
+        Drops the cached user and records the time of the change.
+        """
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._changed[key] = self.clock()
+            self._changed.move_to_end(key)
+            while len(self._changed) > self.max_entries:
+                self._changed.popitem(last=False)
+
+    def changed_since(self, user_id, timestamp):
+        """
+        Returns True if the user was invalidated at or after the given Unix timestamp.
+        """
+        with self._lock:
+            changed_at = self._changed.get(str(user_id))
+        return changed_at is not None and (timestamp is None or changed_at >= timestamp)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._changed.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_mode():
+    """
+    Returns the configured user resolution mode ("db", "cached" or "stateless").
+    """
+    return getattr(settings, 'QUIZLY_AUTH_USER_MODE', 'db')
+
+
+def get_cache():
+    """
+    Returns the process-wide UserCache, recreated when its settings change.
+    """
+    global _cache
+    ttl = getattr(settings, 'QUIZLY_AUTH_USER_CACHE_TTL', 60)
+    max_entries = getattr(settings, 'QUIZLY_AUTH_USER_CACHE_MAX_ENTRIES', 1024)
+    with _cache_lock:
+        if _cache is None or (_cache.ttl, _cache.max_entries) != (ttl, max_entries):
+            _cache = UserCache(ttl=ttl, max_entries=max_entries)
+        return _cache
+
+
+def invalidate_user(user_id):
+    """
+    Removes a user from the cache, e.g. after it was saved or deleted.
+    """
+    get_cache().invalidate(user_id)
+    stats.incr('invalidations')
+
+
+def add_user_claims(token, user):
+    """
+    Adds the claims needed for stateless user resolution to a token.
+    """
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def user_from_claims(token):
+    """
+    Builds a user instance from the token claims without a database query.
+    Fields not contained in the token are deferred and loaded on first access.
+    Returns None if the token lacks the claims.
+    """
+    if any(field not in token for field in CLAIM_FIELDS):
+        return None
+    User = get_user_model()
+    id_field = User._meta.get_field(api_settings.USER_ID_FIELD)
+    values = {id_field.attname: id_field.to_python(token[api_settings.USER_ID_CLAIM])}
+    values.update((field, token[field]) for field in CLAIM_FIELDS)
+    return User.from_db(router.db_for_read(User), list(values), list(values.values()))
+
+
+def resolve_user(validated_token, load_user):
+    """
+    Returns the user of a validated access token according to QUIZLY_AUTH_USER_MODE.
+    Args:
+        validated_token (Token): The validated access token.
+        load_user (callable): Loads the user from the database for the token
+            (JWTAuthentication.get_user); raises AuthenticationFailed for unknown
+            or inactive users.
+    Returns:
+        User: The user; cached users are returned as a copy per request.
+    """
+    mode = get_mode()
+    if mode not in ('cached', 'stateless'):
+        return load_user(validated_token)
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    cache = get_cache()
+    if mode == 'stateless' and not cache.changed_since(user_id, validated_token.get('iat')):
+        user = user_from_claims(validated_token)
+        if user is not None:
+            if not user.is_active:
+                return load_user(validated_token)
+            stats.incr('stateless')
+            return user
+    user = cache.get(user_id)
+    if user is None:
+        stats.incr('misses')
+        user = load_user(validated_token)
+        cache.put(user)
+    else:
+        stats.incr('hits')
+    # Each request gets its own copy, so requests do not share one instance.
+    return copy.copy(user)